@@ -0,0 +1,452 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tpRigToolkit-libs-controlrig tests configuration
+Maya tests share a fake maya package, installed by the maya_scene fixture, whose maya.cmds and maya.api.OpenMaya
+stand-ins work on the same in-memory scene
+"""
+
+import re
+import sys
+import types
+import fnmatch
+from collections import OrderedDict
+
+import pytest
+
+from tpRigToolkit.libs.controlrig.core import consts
+
+MAYA_PACKAGE = 'tpRigToolkit.libs.controlrig.dccs.maya'
+TRANSFORM_TYPES = ('transform', 'joint')
+
+
+@pytest.fixture(autouse=True, scope='session')
+def library_cache_path(tmp_path_factory):
+    """
+    Compiles control libraries into a temporary directory instead of the user cache directory
+    """
+
+    cache_path = str(tmp_path_factory.mktemp('library'))
+    patcher = pytest.MonkeyPatch()
+    patcher.setenv(consts.LIBRARY_CACHE_PATH_ENV, cache_path)
+    yield cache_path
+    patcher.undo()
+
+
+@pytest.fixture
+def maya_scene(monkeypatch):
+    """
+    Installs a fake maya package whose modules work on an empty in-memory scene and returns its maya.cmds stand-in
+    Maya modules of the library are imported again by the tests, so they use the fake package
+    """
+
+    cmds = MockCmds()
+    maya_module = types.ModuleType('maya')
+    api_module = types.ModuleType('maya.api')
+    maya_module.cmds = cmds
+    maya_module.api = api_module
+    api_module.OpenMaya = cmds.api
+    monkeypatch.setitem(sys.modules, 'maya', maya_module)
+    monkeypatch.setitem(sys.modules, 'maya.cmds', cmds)
+    monkeypatch.setitem(sys.modules, 'maya.api', api_module)
+    monkeypatch.setitem(sys.modules, 'maya.api.OpenMaya', cmds.api)
+    for module_name in [name for name in sys.modules if name.startswith(MAYA_PACKAGE + '.')]:
+        package_name, attribute_name = module_name.rsplit('.', 1)
+        monkeypatch.delitem(sys.modules, module_name)
+        if package_name in sys.modules:
+            monkeypatch.delattr(sys.modules[package_name], attribute_name, raising=False)
+
+    return cmds
+
+
+def match_name(name, pattern):
+    """
+    Returns whether or not given node name matches the given Maya wildcard pattern
+    Maya wildcards do not match namespace separators
+    :param name: str
+    :param pattern: str
+    :return: bool
+    """
+
+    return fnmatch.fnmatchcase(name, pattern) and name.count(':') == pattern.count(':')
+
+
+class MockNode(object):
+    """
+    Node of the fake scene. Nodes are also the MObjects of the fake OpenMaya module
+    """
+
+    def __init__(self, name, node_type, parent=None, attributes=None, cvs=None, translation=None):
+        self.name = name
+        self.type = node_type
+        self.parent = parent
+        self.attributes = dict(attributes or dict())
+        self.cvs = list(cvs) if cvs is not None else list()
+        self.translation = tuple(translation or (0.0, 0.0, 0.0))
+
+    def __repr__(self):
+        return 'MockNode({!r})'.format(self.name)
+
+    @property
+    def long_name(self):
+        return '{}|{}'.format(self.parent.long_name if self.parent else '', self.name)
+
+    @property
+    def is_shape(self):
+        return self.type not in TRANSFORM_TYPES
+
+    @property
+    def world_translation(self):
+        parent_translation = self.parent.world_translation if self.parent else (0.0, 0.0, 0.0)
+        return tuple(value + parent_translation[i] for i, value in enumerate(self.translation))
+
+
+def _counted(fn):
+    def wrapper(self, *args, **kwargs):
+        self.calls += 1
+        return fn(self, *args, **kwargs)
+    wrapper.__name__ = fn.__name__
+    return wrapper
+
+
+class MockCmds(object):
+    """
+    Minimal stand-in of maya.cmds working on an in-memory scene. Each call to a command is counted
+    Nodes are transforms, joints and shapes with translation, CVs and dynamic attributes, with unique short names
+    """
+
+    def __init__(self):
+        self.nodes = OrderedDict()
+        self.connections = list()
+        self.references = dict()
+        self.edits = dict()
+        self.selection = list()
+        self.calls = 0
+        self.api = MockOpenMaya(self)
+
+    # Scene setup and inspection, not counted as commands
+
+    def node(self, name):
+        """
+        Returns the node with the given short or long name, ignoring any attribute or component
+        """
+
+        return self.nodes.get(name.split('.', 1)[0].rsplit('|', 1)[-1])
+
+    def add_node(self, name, node_type='transform', parent=None, cvs=None, translation=None, **attributes):
+        parent_node = self.node(parent) if isinstance(parent, str) else parent
+        node = MockNode(self._unique_name(name), node_type, parent_node, attributes, cvs, translation)
+        self.nodes[node.name] = node
+        return node
+
+    def add_control(self, name, cvs=(0.0, 0.0, 0.0, 1.0, 0.0, 0.0), parent=None, translation=None, **attributes):
+        control = self.add_node(name, parent=parent, translation=translation, **attributes)
+        self.add_node('{}Shape'.format(name), 'nurbsCurve', parent=control, cvs=cvs)
+        return control
+
+    def children(self, node, shapes=False):
+        node = self.node(node) if isinstance(node, str) else node
+        return [child for child in self.nodes.values() if child.parent is node and (not shapes or child.is_shape)]
+
+    def value(self, attribute):
+        node = self.node(attribute)
+        return node.attributes.get(attribute.split('.', 1)[1]) if node else None
+
+    def rename_node(self, node, new_name):
+        del self.nodes[node.name]
+        node.name = self._unique_name(new_name)
+        self.nodes[node.name] = node
+        return node.name
+
+    def delete_node(self, node):
+        for child in self.children(node):
+            self.delete_node(child)
+        self.nodes.pop(node.name, None)
+        self.connections = [connection for connection in self.connections if node not in connection[:2]]
+
+    def _unique_name(self, name):
+        if name not in self.nodes:
+            return name
+        base_name = re.sub(r'\d+$', '', name)
+        index = 1
+        while '{}{}'.format(base_name, index) in self.nodes:
+            index += 1
+        return '{}{}'.format(base_name, index)
+
+    def _nodes(self, names):
+        names = [names] if isinstance(names, str) else names or list()
+        return [node for node in (self.node(name) for name in names) if node is not None]
+
+    # maya.cmds commands
+
+    @_counted
+    def ls(self, pattern=None, type=None, objectsOnly=False, long=False):
+        if pattern and (not isinstance(pattern, str) or '*' not in pattern):
+            nodes = self._nodes(pattern)
+        elif pattern and '.' in pattern:
+            node_pattern, attribute_name = pattern.split('.')
+            nodes = [node for node in self.nodes.values()
+                     if match_name(node.name, node_pattern) and attribute_name in node.attributes]
+        else:
+            nodes = [node for node in self.nodes.values() if not pattern or match_name(node.name, pattern)]
+        if type:
+            types_to_find = (type,) if isinstance(type, str) else type
+            nodes = [node for node in nodes if node.type in types_to_find]
+        return [node.long_name if long else node.name for node in nodes]
+
+    @_counted
+    def listRelatives(self, nodes, shapes=False, parent=False, type=None, fullPath=False, noIntermediate=False):
+        related = list()
+        for node in self._nodes(nodes):
+            if parent:
+                related.extend([node.parent] if node.parent else list())
+            else:
+                related.extend(self.children(node, shapes=shapes))
+        return [node.long_name if fullPath else node.name for node in related if not type or node.type == type]
+
+    @_counted
+    def objExists(self, name):
+        return self.node(name) is not None
+
+    @_counted
+    def createNode(self, node_type, name=None, parent=None, skipSelect=False):
+        return self.add_node(name or node_type + '1', node_type, parent=parent).name
+
+    @_counted
+    def delete(self, nodes):
+        for node in self._nodes(nodes):
+            self.delete_node(node)
+
+    @_counted
+    def rename(self, node, new_name):
+        return self.rename_node(self.node(node), new_name)
+
+    @_counted
+    def addAttr(self, node, longName=None, **kwargs):
+        self.node(node).attributes.setdefault(longName, None)
+
+    @_counted
+    def getAttr(self, attribute, size=False):
+        node = self.node(attribute)
+        attribute_name = attribute.split('.', 1)[1]
+        if node is not None and attribute_name == 'controlPoints' and size:
+            return len(node.cvs) // 3
+        if node is None or attribute_name not in node.attributes:
+            raise ValueError('No object matches name: {}'.format(attribute))
+        return node.attributes[attribute_name]
+
+    @_counted
+    def setAttr(self, attribute, *values, **kwargs):
+        node = self.node(attribute)
+        attribute_name = attribute.split('.', 1)[1]
+        if attribute_name.startswith('controlPoints['):
+            first, last = [int(index) for index in attribute_name[len('controlPoints['):-1].split(':')]
+            if len(values) != 3 * (last - first + 1):
+                raise RuntimeError('Wrong number of values for {}'.format(attribute))
+            node.cvs[first * 3:(last + 1) * 3] = list(values)
+            return
+        node.attributes[attribute_name] = values[0] if len(values) == 1 else values
+
+    @_counted
+    def connectAttr(self, source, destination, nextAvailable=False):
+        self.connections.append((self.node(source), self.node(destination), destination.split('.', 1)[1]))
+
+    @_counted
+    def listConnections(self, attribute, source=True, destination=True, type=None, fullPath=False):
+        node = self.node(attribute)
+        attribute_name = attribute.split('.', 1)[1]
+        connected = list()
+        if source:
+            connected.extend(src for src, dst, dst_attribute in self.connections
+                             if dst is node and dst_attribute == attribute_name)
+        if destination:
+            connected.extend(dst for src, dst, _ in self.connections if src is node)
+        return [node.long_name if fullPath else node.name for node in connected if not type or node.type == type]
+
+    @_counted
+    def xform(self, node, query=False, worldSpace=False, objectSpace=False, matrix=None, rotatePivot=False,
+              translation=None):
+        name, _, component = node.partition('.')
+        node = self.node(name)
+        if not query:
+            if matrix:
+                node.translation = tuple(matrix[12:15])
+                return
+            # Maya only accepts a single position
+            if len(translation) != 3:
+                raise RuntimeError('Invalid translation: {}'.format(translation))
+            node.translation = tuple(translation)
+            return
+        if matrix:
+            return [1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 0.0, 1.0, 0.0] + list(node.world_translation) + [1.0]
+        if rotatePivot:
+            return list(node.world_translation)
+        offset = node.world_translation
+        return [value + offset[i % 3] for i, value in enumerate(node.cvs)]
+
+    @_counted
+    def select(self, nodes=None, add=False, clear=False):
+        names = [node.name for node in self._nodes(nodes)]
+        self.selection = self.selection + names if add else names
+
+    @_counted
+    def namespaceInfo(self, namespace, listOnlyNamespaces=False, recurse=False):
+        return sorted(set(name.rsplit(':', 1)[0] for name in self.nodes if ':' in name))
+
+    @_counted
+    def file(self, query=False, reference=False):
+        return sorted(self.references)
+
+    @_counted
+    def referenceQuery(self, reference_file, namespace=False, isLoaded=False, filename=False,
+                       withoutCopyNumber=False, editStrings=False):
+        if editStrings:
+            return self.edits.get(reference_file, list())
+        if namespace:
+            return ':' + self.references[reference_file]
+        if isLoaded:
+            return True
+        return reference_file.split('{')[0]
+
+
+class MockPlug(object):
+    def __init__(self, node, attribute_name):
+        self.node = node
+        self.attribute_name = attribute_name
+
+    def child(self, index):
+        return MockPlug(self.node, self.attribute_name[:-3] + 'RGB'[index])
+
+
+class MockOpenMaya(object):
+    """
+    Minimal stand-in of maya.api.OpenMaya working on the scene of the given maya.cmds stand-in
+    Callbacks registered through the messages classes and curves created with MFnNurbsCurve are recorded
+    """
+
+    def __init__(self, cmds):
+        mock = self
+
+        class MObject(object):
+            kNullObj = None
+
+        class MObjectHandle(object):
+            def __init__(self, node):
+                self._node = node
+
+            def isValid(self):
+                return self._node is not None
+
+            def isAlive(self):
+                return cmds.nodes.get(self._node.name) is self._node
+
+            def object(self):
+                return self._node
+
+        class MSelectionList(list):
+            def add(self, name):
+                self.append(cmds.node(name))
+
+            def length(self):
+                return len(self)
+
+            def getDependNode(self, index):
+                return self[index]
+
+        class MFnDependencyNode(object):
+            def __init__(self, node):
+                self.node = node
+
+            def findPlug(self, attribute_name, want_networked):
+                return MockPlug(self.node, attribute_name)
+
+        class MDGModifier(object):
+            def __init__(self):
+                self.values = list()
+
+            def _queue(self, plug, value):
+                self.values.append((plug, value))
+
+            newPlugValueBool = newPlugValueInt = newPlugValueFloat = _queue
+
+            def doIt(self):
+                mock.calls += 1
+                for plug, value in self.values:
+                    plug.node.attributes[plug.attribute_name] = value
+
+        class MFnNurbsCurve(object):
+            kOpen = 1
+            kPeriodic = 3
+
+            def __init__(self):
+                self._object = None
+
+            def create(self, points, knots, degree, form, is_2d, rational, parent):
+                cvs = [value for point in points for value in point]
+                transform = parent if parent is not None else cmds.add_node('curve1')
+                self._object = cmds.add_node('curveShape1', 'nurbsCurve', parent=transform, cvs=cvs)
+                mock.curves.append((self._object, list(points), knots, degree, form, parent))
+                return transform if parent is None else self._object
+
+            def object(self):
+                return self._object
+
+        class MDGMessage(object):
+            @staticmethod
+            def addNodeAddedCallback(callback, node_type):
+                return mock.add_callback('nodeAdded', node_type, callback)
+
+            @staticmethod
+            def addNodeRemovedCallback(callback, node_type):
+                return mock.add_callback('nodeRemoved', node_type, callback)
+
+        class MNodeMessage(object):
+            @staticmethod
+            def addNameChangedCallback(node, callback):
+                return mock.add_callback('nameChanged', None, callback)
+
+        class MSceneMessage(object):
+            kAfterNew = 'afterNew'
+            kAfterOpen = 'afterOpen'
+
+            @staticmethod
+            def addCallback(message, callback):
+                return mock.add_callback(message, None, callback)
+
+        class MMessage(object):
+            @staticmethod
+            def removeCallback(callback_id):
+                mock.callbacks.pop(callback_id, None)
+
+        self.calls = 0
+        self.curves = list()
+        self.callbacks = OrderedDict()
+        self.MObject = MObject
+        self.MObjectHandle = MObjectHandle
+        self.MPoint = lambda x, y, z: (x, y, z)
+        self.MPointArray = list
+        self.MSelectionList = MSelectionList
+        self.MFnDependencyNode = MFnDependencyNode
+        self.MDGModifier = MDGModifier
+        self.MFnNurbsCurve = MFnNurbsCurve
+        self.MDGMessage = MDGMessage
+        self.MNodeMessage = MNodeMessage
+        self.MSceneMessage = MSceneMessage
+        self.MMessage = MMessage
+
+    def add_callback(self, message, node_type, callback):
+        callback_id = len(self.callbacks) + 1
+        while callback_id in self.callbacks:
+            callback_id += 1
+        self.callbacks[callback_id] = (message, node_type, callback)
+        return callback_id
+
+    def emit(self, message, *args):
+        """
+        Calls all the callbacks registered for the given message
+        """
+
+        for registered_message, _, callback in list(self.callbacks.values()):
+            if registered_message == message:
+                callback(*args)
@@ -0,0 +1,23 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpRigToolkit-libs-controlrig Maya callbacks
+"""
+
+
+def test_scene_changed_callbacks_ignore_dependency_nodes(maya_scene):
+    from tpRigToolkit.libs.controlrig.dccs.maya import callbacks
+
+    manager = callbacks.CallbackManager()
+    callbacks.add_scene_changed_callbacks(manager, 'cache', lambda *args: None)
+
+    assert 'cache' in manager
+    registered = [(message, node_type) for message, node_type, _ in maya_scene.api.callbacks.values()]
+    # Keying controls creates animation curves, which must not invalidate the controls found so far
+    assert ('nodeAdded', 'dagNode') in registered
+    assert ('nodeRemoved', 'dagNode') in registered
+    assert not [node_type for _, node_type in registered if node_type == 'dependNode']
+
+    manager.remove('cache')
+    assert not maya_scene.api.callbacks
@@ -0,0 +1,52 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpRigToolkit-libs-controlrig control files compiler
+"""
+
+import json
+
+import pytest
+
+from tpRigToolkit.libs.controlrig.__main__ import main
+from tpRigToolkit.libs.controlrig.core import shapelib, compiler
+
+
+def test_validate_shapes():
+    valid = {'cvs': [[0, 0, 0], [1, 0, 0]], 'degree': 1, 'periodic': 0}
+    assert not compiler.validate_shapes([valid])
+    assert compiler.validate_shapes([])
+    assert compiler.validate_shapes([dict(valid, degree=3)])
+    assert compiler.validate_shapes([dict(valid, periodic=5)])
+    assert compiler.validate_shapes([dict(valid, cvs=[[0, 0, 0], [float('nan'), 0, 0]])])
+    assert compiler.validate_shapes([{'cvs': [[0, 0, 0], [1, 0]], 'degree': 1}])
+
+
+@pytest.mark.parametrize('jobs', ['1', '2'])
+def test_compile_command(tmp_path, jobs):
+    line = {'cvs': [[0, 0, 0], [1, 0, 0]], 'degree': 1, 'periodic': 0}
+    for name, shape in (('line', line), ('broken', dict(line, degree=4))):
+        with open(str(tmp_path / '{}.control'.format(name)), 'w') as fh:
+            json.dump({name: [shape]}, fh)
+
+    assert main(['compile', str(tmp_path), '--jobs', jobs, '--precision', 'float64']) == 1
+    library = shapelib.ControlShapeLibrary.from_file(shapelib.get_library_path(str(tmp_path)))
+    assert library.names() == ['line']
+    assert main(['validate', str(tmp_path / 'missing')]) == 0
+
+
+def test_duplicate_controls_share_cvs_blocks(tmp_path):
+    line = {'cvs': [[0, 0, 0], [1, 0, 0]], 'degree': 1, 'periodic': 0}
+    near_line = dict(line, cvs=[[0, 0, 0], [1.00001, 0, 0]])
+    for name, shapes in (('line', [line]), ('line_copy', [near_line]), ('two_lines', [line, line])):
+        with open(str(tmp_path / '{}.control'.format(name)), 'w') as fh:
+            json.dump({name: shapes}, fh)
+
+    groups = compiler.find_duplicate_controls([str(tmp_path)], max_workers=1)
+    assert [[report.name for report in group] for group in groups] == [['line', 'line_copy']]
+
+    controls = [(name, shapelib.read_control_file(path)) for name, path in shapelib.iter_control_files(str(tmp_path))]
+    library = shapelib.ControlShapeLibrary(shapelib.pack_library(controls, precision='float64'))
+    assert len(library._buffer) == library._cvs_offset + 2 * 6 * 8
+    assert library.shape_set('two_lines').shapes_data() == [line, line]
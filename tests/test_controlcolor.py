@@ -0,0 +1,57 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpRigToolkit-libs-controlrig Maya bulk controls color
+"""
+
+import pytest
+
+
+@pytest.fixture
+def cmds(maya_scene):
+    maya_scene.add_control('arm_ctrl')
+    leg_control = maya_scene.add_control('leg_ctrl')
+    maya_scene.add_node('leg_ctrlShape1', 'nurbsCurve', parent=leg_control)
+    maya_scene.add_node('grp')
+
+    return maya_scene
+
+
+def test_controls_sharing_color_are_colored_at_once(cmds):
+    from tpRigToolkit.libs.controlrig.dccs.maya import controlcolor
+
+    colored = controlcolor.set_controls_color(['arm_ctrl', 'leg_ctrl', 'grp', 'missing'], [1.0, 0.5, 0.0])
+
+    assert colored == ['arm_ctrl', 'leg_ctrl']
+    assert [cmds.value('leg_ctrlShape1.overrideColor' + axis) for axis in 'RGB'] == [1.0, 0.5, 0.0]
+    assert cmds.value('arm_ctrlShape.overrideRGBColors') is True
+    # One shapes query and the long names queries; attributes of all the shapes are written at once
+    assert cmds.calls == 1 + 1 + 4
+    assert cmds.api.calls == 1
+
+
+def test_color_writes_do_not_grow_with_shapes(cmds):
+    from tpRigToolkit.libs.controlrig.dccs.maya import controlcolor
+
+    for i in range(50):
+        cmds.add_control('ctrl{}'.format(i))
+    controlcolor.set_controls_color(['ctrl{}'.format(i) for i in range(50)], 17)
+
+    assert cmds.api.calls == 1
+    assert cmds.value('ctrl49Shape.overrideColor') == 17
+    # One shapes query and one long names query, no attribute is written per shape
+    assert cmds.calls == 2
+
+
+def test_controls_get_their_own_color(cmds):
+    from tpRigToolkit.libs.controlrig.dccs.maya import controlcolor
+
+    colored = controlcolor.set_controls_color(
+        ['arm_ctrl', 'leg_ctrl'], {'arm_ctrl': 13, 'leg_ctrl': (0.5, 0.5, 0.5)}, linear=False)
+
+    assert colored == ['arm_ctrl', 'leg_ctrl']
+    assert cmds.value('arm_ctrlShape.overrideColor') == 13
+    assert cmds.value('arm_ctrlShape.overrideRGBColors') is False
+    assert cmds.value('leg_ctrlShape.overrideColorG') == pytest.approx(0.214, abs=1e-3)
+    assert cmds.api.calls == 2
@@ -0,0 +1,44 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpRigToolkit-libs-controlrig Maya control curves creation
+"""
+
+import pytest
+
+from tpRigToolkit.libs.controlrig.core.shape import ControlShapeSet
+
+
+@pytest.fixture
+def cmds(maya_scene):
+    maya_scene.add_node('grp')
+
+    return maya_scene
+
+
+def test_knots_of_open_and_periodic_curves(cmds):
+    from tpRigToolkit.libs.controlrig.dccs.maya import controlcurves
+
+    assert controlcurves.get_knots(5, 1, False) == [0.0, 1.0, 2.0, 3.0, 4.0]
+    assert controlcurves.get_knots(4, 3, False) == [0.0, 0.0, 0.0, 1.0, 1.0, 1.0]
+    # Periodic curves repeat their first CVs, so Maya expects cv_count + 2 * degree - 1 knots
+    assert controlcurves.get_knots(8, 3, True) == [float(i) for i in range(-2, 11)]
+
+
+def test_curves_are_created_from_flat_cvs(cmds):
+    from tpRigToolkit.libs.controlrig.dccs.maya import controlcurves
+
+    square = [{'cvs': [[0, 0, 0], [1, 0, 0], [1, 0, 1], [0, 0, 1]], 'degree': 3, 'periodic': 1}]
+    line = [{'cvs': [[0, 0, 0], [0, 1, 0]], 'degree': 1, 'periodic': 0}]
+    shape_sets = [ControlShapeSet.from_shapes(square + line), ControlShapeSet.from_shapes(line)]
+
+    created = controlcurves.create_curves(shape_sets, parents=[None, cmds.node('grp')])
+
+    assert [(parent.name, [shape.name for shape in shapes]) for parent, shapes in created] == [
+        ('curve1', ['curveShape1', 'curveShape2']), ('grp', ['curveShape3'])]
+    shape, points, knots, degree, form, parent = cmds.api.curves[0]
+    assert points == [(0, 0, 0), (1, 0, 0), (1, 0, 1), (0, 0, 1), (0, 0, 0), (1, 0, 0), (1, 0, 1)]
+    assert (degree, form, parent) == (3, cmds.api.MFnNurbsCurve.kPeriodic, None)
+    # Next curves of the control are added to the transform created with the first one
+    assert cmds.api.curves[1][2:] == ([0.0, 1.0], 1, cmds.api.MFnNurbsCurve.kOpen, created[0][0])
@@ -0,0 +1,408 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpRigToolkit-libs-controlrig Maya controls library
+tpDcc functions used by the library are replaced by stand-ins that work on the fake scene of the maya_scene fixture
+"""
+
+import os
+import sys
+import math
+import types
+import importlib.util
+
+import pytest
+
+from tpRigToolkit.libs.controlrig.core import controlmatcher
+
+CREATE_COMMAND = 'tpRigToolkit-libs-controlrig-dccs-maya-createControlCurves'
+
+
+def bounding_box_size(cvs):
+    """
+    Returns the length of the diagonal of the bounding box of the given flat CVs
+    """
+
+    if not cvs:
+        return 0.0
+    return math.sqrt(sum((max(cvs[axis::3]) - min(cvs[axis::3])) ** 2 for axis in range(3)))
+
+
+class CommandCancel(Exception):
+    pass
+
+
+class DccCommand(object):
+
+    class ArgumentParser(dict):
+        def __getattr__(self, name):
+            try:
+                return self[name]
+            except KeyError:
+                raise AttributeError(name)
+
+    def resolve_arguments(self, arguments):
+        return arguments
+
+    def cancel(self, msg):
+        raise CommandCancel(msg)
+
+
+class MockCommandRunner(object):
+    """
+    Stand-in of the tpDcc command runner. Commands found in registered paths are loaded from their files
+    """
+
+    def __init__(self):
+        self.commands = dict()
+        self.history = list()
+        self.runs = list()
+
+    def manager(self):
+        return self
+
+    def register_path(self, path, package_name):
+        for file_name in sorted(os.listdir(path)):
+            if not file_name.endswith('.py') or file_name.startswith('__'):
+                continue
+            spec = importlib.util.spec_from_file_location(
+                'commands_{}'.format(file_name[:-3]), os.path.join(path, file_name))
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            for value in vars(module).values():
+                if isinstance(value, type) and issubclass(value, DccCommand) and getattr(value, 'id', None):
+                    self.commands[value.id] = value
+
+    def run(self, command_id, **kwargs):
+        self.runs.append(command_id)
+        dcc_command = self.commands[command_id]()
+        try:
+            arguments = dcc_command.resolve_arguments(DccCommand.ArgumentParser(kwargs))
+        except CommandCancel:
+            return None
+        result = dcc_command.run(**arguments)
+        self.history.append(dcc_command)
+        return result
+
+
+class MockDcc(object):
+    """
+    Stand-in of the tpDcc dcc module working on the fake scene. Returned node names are long names
+    """
+
+    def __init__(self, cmds):
+        self.cmds = cmds
+        self.colored = list()
+
+    def undo_decorator(self):
+        return lambda fn: fn
+
+    def selected_nodes(self):
+        return list(self.cmds.selection)
+
+    def select_node(self, nodes):
+        self.cmds.select(nodes)
+
+    def node_exists(self, node):
+        return self.cmds.node(node) is not None
+
+    def node_short_name(self, node):
+        return node.rsplit('|', 1)[-1]
+
+    def node_type(self, node):
+        return self.cmds.node(node).type
+
+    def node_parent(self, node):
+        parent = self.cmds.node(node).parent
+        return parent.long_name if parent else None
+
+    def list_nodes(self, name, node_type='transform', full_path=True):
+        return self.cmds.ls(name, type=node_type, long=full_path)
+
+    def list_shapes_of_type(self, node, shape_type='nurbsCurve'):
+        return [shape.long_name for shape in self.cmds.children(node, shapes=True) if shape.type == shape_type]
+
+    def node_has_shape_of_type(self, node, shape_type):
+        return bool(self.list_shapes_of_type(node, shape_type))
+
+    def attribute_exists(self, node, attribute_name):
+        return attribute_name in self.cmds.node(node).attributes
+
+    def get_attribute_value(self, node, attribute_name):
+        return self.cmds.node(node).attributes.get(attribute_name)
+
+    def set_attribute_value(self, node, attribute_name, value):
+        node = self.cmds.node(node)
+        if attribute_name.startswith('translate'):
+            translation = list(node.translation)
+            translation['XYZ'.index(attribute_name[-1])] = value
+            node.translation = tuple(translation)
+        else:
+            node.attributes[attribute_name] = value
+
+    def node_rgb_color(self, shape, linear=True):
+        return tuple(self.cmds.node(shape).attributes.get('overrideColor' + channel, 0.0) for channel in 'RGB')
+
+    def node_bounding_box_size(self, node):
+        shapes = self.cmds.children(node, shapes=True)
+        return bounding_box_size([value for shape in shapes for value in self.cmds.xform(
+            '{}.cv[*]'.format(shape.name), query=True, worldSpace=True, translation=True)])
+
+    def scale_shapes(self, node, scale, relative=False):
+        for shape in self.cmds.children(node, shapes=True):
+            shape.cvs = [value * scale for value in shape.cvs]
+
+    def rename_node(self, node, new_name):
+        return self.cmds.rename_node(self.cmds.node(node), new_name)
+
+    def delete_node(self, node):
+        self.cmds.delete(node)
+
+    def move_node(self, node, x, y, z, world_space=True):
+        node = self.cmds.node(node)
+        offset = node.parent.world_translation if node.parent else (0.0, 0.0, 0.0)
+        node.translation = (x - offset[0], y - offset[1], z - offset[2])
+
+    def set_parent(self, node, parent):
+        node = self.cmds.node(node)
+        world_translation = node.world_translation
+        node.parent = self.cmds.node(parent) if parent else None
+        self.move_node(node.name, *world_translation)
+        return node.long_name
+
+    def set_parent_to_world(self, node):
+        return self.set_parent(node, None)
+
+    def create_parent_constraint(self, source, target, maintain_offset=False):
+        self.move_node(source, *self.cmds.node(target).world_translation)
+        return self.cmds.add_node('parentConstraint1', 'parentConstraint', parent=self.cmds.node(source)).name
+
+    def create_scale_constraint(self, source, target, maintain_offset=False):
+        return self.cmds.add_node('scaleConstraint1', 'scaleConstraint', parent=self.cmds.node(source)).name
+
+
+@pytest.fixture
+def tpdcc(maya_scene, monkeypatch):
+    """
+    Installs stand-ins of the tpDcc modules used by the Maya controls library and returns the fake dcc module
+    """
+
+    cmds = maya_scene
+    dcc = MockDcc(cmds)
+    runner = dcc.runner = MockCommandRunner()
+
+    def rename_mobject(node, name):
+        return cmds.rename_node(node, name)
+
+    def set_rgb_color(nodes, color, linear=True, color_shapes=True):
+        dcc.colored.append((list(nodes), tuple(color)))
+        for node in nodes:
+            node = cmds.node(node)
+            for shape in ([node] if node.is_shape else cmds.children(node, shapes=True)):
+                shape.attributes.update(('overrideColor' + channel, color[i]) for i, channel in enumerate('RGB'))
+
+    def get_curve_line_thickness(node):
+        shapes = cmds.children(node, shapes=True)
+        return shapes[0].attributes.get('lineWidth', -1) if shapes else -1
+
+    def set_curve_line_thickness(nodes, line_width=-1):
+        for node in [nodes] if isinstance(nodes, str) else nodes:
+            node = cmds.node(node)
+            for shape in ([node] if node.is_shape else cmds.children(node, shapes=True)):
+                shape.attributes['lineWidth'] = line_width
+
+    def duplicate_transform_without_children(node, node_name=None, delete_shapes=False):
+        source = cmds.node(node)
+        duplicate = cmds.add_node(node_name or source.name, parent=source.parent, translation=source.translation)
+        if not delete_shapes:
+            for shape in cmds.children(source, shapes=True):
+                cmds.add_node(shape.name, shape.type, parent=duplicate, cvs=shape.cvs, **shape.attributes)
+        return duplicate.long_name
+
+    def parent_transforms_shapes(target, sources, delete_original=True, delete_shape_type=None):
+        target = cmds.node(target)
+        if delete_shape_type:
+            for shape in cmds.children(target, shapes=True):
+                if shape.type == delete_shape_type:
+                    cmds.delete_node(shape)
+        for source in [sources] if isinstance(sources, str) else sources:
+            source = cmds.node(source)
+            for shape in cmds.children(source, shapes=True):
+                shape.parent = target
+            if delete_original:
+                cmds.delete_node(source)
+        return target.long_name
+
+    modules = {
+        'tpDcc': types.ModuleType('tpDcc'),
+        'tpDcc.core': types.ModuleType('tpDcc.core'),
+        'tpDcc.core.command': types.ModuleType('tpDcc.core.command'),
+        'tpDcc.libs': types.ModuleType('tpDcc.libs'),
+        'tpDcc.libs.python': types.ModuleType('tpDcc.libs.python'),
+        'tpDcc.libs.python.python': types.ModuleType('tpDcc.libs.python.python'),
+        'tpDcc.dccs': types.ModuleType('tpDcc.dccs'),
+        'tpDcc.dccs.maya': types.ModuleType('tpDcc.dccs.maya'),
+        'tpDcc.dccs.maya.api': types.ModuleType('tpDcc.dccs.maya.api'),
+        'tpDcc.dccs.maya.api.node': types.ModuleType('tpDcc.dccs.maya.api.node'),
+        'tpDcc.dccs.maya.core': types.ModuleType('tpDcc.dccs.maya.core'),
+    }
+    for name in ('filtertypes', 'curve', 'shape', 'node', 'transform', 'color'):
+        modules['tpDcc.dccs.maya.core.' + name] = types.ModuleType('tpDcc.dccs.maya.core.' + name)
+    for name, module in modules.items():
+        if '.' in name:
+            package_name, attribute_name = name.rsplit('.', 1)
+            setattr(modules[package_name], attribute_name, module)
+        monkeypatch.setitem(sys.modules, name, module)
+    modules['tpDcc'].dcc = dcc
+    modules['tpDcc.core.command'].DccCommand = DccCommand
+    modules['tpDcc.core.command'].CommandRunner = lambda: runner
+    modules['tpDcc.libs.python.python'].force_list = lambda value: list(
+        value) if isinstance(value, (list, tuple)) else [] if value is None else [value]
+    api_node = modules['tpDcc.dccs.maya.api.node']
+    api_node.as_mobject = cmds.node
+    api_node.rename_mobject = rename_mobject
+    api_node.name_from_mobject = lambda node: node.long_name
+    api_node.names_from_mobject_handles = lambda nodes: [node.long_name for node in nodes]
+    modules['tpDcc.dccs.maya.core.node'].set_rgb_color = set_rgb_color
+    modules['tpDcc.dccs.maya.core.curve'].get_curve_line_thickness = get_curve_line_thickness
+    modules['tpDcc.dccs.maya.core.curve'].set_curve_line_thickness = set_curve_line_thickness
+    modules['tpDcc.dccs.maya.core.transform'].duplicate_transform_without_children = \
+        duplicate_transform_without_children
+    modules['tpDcc.dccs.maya.core.transform'].parent_transforms_shapes = parent_transforms_shapes
+
+    return dcc
+
+
+@pytest.fixture
+def controllib(tpdcc):
+    from tpRigToolkit.libs.controlrig.dccs.maya import controllib
+
+    return controllib
+
+
+def test_found_controls_are_read_from_registry_until_scene_changes(tpdcc, controllib, monkeypatch):
+    cmds = tpdcc.cmds
+    cmds.add_control('arm_ctrl')
+    cmds.add_control('leg_ctrl')
+    cmds.add_node('grp')
+    matcher = controlmatcher.ControlMatcher()
+
+    controllib.create_controls_registry()
+    controllib.controlregistry.register_controls(['grp'])
+
+    def scan(*args, **kwargs):
+        raise AssertionError('Scene should not be scanned while the registry is current')
+
+    with monkeypatch.context() as patcher:
+        patcher.setattr(controllib.controlscan, 'iter_controls', scan)
+        # Nodes registered by other tools are checked against the rules
+        assert list(controllib._iter_found_controls(matcher)) == ['arm_ctrl', 'leg_ctrl']
+        cmds.node('leg_ctrl').attributes['tag'] = 'leg'
+        assert list(controllib._iter_found_controls(matcher)) == ['leg_ctrl']
+        assert list(controllib._iter_found_controls(matcher, tagged_first=False)) == ['arm_ctrl', 'leg_ctrl']
+
+    # Nodes created outside the library make the registry stale, so the scene is scanned again
+    hand_ctrl = cmds.add_control('hand_ctrl')
+    cmds.api.emit('nodeAdded', hand_ctrl)
+    assert not controllib._is_registry_current()
+    assert list(controllib._iter_found_controls(matcher, tagged_first=False)) == ['arm_ctrl', 'leg_ctrl', 'hand_ctrl']
+
+
+def test_create_control_curves_creates_batch_with_single_command(tpdcc, controllib, monkeypatch):
+    cmds = tpdcc.cmds
+    cmds.add_node('grp')
+    controllib.create_controls_registry()
+    registered = list()
+    register_controls = controllib.controlregistry.register_controls
+    monkeypatch.setattr(
+        controllib.controlregistry, 'register_controls',
+        lambda controls: registered.append(list(controls)) or register_controls(controls))
+
+    results = controllib.create_control_curves([
+        {'control_name': 'arm_ctrl', 'color': (1.0, 0.0, 0.0)},
+        {'control_name': 'leg_ctrl', 'control_size': 2.0, 'color': (1.0, 0.0, 0.0), 'line_width': 3},
+        {'control_name': 'hand_ctrl', 'control_type': 'square', 'parent': 'grp'}])
+
+    assert results == [['|arm_ctrl'], ['|leg_ctrl'], ['|grp']]
+    assert tpdcc.runner.runs == [CREATE_COMMAND]
+    assert registered == [['|arm_ctrl', '|leg_ctrl', '|grp']]
+    assert controllib._is_registry_current()
+    arm_shape, = cmds.children('arm_ctrl', shapes=True)
+    leg_shape, = cmds.children('leg_ctrl', shapes=True)
+    assert leg_shape.cvs == pytest.approx([value * 2.0 for value in arm_shape.cvs])
+    assert [shape.name for shape in cmds.children('grp', shapes=True)] == ['hand_ctrl']
+    # Curves sharing a color are colored at once
+    assert tpdcc.colored == [(['|arm_ctrl', '|leg_ctrl'], (1.0, 0.0, 0.0))]
+    assert 'lineWidth' not in arm_shape.attributes
+    assert leg_shape.attributes['lineWidth'] == 3
+
+    tpdcc.runner.history[-1].undo()
+    assert not cmds.node('arm_ctrl') and not cmds.node('leg_ctrl')
+    assert cmds.node('grp') and not cmds.children('grp')
+
+
+def test_mirror_control_updates_target_cvs_in_place(tpdcc, controllib):
+    cmds = tpdcc.cmds
+    cmds.add_control('L_arm_ctrl', cvs=[1.0, 0.0, 0.0, 0.0, 1.0, 0.0], translation=(2.0, 1.0, 0.0))
+    cmds.add_control('R_arm_ctrl', cvs=[0.0, 0.0, 0.0, 0.0, 0.0, 0.0], translation=(-2.0, 1.0, 0.0))
+    nodes = list(cmds.nodes)
+
+    assert controllib.mirror_control('L_arm_ctrl', mirror_replace=True) == 'R_arm_ctrl'
+    assert cmds.node('R_arm_ctrlShape').cvs == pytest.approx([-1.0, 0.0, 0.0, 0.0, 1.0, 0.0])
+    assert list(cmds.nodes) == nodes
+
+
+def test_mirror_control_duplicates_source_without_target(tpdcc, controllib):
+    cmds = tpdcc.cmds
+    cmds.add_control('L_arm_ctrl', cvs=[1.0, 0.0, 0.0, 0.0, 1.0, 0.0], translation=(2.0, 1.0, 0.0))
+
+    mirrored = controllib.mirror_control('L_arm_ctrl', from_name='L_', to_name='R_')
+
+    assert mirrored == 'R_arm_ctrl'
+    assert cmds.node('R_arm_ctrl').world_translation == pytest.approx((-2.0, 1.0, 0.0))
+    shape, = cmds.children('R_arm_ctrl', shapes=True)
+    assert cmds.xform('{}.cv[*]'.format(shape.name), query=True, translation=True) == pytest.approx(
+        [-3.0, 1.0, 0.0, -2.0, 2.0, 0.0])
+    assert cmds.node('L_arm_ctrlShape').cvs == [1.0, 0.0, 0.0, 0.0, 1.0, 0.0]
+
+
+def test_replace_control_curves_keeps_size_color_and_line_width(tpdcc, controllib):
+    cmds = tpdcc.cmds
+    cmds.add_node('rig', translation=(0.0, 5.0, 0.0))
+    square = [-2.0, 0.0, -2.0, 2.0, 0.0, -2.0, 2.0, 0.0, 2.0, -2.0, 0.0, 2.0]
+    cmds.add_control('arm_ctrl', cvs=square, parent='rig', translation=(1.0, 0.0, 0.0))
+    cmds.node('arm_ctrlShape').attributes.update(
+        lineWidth=2.0, overrideColorR=0.0, overrideColorG=1.0, overrideColorB=0.0)
+    cmds.selection = ['arm_ctrl']
+
+    assert controllib.replace_control_curves('arm_ctrl', control_type='circle') == '|rig|arm_ctrl'
+
+    assert tpdcc.runner.runs == [CREATE_COMMAND]
+    shape, = cmds.children('arm_ctrl', shapes=True)
+    assert not cmds.node('arm_ctrlShape') and not cmds.node('new_ctrl')
+    assert len(shape.cvs) > len(square)
+    assert bounding_box_size(shape.cvs) == pytest.approx(bounding_box_size(square))
+    assert [shape.attributes[name] for name in ('overrideColorR', 'overrideColorG', 'overrideColorB')] == [
+        0.0, 1.0, 0.0]
+    assert shape.attributes['lineWidth'] == 2.0
+    assert cmds.node('arm_ctrl').world_translation == (1.0, 5.0, 0.0)
+    assert cmds.selection == ['arm_ctrl']
+
+
+def test_cached_controls_are_found_again_after_tag_attributes_edits(tpdcc, controllib):
+    cmds = tpdcc.cmds
+    cmds.add_control('arm_ctrl')
+    cmds.add_control('leg_ctrl')
+
+    assert controllib.get_controls() == ['arm_ctrl', 'leg_ctrl']
+    assert controllib.get_controls() == ['arm_ctrl', 'leg_ctrl']
+    assert controllib.get_controls_cache_stats()['hits'] == 1
+
+    # Attribute edits do not trigger any of the callbacks that invalidate the cache
+    cmds.addAttr('leg_ctrl', longName='tag', dataType='string')
+    assert controllib.get_controls() == ['arm_ctrl', 'leg_ctrl']
+    cmds.setAttr('leg_ctrl.tag', 'leg', type='string')
+    assert controllib.get_controls() == ['leg_ctrl']
+    assert controllib.get_controls() == ['leg_ctrl']
+    assert controllib.get_controls_cache_stats()['invalidations'] == 1
@@ -0,0 +1,73 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpRigToolkit-libs-controlrig control rules
+"""
+
+from tpRigToolkit.libs.controlrig.core import controlmatcher
+
+SCENE = {
+    'char:arm_ctrl': {'attributes': {}, 'shapes': ['nurbsCurve']},
+    'arm_offset': {'attributes': {'control': True}, 'shapes': ['nurbsCurve']},
+    'hand': {'attributes': {'control': True}, 'shapes': []},
+    'foot': {'attributes': {'curveType': 'circle'}, 'shapes': ['nurbsCurve']},
+    'pose_ctrl': {'attributes': {'POSE': True}, 'shapes': ['nurbsCurve']},
+    'locator_ctrl': {'attributes': {}, 'shapes': ['locator']},
+    'persp': {'attributes': {'tag': 'camera'}, 'shapes': []},
+    'spine': {'attributes': {'tag': 'controller'}, 'shapes': ['nurbsCurve']},
+    'chest': {'attributes': {'tag': 'controller'}, 'shapes': []},
+}
+
+
+def _match(matcher, node, only_tagged=False):
+    return matcher.match(
+        node, lambda n, attr: attr in SCENE[n]['attributes'], lambda n, attr: SCENE[n]['attributes'].get(attr),
+        lambda n, shape_type: shape_type in SCENE[n]['shapes'], only_tagged=only_tagged)
+
+
+def test_matcher_evaluates_control_rules():
+    matcher = controlmatcher.ControlMatcher()
+
+    assert _match(matcher, 'char:arm_ctrl') == controlmatcher.UNTAGGED
+    assert _match(matcher, 'arm_offset') is None
+    assert _match(matcher, 'hand') == controlmatcher.UNTAGGED
+    assert _match(matcher, 'foot') == controlmatcher.UNTAGGED
+    assert _match(matcher, 'pose_ctrl') is None
+    assert _match(matcher, 'locator_ctrl') is None
+    assert _match(matcher, 'char:arm_ctrl', only_tagged=True) is None
+
+
+def test_matcher_checks_rules_before_tags():
+    matcher = controlmatcher.ControlMatcher()
+
+    # Tagged nodes are only controls if they pass name and attribute rules and have a curve shape
+    assert _match(matcher, 'spine') == controlmatcher.TAGGED
+    assert _match(matcher, 'persp') is None
+    assert _match(matcher, 'chest') is None
+    assert _match(controlmatcher.ControlMatcher(names_to_skip='spine'), 'spine') is None
+    assert _match(matcher, 'persp', only_tagged=True) == controlmatcher.TAGGED
+    assert _match(matcher, 'chest', only_tagged=True) == controlmatcher.TAGGED
+
+
+def test_matcher_is_built_from_kwargs():
+    matcher = controlmatcher.ControlMatcher.from_kwargs(suffixes_to_skip='_ctrl', namespace='char')
+
+    assert _match(matcher, 'char:arm_ctrl') is None
+    assert controlmatcher.ControlMatcher.from_kwargs(matcher=matcher) is matcher
+    assert matcher == controlmatcher.ControlMatcher(suffixes_to_skip=['_ctrl'])
+    assert matcher != controlmatcher.ControlMatcher()
+
+
+def test_matcher_yields_tagged_controls_first():
+    matcher = controlmatcher.ControlMatcher()
+    exists = lambda n, attr: attr in SCENE[n]['attributes']
+    value = lambda n, attr: SCENE[n]['attributes'].get(attr)
+    has_shape = lambda n, shape_type: shape_type in SCENE[n]['shapes']
+
+    assert list(matcher.iter_matches(sorted(SCENE), exists, value, has_shape)) == ['chest', 'persp', 'spine']
+    untagged_nodes = sorted(node for node in SCENE if 'tag' not in SCENE[node]['attributes'])
+    assert list(matcher.iter_matches(untagged_nodes, exists, value, has_shape)) == [
+        'char:arm_ctrl', 'foot', 'hand']
+    assert len(list(matcher.iter_matches(SCENE, exists, value, has_shape, tagged_first=False))) == 4
+    assert list(controlmatcher.iter_chunks(range(5), 2)) == [[0, 1], [2, 3], [4]]
@@ -0,0 +1,40 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpRigToolkit-libs-controlrig Maya controls mirror
+"""
+
+import pytest
+
+
+@pytest.fixture
+def cmds(maya_scene):
+    maya_scene.add_control('L_arm_ctrl', cvs=[1.0, 0.0, 0.0, 0.0, 1.0, 0.0], translation=(2.0, 1.0, 0.0))
+    maya_scene.add_control('R_arm_ctrl', cvs=[0.0, 0.0, 0.0, 0.0, 0.0, 0.0], translation=(-2.0, 1.0, 0.0))
+
+    return maya_scene
+
+
+def test_world_mirror_writes_target_local_cvs(cmds):
+    from tpRigToolkit.libs.controlrig.dccs.maya import controlmirror
+
+    matrix = controlmirror.get_mirror_matrix('L_arm_ctrl', mirror_axis='X', mirror_mode=controlmirror.WORLD_MIRROR)
+    assert controlmirror.mirror_shapes('L_arm_ctrl', 'R_arm_ctrl', matrix)
+
+    # CVs are written in the local space of the target, so their world positions are the reflected source ones
+    assert cmds.node('R_arm_ctrlShape').cvs == [-1.0, 0.0, 0.0, 0.0, 1.0, 0.0]
+    assert controlmirror.get_world_cvs('|R_arm_ctrl|R_arm_ctrlShape').tolist() == [-3.0, 1.0, 0.0, -2.0, 2.0, 0.0]
+    assert controlmirror.get_world_cvs('|L_arm_ctrl|L_arm_ctrlShape').tolist() == [3.0, 1.0, 0.0, 2.0, 2.0, 0.0]
+
+
+def test_pivot_mirror_and_different_topology(cmds):
+    from tpRigToolkit.libs.controlrig.dccs.maya import controlmirror
+
+    matrix = controlmirror.get_mirror_matrix('L_arm_ctrl', mirror_axis='x', mirror_mode=controlmirror.PIVOT_MIRROR)
+    assert controlmirror.get_mirrored_pivot('L_arm_ctrl', matrix) == (2.0, 1.0, 0.0)
+    assert controlmirror.mirror_shapes('L_arm_ctrl', 'L_arm_ctrl', matrix)
+    assert cmds.node('L_arm_ctrlShape').cvs == [-1.0, 0.0, 0.0, 0.0, 1.0, 0.0]
+
+    cmds.node('R_arm_ctrlShape').cvs = [0.0, 0.0, 0.0]
+    assert not controlmirror.mirror_shapes('L_arm_ctrl', 'R_arm_ctrl', matrix)
@@ -0,0 +1,59 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpRigToolkit-libs-controlrig Maya controls registry
+"""
+
+import pytest
+
+from tpRigToolkit.libs.controlrig.core import controlmatcher
+
+
+@pytest.fixture
+def registry(maya_scene):
+    for node in ('arm_ctrl', 'char:arm_ctrl', 'leg_ctrl'):
+        maya_scene.add_node(node)
+    from tpRigToolkit.libs.controlrig.dccs.maya import controlregistry
+
+    return controlregistry, maya_scene
+
+
+def test_registry_stores_controls(registry):
+    controlregistry, cmds = registry
+    matcher = controlmatcher.ControlMatcher()
+
+    assert controlregistry.get_registered_controls(matcher) is None
+    assert not controlregistry.register_controls(['leg_ctrl'])
+
+    controlregistry.create_registry(['arm_ctrl', 'char:arm_ctrl'], matcher)
+    controlregistry.register_controls(['leg_ctrl', 'arm_ctrl', '|leg_ctrl'])
+    assert controlregistry.get_registered_controls(matcher) == ['arm_ctrl', 'leg_ctrl']
+    assert len(cmds.connections) == 3
+    assert controlregistry.get_registered_controls(matcher, namespace='char') == ['char:arm_ctrl']
+    assert controlregistry.is_registered('leg_ctrl')
+
+    # Registries built with other rules are stale
+    assert controlregistry.get_registered_controls(controlmatcher.ControlMatcher(suffixes_to_skip='_ctrl')) is None
+
+    cmds.delete('leg_ctrl')
+    assert controlregistry.get_registered_controls(matcher) == ['arm_ctrl']
+    assert controlregistry.delete_registry()
+    assert controlregistry.get_registered_controls(matcher) is None
+
+
+def test_registry_is_stale_for_namespaces_added_after_it(registry):
+    controlregistry, cmds = registry
+    matcher = controlmatcher.ControlMatcher()
+
+    controlregistry.create_registry(['arm_ctrl'], matcher, namespaces=['', 'char', 'prop'])
+    assert controlregistry.get_registered_controls(matcher, namespace='prop') == []
+    assert controlregistry.get_registered_controls(matcher, namespace=':char') == []
+
+    # Referenced after the registry was built: controls must be looked for in the scene
+    cmds.add_node('char02:arm_ctrl')
+    assert controlregistry.get_registered_controls(matcher, namespace='char02') is None
+
+    controlregistry.create_registry(['arm_ctrl', 'char:arm_ctrl'], matcher)
+    assert controlregistry.get_registered_controls(matcher, namespace='char') == ['char:arm_ctrl']
+    assert controlregistry.get_registered_controls(matcher, namespace='prop') is None
@@ -0,0 +1,54 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpRigToolkit-libs-controlrig scene controls cache
+"""
+
+from tpRigToolkit.libs.controlrig.core import controlscache
+
+
+def test_controls_cache_is_invalidated():
+    cache = controlscache.ControlsCache()
+    assert cache.get('', 'rules') is None
+
+    cache.put('', 'rules', ['arm_ctrl'])
+    controls = cache.get('', 'rules')
+    controls.append('leg_ctrl')
+    assert cache.get('', 'rules') == ['arm_ctrl']
+    assert cache.get('char', 'rules') is None
+
+    # Callbacks arguments are ignored
+    cache.invalidate(object(), 'old_name', None)
+    assert cache.get('', 'rules') is None
+    assert cache.stats() == {'hits': 2, 'misses': 3, 'size': 0, 'max_size': 32, 'invalidations': 1}
+
+
+def test_controls_cache_generation_changes_when_results_are_discarded():
+    cache = controlscache.ControlsCache()
+    generation = cache.generation
+
+    cache.put('', 'rules', ['arm_ctrl'])
+    cache.get('', 'rules')
+    assert cache.generation == generation
+
+    cache.invalidate()
+    assert cache.generation != generation
+
+    # Clearing resets counters but must not give back a generation a running lookup may have recorded
+    generation = cache.generation
+    cache.clear()
+    assert cache.generation != generation
+    assert cache.invalidations == 0
+
+
+def test_controls_cache_discards_results_stored_with_other_state():
+    cache = controlscache.ControlsCache()
+
+    cache.put('', 'rules', ['arm_ctrl'], state=(('tag', ()),))
+    assert cache.get('', 'rules', state=(('tag', ()),)) == ['arm_ctrl']
+
+    # Tag added to an existing node without adding or renaming any node
+    assert cache.get('', 'rules', state=(('tag', (('leg_ctrl', True),)),)) is None
+    assert cache.get('', 'rules', state=(('tag', ()),)) is None
+    assert cache.stats()['hits'] == 1
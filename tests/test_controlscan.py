@@ -0,0 +1,80 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpRigToolkit-libs-controlrig Maya bulk controls scan
+"""
+
+import pytest
+
+
+@pytest.fixture
+def cmds(maya_scene):
+    maya_scene.add_control('arm_ctrl')
+    maya_scene.add_node('arm_offset', control=True)
+    maya_scene.add_node('spine', 'joint', control=True)
+    maya_scene.add_control('pose_ctrl', POSE=True)
+    maya_scene.add_control('char:hand_ctrl')
+    maya_scene.add_node('char:foot', tag='')
+    maya_scene.add_node('char:footShape', 'nurbsSurface', parent='char:foot')
+    for i in range(200):
+        maya_scene.add_node('grp{}'.format(i))
+
+    return maya_scene
+
+
+def test_bulk_scan_finds_controls(cmds):
+    from tpRigToolkit.libs.controlrig.dccs.maya import controlscan
+
+    assert sorted(controlscan.find_controls()) == ['arm_ctrl', 'spine']
+    # Number of queries does not depend on the number of nodes of the scene
+    assert cmds.calls <= 10
+    assert controlscan.find_controls(namespace='char') == ['char:hand_ctrl']
+
+    cmds.node('char:foot').attributes['tag'] = 'leg'
+    assert controlscan.find_controls(namespace='char') == ['char:foot']
+
+
+def test_referenced_controls_are_found_once_per_file(cmds):
+    from tpRigToolkit.libs.controlrig.dccs.maya import controlscan
+
+    for namespace in ('char01', 'char02'):
+        cmds.add_control('{}:hand_ctrl'.format(namespace))
+        cmds.add_node('{}:grp'.format(namespace))
+    cmds.references = {'/rigs/char.ma': 'char01', '/rigs/char.ma{1}': 'char02'}
+
+    assert controlscan.find_controls(namespace='char01') == ['char01:hand_ctrl']
+    cmds.calls = 0
+    assert controlscan.find_controls(namespace='char02') == ['char02:hand_ctrl']
+    # Only reference queries and a single existence query are needed
+    assert cmds.calls == 7
+
+
+def test_referenced_controls_are_found_again_after_reference_edits(cmds):
+    from tpRigToolkit.libs.controlrig.dccs.maya import controlscan
+
+    for namespace in ('char01', 'char02'):
+        cmds.add_control('{}:hand_ctrl'.format(namespace))
+        cmds.add_node('{}:foot'.format(namespace))
+    cmds.references = {'/rigs/char.ma': 'char01', '/rigs/char.ma{1}': 'char02'}
+
+    assert controlscan.find_controls(namespace='char01') == ['char01:hand_ctrl']
+
+    # Tag added from the parent scene to a node of the second reference only
+    cmds.node('char02:foot').attributes['tag'] = 'leg'
+    cmds.edits['/rigs/char.ma{1}'] = ['addAttr -ln "tag" -dt "string" char02:foot', 'setAttr char02:foot.tag "leg"']
+    assert controlscan.find_controls(namespace='char02') == ['char02:foot']
+    assert controlscan.find_controls(namespace='char01') == ['char01:hand_ctrl']
+
+
+def test_profiled_scan_reports_phases_and_calls(cmds):
+    from tpRigToolkit.libs.controlrig.core.profiler import ScanProfiler
+    from tpRigToolkit.libs.controlrig.dccs.maya import controlscan
+
+    profiler = ScanProfiler()
+    assert sorted(controlscan.find_controls(profiler=profiler)) == ['arm_ctrl', 'spine']
+
+    report = profiler.report()
+    assert list(report['phases']) == ['references', 'snapshot', 'match']
+    assert report['calls']['listRelatives']['count'] == 2
+    assert report['calls']['check_name']['count'] > 200
@@ -0,0 +1,44 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpRigToolkit-libs-controlrig aggregated libraries streaming
+"""
+
+import os
+import json
+
+import pytest
+
+from tpRigToolkit.libs.controlrig.core import libstream
+
+DATA_PATH = os.path.join(os.path.dirname(libstream.__file__), os.pardir, 'data.json')
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, libstream.DEFAULT_CHUNK_SIZE])
+def test_iter_library_controls(chunk_size):
+    with open(DATA_PATH) as fh:
+        expected = json.load(fh)['controls']
+
+    controls = list(libstream.iter_library_controls(DATA_PATH, chunk_size=chunk_size))
+    assert [name for name, _ in controls] == list(expected)
+    assert dict(controls) == expected
+
+
+def test_load_library_control(tmp_path):
+    file_path = str(tmp_path / 'library.json')
+    data = {
+        'version': 1.5, 'categories': [{'name': 'a "quoted" {name}', 'controls': ['dot']}],
+        'controls': {'line': [{'cvs': [[0, 0, 0], [1, 0, 0]], 'degree': 1, 'periodic': 0}], 'dot': []}}
+    with open(file_path, 'w') as fh:
+        json.dump(data, fh)
+
+    assert libstream.load_library_control(file_path, 'dot', chunk_size=3) == []
+    assert libstream.load_library_control(file_path, 'line', chunk_size=3) == data['controls']['line']
+    assert libstream.load_library_control(file_path, 'missing', chunk_size=3) is None
+    assert list(libstream.iter_library_section(file_path, section='missing')) == []
+
+
+def test_load_library_section():
+    assert libstream.load_library_section(DATA_PATH, 'categories') == []
+    assert libstream.load_library_section(DATA_PATH, 'missing', default={}) == {}
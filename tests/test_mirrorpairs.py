@@ -0,0 +1,73 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpRigToolkit-libs-controlrig mirror pairs
+"""
+
+from collections import OrderedDict
+
+from tpRigToolkit.libs.controlrig.core import mirrorpairs
+
+
+def test_side_tokens_find_opposite_names():
+    side_tokens = mirrorpairs.SideTokens()
+
+    assert list(side_tokens.iter_mirror_names('char:L_arm_ctrl')) == [('char:R_arm_ctrl', mirrorpairs.LEFT)]
+    assert [name for name, _ in side_tokens.iter_mirror_names('arm_l')] == ['arm_r']
+    assert [name for name, _ in side_tokens.iter_mirror_names('arm_RIGHT_ctrl')] == ['arm_LEFT_ctrl']
+    assert [name for name, _ in side_tokens.iter_mirror_names('armLeft_ctrl')] == ['armRight_ctrl']
+    assert side_tokens.get_side('Rt_leg_ctrl') == mirrorpairs.RIGHT
+    assert side_tokens.get_side('Leftover_ctrl') is None
+    assert side_tokens.get_side('clavicle_ctrl') is None
+
+    custom_tokens = mirrorpairs.SideTokens(tokens=[('Gauche', 'Droite')], separators=['-'], use_defaults=False)
+    assert [name for name, _ in custom_tokens.iter_mirror_names('bras-gauche')] == ['bras-droite']
+    assert mirrorpairs.SideTokens.from_value(custom_tokens) is custom_tokens
+    assert mirrorpairs.SideTokens.from_value() == mirrorpairs.SideTokens()
+
+
+def test_pair_table_resolves_all_controls_at_once():
+    controls = [
+        'L_arm_ctrl', 'R_arm_ctrl', 'R_leg_ctrl', 'spine_ctrl', '|L_hand_grp|L_hand_ctrl', '|R_hand_grp|R_hand_ctrl',
+        'L_eye_ctrl', 'L_arm_ctrl']
+    pair_table = mirrorpairs.build_pair_table(controls)
+
+    assert dict(pair_table.pairs) == {
+        'L_arm_ctrl': 'R_arm_ctrl', '|L_hand_grp|L_hand_ctrl': '|R_hand_grp|R_hand_ctrl'}
+    assert pair_table.unmatched == ['R_leg_ctrl', 'L_eye_ctrl']
+    assert pair_table.centered == ['spine_ctrl']
+    assert len(pair_table) == 2
+
+
+def test_position_pair_table_reports_unresolved_controls():
+    positions = OrderedDict([
+        ('arm_a', (2.0, 1.0, 0.0)), ('arm_b', (-2.0005, 1.0, 0.0)), ('head', (0.0, 5.0, 0.0)),
+        ('eye_a', (1.0, 4.0, 1.0)), ('eye_b', (-1.0, 4.0, 1.0)), ('eye_c', (-1.0, 4.0, 1.0005)),
+        ('leg_a', (1.0, -1.0, 0.0)), ('leg_b', (-1.0, -2.0, 0.0))])
+    pair_table = mirrorpairs.build_position_pair_table(positions, mirror_axis='x', tolerance=0.001)
+
+    assert dict(pair_table.pairs) == {'arm_a': 'arm_b'}
+    assert pair_table.centered == ['head']
+    assert dict(pair_table.ambiguous) == {'eye_a': ['eye_b', 'eye_c']}
+    assert pair_table.unmatched == ['leg_a', 'leg_b']
+
+    merged = mirrorpairs.build_pair_table(['L_hand_ctrl', 'R_hand_ctrl', 'arm_a']).merge(pair_table)
+    assert list(merged.pairs) == ['L_hand_ctrl', 'arm_a']
+
+
+def test_from_and_to_names_are_used_to_pair():
+    controls = ['brasGauche_ctrl', 'brasDroite_ctrl', 'L_arm_ctrl', 'R_arm_ctrl']
+
+    assert list(mirrorpairs.build_pair_table(controls).pairs) == ['L_arm_ctrl']
+
+    side_tokens = mirrorpairs.SideTokens.from_value(from_name='Gauche', to_name='Droite')
+    assert dict(mirrorpairs.build_pair_table(controls, side_tokens=side_tokens).pairs) == {
+        'brasGauche_ctrl': 'brasDroite_ctrl', 'L_arm_ctrl': 'R_arm_ctrl'}
+    assert side_tokens.get_side('brasDroite_ctrl') == mirrorpairs.RIGHT
+
+    custom_tokens = mirrorpairs.SideTokens(tokens=[('G', 'D')], separators=['_'], use_defaults=False)
+    side_tokens = mirrorpairs.SideTokens.from_value(custom_tokens, from_name='Gauche', to_name='Droite')
+    assert side_tokens != custom_tokens
+    assert dict(mirrorpairs.build_pair_table(controls + ['G_leg', 'D_leg'], side_tokens=side_tokens).pairs) == {
+        'brasGauche_ctrl': 'brasDroite_ctrl', 'G_leg': 'D_leg'}
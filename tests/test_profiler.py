@@ -0,0 +1,42 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpRigToolkit-libs-controlrig lookups profiler
+"""
+
+from tpRigToolkit.libs.controlrig.core import controlmatcher
+from tpRigToolkit.libs.controlrig.core.profiler import ScanProfiler, profile_phase
+
+
+def test_profiler_records_phases_and_calls():
+    profiler = ScanProfiler('lookup')
+
+    with profiler.phase('scan'):
+        pass
+    with profile_phase(profiler, 'scan'):
+        pass
+    with profile_phase(None, 'ignored'):
+        pass
+    assert list(profiler.iter_phase('match', [1, 2, 3])) == [1, 2, 3]
+
+    add = profiler.wrap('add', lambda a, b: a + b)
+    assert add(1, 2) == 3
+    assert add(2, 2) == 4
+
+    report = profiler.report()
+    assert report['name'] == 'lookup'
+    assert list(report['phases']) == ['scan', 'match']
+    assert report['calls']['add']['count'] == 2
+    assert 'call add: 2 calls' in profiler.format_report()
+
+
+def test_profiled_matcher_counts_name_checks():
+    profiler = ScanProfiler()
+    matcher = controlmatcher.ControlMatcher()
+    profiled_matcher = profiler.wrap_matcher(matcher)
+
+    assert profiled_matcher == matcher
+    profiled_matcher.check_name('arm_ctrl')
+    matcher.check_name('arm_ctrl')
+    assert profiler.report()['calls']['check_name']['count'] == 1
@@ -0,0 +1,38 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpRigToolkit-libs-controlrig control shape data types
+"""
+
+import os
+
+from tpRigToolkit.libs.controlrig.core import shapelib
+from tpRigToolkit.libs.controlrig.core.shape import ControlShape, ControlShapeSet
+
+
+def test_shape_set_round_trip():
+    shapes = shapelib.read_control_file(os.path.join(shapelib.get_default_controls_path(), 'hand.control'))
+    shape_set = ControlShapeSet.from_data({'hand': shapes})
+    assert shape_set.name == 'hand'
+    assert len(shape_set) == len(shapes)
+    assert shape_set.cv_count == sum(len(shape['cvs']) for shape in shapes)
+    assert shape_set.to_data() == {'hand': shapes}
+    assert ControlShapeSet.from_data(shape_set) is shape_set
+    assert shape_set.copy() == shape_set
+
+
+def test_shape_slots():
+    shape = ControlShape([[0, 0, 0], [1, 2, 3]], degree=1)
+    assert list(shape.iter_cvs()) == [(0.0, 0.0, 0.0), (1.0, 2.0, 3.0)]
+    assert not hasattr(shape, '__dict__')
+    assert not hasattr(ControlShapeSet(), '__dict__')
+
+
+def test_library_shape_set(tmp_path):
+    controls_path = shapelib.get_default_controls_path()
+    library = shapelib.ControlShapeLibrary(shapelib.pack_library(
+        [(name, shapelib.read_control_file(path)) for name, path in shapelib.iter_control_files(controls_path)],
+        precision='float64'))
+    for name, path in shapelib.iter_control_files(controls_path):
+        assert library.shape_set(name) == ControlShapeSet.from_data(shapelib.read_control_file(path))
@@ -0,0 +1,54 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpRigToolkit-libs-controlrig shapes cache
+"""
+
+import os
+import json
+
+from tpRigToolkit.libs.controlrig.core import shapecache
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = shapecache.LRUCache(max_size=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert 'b' not in cache
+    assert cache.get('b') is None
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'size': 2, 'max_size': 2}
+
+
+def test_control_data_is_invalidated_on_file_change(tmp_path):
+    control_path = str(tmp_path / 'dot.control')
+    shape = {'cvs': [[0.0, 0.0, 0.0], [1.0, 0.0, 0.0]], 'degree': 1, 'periodic': 0}
+    with open(control_path, 'w') as fh:
+        json.dump({'dot': [shape]}, fh)
+
+    hits = shapecache.cache_stats()['hits']
+    data = shapecache.get_control_data('dot', str(tmp_path))
+    assert data['dot'][0]['cvs'] == shape['cvs']
+    shapes = shapecache.get_control_shapes('dot', str(tmp_path))
+    assert shapecache.get_control_shapes('dot', str(tmp_path)) is shapes
+    assert shapecache.cache_stats()['hits'] == hits + 2
+
+    shape['cvs'].append([2.0, 0.0, 0.0])
+    with open(control_path, 'w') as fh:
+        json.dump({'dot': [shape]}, fh)
+    os.utime(control_path, (os.path.getmtime(control_path) + 10,) * 2)
+    assert len(shapecache.get_control_data('dot', str(tmp_path))['dot'][0]['cvs']) == 3
+
+
+def test_transformed_shapes_are_memoized(tmp_path):
+    control_path = str(tmp_path / 'dot.control')
+    with open(control_path, 'w') as fh:
+        json.dump({'dot': [{'cvs': [[1.0, 0.0, 0.0], [2.0, 0.0, 0.0]], 'degree': 1, 'periodic': 0}]}, fh)
+
+    transformed = shapecache.get_transformed_shapes('dot', str(tmp_path), control_size=2, rotate_offset=(0, 0, 90))
+    assert [round(value, 6) for value in transformed.cvs] == [0.0, 2.0, 0.0, 0.0, 4.0, 0.0]
+    assert shapecache.get_transformed_shapes(
+        'dot', str(tmp_path), control_size=2.0, rotate_offset=(0.0, 0.0, 90.0)) is transformed
+    assert shapecache.get_transformed_shapes('dot', str(tmp_path), control_size=3.0) is not transformed
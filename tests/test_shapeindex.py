@@ -0,0 +1,68 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpRigToolkit-libs-controlrig controls index
+"""
+
+import os
+
+from tpRigToolkit.libs.controlrig.core import shapeindex
+
+
+def test_index_refreshes_on_directory_changes(tmp_path):
+    index = shapeindex.ControlsIndex(str(tmp_path))
+    assert index.names() == []
+
+    (tmp_path / 'circle.control').write_text(u'{}')
+    (tmp_path / 'notes.txt').write_text(u'')
+    os.utime(str(tmp_path), (1, 1))
+    assert index.find_path('circle') == os.path.join(str(tmp_path), 'circle.control')
+    assert 'notes' not in index
+
+    (tmp_path / 'circle.control').unlink()
+    os.utime(str(tmp_path), (2, 2))
+    assert not index.has_control('circle')
+    assert not index.refresh()
+
+
+def test_index_finds_controls_in_subdirectories(tmp_path):
+    (tmp_path / 'arms').mkdir()
+    (tmp_path / 'arms' / 'hand.control').write_text(u'{}')
+    (tmp_path / 'arms' / 'circle.control').write_text(u'{}')
+    (tmp_path / 'circle.control').write_text(u'{}')
+
+    index = shapeindex.ControlsIndex(str(tmp_path))
+    assert index.find_path('hand') == os.path.join(str(tmp_path), 'arms', 'hand.control')
+    assert index.find_path('circle') == os.path.join(str(tmp_path), 'circle.control')
+
+    # Changes in subdirectories do not change the modification time of the controls directory
+    (tmp_path / 'arms' / 'legs').mkdir()
+    (tmp_path / 'arms' / 'legs' / 'foot.control').write_text(u'{}')
+    os.utime(str(tmp_path / 'arms'), (1, 1))
+    assert 'foot' in index
+    assert not index.refresh()
+
+
+def test_default_index_contains_shipped_controls():
+    assert shapeindex.get_index() is shapeindex.get_index()
+    assert 'circle' in shapeindex.get_index()
+
+
+def test_search_path_later_layers_shadow_previous_ones(tmp_path):
+    studio_path = tmp_path / 'studio'
+    show_path = tmp_path / 'show'
+    for controls_path in (studio_path, show_path):
+        controls_path.mkdir()
+        (controls_path / 'circle.control').write_text(u'{}')
+    (studio_path / 'arrow.control').write_text(u'{}')
+
+    search_path = shapeindex.get_index([str(studio_path), str(show_path)])
+    assert search_path.find_path('circle') == os.path.join(str(show_path), 'circle.control')
+    assert search_path.find_path('arrow') == os.path.join(str(studio_path), 'arrow.control')
+    assert list(search_path.shadowed()) == ['circle']
+
+    (show_path / 'circle.control').unlink()
+    os.utime(str(show_path), (1, 1))
+    assert search_path.find_path('circle') == os.path.join(str(studio_path), 'circle.control')
+    assert not search_path.shadowed()
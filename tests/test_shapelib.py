@@ -0,0 +1,90 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpRigToolkit-libs-controlrig compiled shapes library
+"""
+
+import os
+import shutil
+
+import pytest
+
+from tpRigToolkit.libs.controlrig.core import shapelib, shapetransform
+
+
+@pytest.fixture
+def controls_path(tmp_path):
+    for name in ('circle', 'cube', 'hand'):
+        file_name = '{}.control'.format(name)
+        shutil.copy(os.path.join(shapelib.get_default_controls_path(), file_name), str(tmp_path / file_name))
+    return str(tmp_path)
+
+
+def test_compile_library(controls_path):
+    library_path = shapelib.compile_library(controls_path, precision='float64')
+    library = shapelib.ControlShapeLibrary.from_file(library_path)
+    assert library.names() == ['circle', 'cube', 'hand']
+    assert library.shapes_data('hand') == shapelib.read_control_file(os.path.join(controls_path, 'hand.control'))
+    assert library.control_data('missing') is None
+
+
+def test_get_library_recompiles_outdated(controls_path):
+    library = shapelib.get_library(controls_path)
+    assert library.has_control('circle')
+    assert shapelib.get_library(controls_path) is library
+    assert not [name for name in os.listdir(controls_path) if not name.endswith('.control')]
+
+    # Loaded libraries are checked on every call and replaced ones are still readable
+    view = library.cvs_view('circle')
+    arrow_path = os.path.join(shapelib.get_default_controls_path(), 'arrow.control')
+    shutil.copy(arrow_path, os.path.join(controls_path, 'arrow.control'))
+    new_library = shapelib.get_library(controls_path)
+    assert new_library.has_control('arrow')
+    assert not library.closed
+    assert float(view[0][0] if hasattr(view, 'reshape') else view[0]) == library.shapes_data('circle')[0]['cvs'][0][0]
+
+    os.remove(os.path.join(controls_path, 'cube.control'))
+    assert not shapelib.get_library(controls_path).has_control('cube')
+    assert shapelib.is_library_outdated(controls_path) is False
+
+
+def test_cvs_view_is_read_only(controls_path):
+    library = shapelib.ControlShapeLibrary.from_file(shapelib.compile_library(controls_path, precision='float64'))
+    view = library.cvs_view('circle')
+    values = [value for cv in library.shapes_data('circle')[0]['cvs'] for value in cv]
+    assert [float(value) for value in (view.reshape(-1) if hasattr(view, 'reshape') else view)] == values
+    with pytest.raises((TypeError, ValueError)):
+        view[0] = 1.0
+    assert library.cvs_view('circle', shape_index=1) is None
+    del view
+    library.close()
+    assert library.closed
+
+
+def test_truncated_library_is_compiled_again(controls_path):
+    library_path = shapelib.compile_library(controls_path)
+    assert not [name for name in os.listdir(controls_path) if name.endswith('.tmp')]
+    with open(library_path, 'rb') as fh:
+        data = fh.read()
+
+    for size in (40, len(data) // 2):
+        with pytest.raises(ValueError):
+            shapelib.ControlShapeLibrary(data[:size])
+
+    with open(library_path, 'wb') as fh:
+        fh.write(data[:40])
+    library = shapelib.get_library(controls_path, force=True)
+    assert library.names() == ['circle', 'cube', 'hand']
+    library.close()
+
+
+def test_cvs_view_can_be_transformed(controls_path):
+    library = shapelib.ControlShapeLibrary.from_file(shapelib.compile_library(controls_path))
+    matrix = shapetransform.compose_matrix(control_size=2.0, translate_offset=(1.0, 0.0, 0.0))
+    view = library.cvs_view('circle')
+
+    expected = shapetransform.transform_cvs(library.shape_set('circle').cvs, matrix)
+    assert shapetransform.transform_cvs(view, matrix) == expected
+    del view
+    library.close()
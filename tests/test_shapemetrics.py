@@ -0,0 +1,54 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpRigToolkit-libs-controlrig shapes metadata
+"""
+
+import math
+
+from tpRigToolkit.libs.controlrig.core import shapelib, shapemetrics
+from tpRigToolkit.libs.controlrig.core.shape import ControlShapeSet
+
+
+def test_metadata_is_computed_from_curves():
+    square = {'cvs': [[1, 0, 1], [-1, 0, 1], [-1, 0, -1], [1, 0, -1]], 'degree': 1, 'periodic': 1}
+    bezier = {'cvs': [[0, 0, 0], [0, 3, 0], [6, 3, 0], [6, 0, 0]], 'degree': 3, 'periodic': 0}
+
+    metadata = shapemetrics.compute_metadata(ControlShapeSet.from_shapes([square]))
+    assert metadata.extents == (2.0, 0.0, 2.0)
+    assert metadata.arc_length == 8.0
+    assert (metadata.cv_count, metadata.span_count) == (4, 4)
+    assert metadata.scaled_size(2.0, (1.0, 1.0, 0.5)) == math.sqrt(20.0)
+
+    # Bounding box encloses the CVs, as the one Maya reports for NURBS curves, but arc length follows the curve
+    metadata = shapemetrics.compute_metadata(ControlShapeSet.from_shapes([bezier]))
+    assert metadata.bbox_max[1] == 3.0
+    assert metadata.arc_length < 12.0
+    assert metadata.span_count == 1
+
+
+def test_metadata_bounding_box_matches_cvs_extents():
+    control_files = dict(shapelib.iter_control_files(shapelib.get_default_controls_path()))
+    for control_name in ('circle', 'hand'):
+        shapes = shapelib.read_control_file(control_files[control_name])
+        cvs = [cv for shape in shapes for cv in shape['cvs']]
+        metadata = shapemetrics.compute_metadata(ControlShapeSet.from_data(shapes))
+        for axis in range(3):
+            assert abs(metadata.bbox_min[axis] - min(cv[axis] for cv in cvs)) < 1e-9
+            assert abs(metadata.bbox_max[axis] - max(cv[axis] for cv in cvs)) < 1e-9
+
+
+def test_library_stores_metadata():
+    circle = shapelib.read_control_file(_circle_path())
+    library = shapelib.ControlShapeLibrary(shapelib.pack_library([('circle', circle)], precision='float64'))
+    expected = shapemetrics.compute_metadata(ControlShapeSet.from_data(circle))
+
+    metadata = library.metadata('circle')
+    assert metadata.span_count == expected.span_count
+    assert abs(metadata.size - expected.size) < 1e-9
+    assert library.metadata('missing') is None
+
+
+def _circle_path():
+    return dict(shapelib.iter_control_files(shapelib.get_default_controls_path()))['circle']
@@ -0,0 +1,49 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpRigToolkit-libs-controlrig shapes transforms
+"""
+
+from array import array
+
+from tpRigToolkit.libs.controlrig.core import shapetransform
+from tpRigToolkit.libs.controlrig.core.shape import ControlShapeSet
+
+
+def _transformed_cvs(cvs, **kwargs):
+    shape_set = ControlShapeSet.from_shapes([{'cvs': cvs, 'degree': 1, 'periodic': 0}])
+    result = shapetransform.transform_shapes(shape_set, **kwargs)
+    return [[round(value, 6) for value in cv] for cv in result.shape(0).iter_cvs()]
+
+
+def test_compose_matrix_applies_parameters_in_order():
+    cvs = [[1.0, 2.0, 3.0], [0.0, 0.0, 0.0]]
+
+    assert _transformed_cvs(cvs, control_size=2.0, scale=(1.0, 0.5, 1.0)) == [[2.0, 2.0, 6.0], [0.0, 0.0, 0.0]]
+    assert _transformed_cvs(cvs, axis_order='ZXY') == [[3.0, 1.0, 2.0], [0.0, 0.0, 0.0]]
+    assert _transformed_cvs(cvs, mirror='x', translate_offset=(1.0, 0.0, 0.0)) == [[0.0, 2.0, 3.0], [1.0, 0.0, 0.0]]
+
+    # Rotation is applied last, around the control origin
+    assert _transformed_cvs(
+        [[1.0, 0.0, 0.0]], translate_offset=(0.0, 1.0, 0.0), rotate_offset=(0.0, 0.0, 90.0)) == [[-1.0, 1.0, 0.0]]
+    assert _transformed_cvs([[1.0, 0.0, 0.0]], rotate_offset=(0.0, 90.0, 0.0)) == [[0.0, 0.0, -1.0]]
+
+
+def test_identity_parameters_return_same_shapes():
+    shape_set = ControlShapeSet.from_shapes([{'cvs': [[1.0, 2.0, 3.0]], 'degree': 1, 'periodic': 0}])
+
+    assert shapetransform.transform_shapes(shape_set) is shape_set
+    transformed = shapetransform.transform_shapes(shape_set, control_size=2.0)
+    assert transformed.offsets is shape_set.offsets
+    assert list(shape_set.cvs) == [1.0, 2.0, 3.0]
+
+
+def test_mirror_around_pivot_and_inverse_matrix():
+    matrix = shapetransform.mirror_matrix('X', pivot=(2.0, 0.0, 0.0))
+    assert shapetransform.transform_cvs(array('d', [3.0, 1.0, 0.0]), matrix).tolist() == [1.0, 1.0, 0.0]
+
+    matrix = shapetransform.compose_matrix(
+        control_size=2.0, translate_offset=(1.0, 2.0, 3.0), rotate_offset=(30.0, 45.0, 60.0))
+    identity = shapetransform.multiply_matrices(matrix, shapetransform.invert_matrix(matrix))
+    assert [[round(value, 6) for value in row] for row in identity] == [list(row) for row in shapetransform.IDENTITY]
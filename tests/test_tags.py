@@ -0,0 +1,37 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpRigToolkit-libs-controlrig controls tags
+"""
+
+import json
+
+from tpRigToolkit.libs.controlrig.core import tags
+
+
+def test_tag_index_queries():
+    tag_index = tags.TagIndex()
+    tag_index.add('arrow_3D', ['arrow', '3D'])
+    tag_index.add('arrow', ['arrow', '2d'])
+    tag_index.add('cube', ['cube', '3d'])
+
+    assert tag_index.intersection('arrow', '3d') == {'arrow_3D'}
+    assert tag_index.union('arrow', 'cube') == {'arrow', 'arrow_3D', 'cube'}
+    assert tag_index.query(any_of=['3d'], none_of=['arrow']) == {'cube'}
+    assert tag_index.query(none_of=['3d']) == {'arrow'}
+
+    tag_index.remove('cube')
+    assert 'cube' not in tag_index.tags()
+
+
+def test_controls_tag_index(tmp_path):
+    data_path = str(tmp_path / 'data.json')
+    with open(data_path, 'w') as fh:
+        json.dump({'categories': [{'name': 'Body', 'controls': ['circle', 'missing']}], 'controls': {}}, fh)
+
+    arrows_3d = tags.find_controls(all_of=['3d', 'arrow'], data_path=data_path)
+    assert 'arrow_3D' in arrows_3d and 'arrow_style_3D' in arrows_3d
+    assert 'arrow' not in arrows_3d
+    assert tags.find_controls(all_of=['body'], data_path=data_path) == ['circle']
+    assert tags.get_tag_index(data_path=data_path) is tags.get_tag_index(data_path=data_path)
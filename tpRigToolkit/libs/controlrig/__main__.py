@@ -0,0 +1,89 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Command line entry point for tpRigToolkit-libs-controlrig
+Usage:
+    python -m tpRigToolkit.libs.controlrig validate [controls_path ...] [--jobs N]
+    python -m tpRigToolkit.libs.controlrig compile [controls_path ...] [--jobs N] [--precision float32|float64]
+    python -m tpRigToolkit.libs.controlrig duplicates [controls_path ...] [--jobs N] [--tolerance T]
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import sys
+import argparse
+
+from tpRigToolkit.libs.controlrig.core import shapelib, compiler
+from tpRigToolkit.libs.controlrig.core.shape import HASH_TOLERANCE
+
+
+def main(args=None):
+    """
+    Runs the command line interface
+    :param args: list(str) or None, command line arguments. If not given, sys.argv is used
+    :return: int, exit code; 1 if any control file is not valid or, for duplicates command, if duplicates are found
+    """
+
+    parser = argparse.ArgumentParser(
+        prog='python -m tpRigToolkit.libs.controlrig', description='Validates and compiles control libraries')
+    subparsers = parser.add_subparsers(dest='command')
+    for command_name, command_help in (
+            ('validate', 'Validates all control files of the given directories'),
+            ('compile', 'Validates and compiles all control files of the given directories'),
+            ('duplicates', 'Reports controls with the same shapes across the given directories')):
+        command_parser = subparsers.add_parser(command_name, help=command_help)
+        command_parser.add_argument(
+            'controls_paths', nargs='*', help='Controls directories. Library controls directory is used by default')
+        command_parser.add_argument(
+            '-j', '--jobs', type=int, default=None, help='Number of processes to use. Defaults to one per CPU')
+        if command_name == 'compile':
+            command_parser.add_argument(
+                '-p', '--precision', choices=sorted(shapelib.PRECISIONS), default='float32',
+                help='Precision used to store CVs')
+            command_parser.add_argument(
+                '-o', '--output', default=None, help='Compiled library path. Only valid with a single directory')
+        elif command_name == 'duplicates':
+            command_parser.add_argument(
+                '-t', '--tolerance', type=float, default=HASH_TOLERANCE, help='CVs closer than this are equal')
+
+    parsed_args = parser.parse_args(args)
+    if not parsed_args.command:
+        parser.print_help()
+        return 1
+
+    controls_paths = parsed_args.controls_paths or [shapelib.get_default_controls_path()]
+    if parsed_args.command == 'duplicates':
+        groups = compiler.find_duplicate_controls(
+            controls_paths, tolerance=parsed_args.tolerance, max_workers=parsed_args.jobs)
+        for group in groups:
+            print('{}:'.format(group[0].name))
+            for report in group:
+                print('    {}'.format(report.path))
+        print('{} groups of duplicated controls found'.format(len(groups)))
+        return 1 if groups else 0
+
+    compile_libraries = parsed_args.command == 'compile'
+    try:
+        result = compiler.compile_libraries(
+            controls_paths, output_path=getattr(parsed_args, 'output', None),
+            precision=getattr(parsed_args, 'precision', 'float32'), max_workers=parsed_args.jobs,
+            write=compile_libraries)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    invalid_count = 0
+    for controls_path in controls_paths:
+        reports = result[controls_path]
+        invalid = [report for report in reports if not report.valid]
+        invalid_count += len(invalid)
+        print('{}: {} valid, {} invalid'.format(controls_path, len(reports) - len(invalid), len(invalid)))
+        for report in invalid:
+            for error in report.errors:
+                print('    {}: {}'.format(report.name, error))
+
+    return 1 if invalid_count else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
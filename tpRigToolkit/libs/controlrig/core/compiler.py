@@ -0,0 +1,198 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains functions to validate and compile control files in parallel
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import os
+import math
+import logging
+import multiprocessing
+
+try:
+    from concurrent.futures import ProcessPoolExecutor
+except ImportError:
+    ProcessPoolExecutor = None
+
+from tpRigToolkit.libs.controlrig.core import shapelib
+from tpRigToolkit.libs.controlrig.core.shape import ControlShapeSet, HASH_TOLERANCE
+
+LOGGER = logging.getLogger('tpRigToolkit-libs-controlrig')
+
+PERIODIC_VALUES = (0, 1, 2)
+
+
+class ControlFileReport(object):
+    """
+    Class that stores the result of checking a single control file
+    """
+
+    __slots__ = ('name', 'path', 'shapes', 'errors')
+
+    def __init__(self, name, path, shapes=None, errors=None):
+        self.name = name
+        self.path = path
+        self.shapes = shapes
+        self.errors = errors or list()
+
+    @property
+    def valid(self):
+        """
+        Returns whether or not the control file passed all checks
+        :return: bool
+        """
+
+        return not self.errors
+
+
+def validate_shapes(shapes):
+    """
+    Checks that given shapes data follows the control files schema and that their curves are valid
+    :param shapes: list(dict), shapes data with the layout used by control files
+    :return: list(str), list of errors found; empty if shapes are valid
+    """
+
+    if not isinstance(shapes, list) or not shapes:
+        return ['Shapes must be a non empty list']
+
+    errors = list()
+    for i, shape in enumerate(shapes):
+        if not isinstance(shape, dict):
+            errors.append('Shape {}: must be a dictionary'.format(i))
+            continue
+        missing = [key for key in ('cvs', 'degree', 'periodic') if key not in shape]
+        if missing:
+            errors.append('Shape {}: missing keys {}'.format(i, ', '.join(missing)))
+            continue
+        degree = shape['degree']
+        if not isinstance(degree, int) or isinstance(degree, bool) or degree < 1:
+            errors.append('Shape {}: invalid degree {!r}'.format(i, degree))
+            continue
+        if shape['periodic'] not in PERIODIC_VALUES:
+            errors.append('Shape {}: invalid periodic flag {!r}'.format(i, shape['periodic']))
+        cvs = shape['cvs']
+        if not isinstance(cvs, list):
+            errors.append('Shape {}: CVs must be a list'.format(i))
+            continue
+        if len(cvs) < degree + 1:
+            errors.append('Shape {}: {} CVs are not enough for a degree {} curve'.format(i, len(cvs), degree))
+        for j, cv in enumerate(cvs):
+            if not isinstance(cv, (list, tuple)) or len(cv) != 3:
+                errors.append('Shape {}: CV {} must be a list of 3 values'.format(i, j))
+                break
+            try:
+                finite = all(not math.isnan(value) and not math.isinf(value) for value in cv)
+            except TypeError:
+                errors.append('Shape {}: CV {} has non numeric values'.format(i, j))
+                break
+            if not finite:
+                errors.append('Shape {}: CV {} has NaN or infinite values'.format(i, j))
+                break
+
+    return errors
+
+
+def check_control_file(file_path):
+    """
+    Parses and validates given control file
+    :param file_path: str
+    :return: ControlFileReport
+    """
+
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    try:
+        shapes = shapelib.read_control_file(file_path)
+    except (IOError, OSError, ValueError, AttributeError) as exc:
+        return ControlFileReport(name, file_path, errors=['Impossible to read control file: {}'.format(exc)])
+
+    errors = validate_shapes(shapes)
+    if errors:
+        return ControlFileReport(name, file_path, errors=errors)
+
+    return ControlFileReport(name, file_path, shapes=ControlShapeSet.from_data(shapes, name=name))
+
+
+def check_control_files(file_paths, max_workers=None):
+    """
+    Parses and validates given control files, spreading the work across a pool of processes
+    :param file_paths: list(str)
+    :param max_workers: int or None, number of processes to use. If not given, one per CPU is used. If 1, files are
+        checked in the current process
+    :return: list(ControlFileReport), reports in the same order as the given files
+    """
+
+    file_paths = list(file_paths)
+    if max_workers == 1 or len(file_paths) < 2 or ProcessPoolExecutor is None:
+        return [check_control_file(file_path) for file_path in file_paths]
+
+    max_workers = max_workers or multiprocessing.cpu_count()
+    chunk_size = max(1, len(file_paths) // (max_workers * 4))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(check_control_file, file_paths, chunksize=chunk_size))
+
+
+def find_duplicate_controls(controls_paths, tolerance=HASH_TOLERANCE, max_workers=None):
+    """
+    Returns groups of controls whose shapes are the same, within the given tolerance, across the given directories
+    :param controls_paths: list(str), controls directories
+    :param tolerance: float, CVs closer than this value are considered equal
+    :param max_workers: int or None, number of processes used to parse control files
+    :return: list(list(ControlFileReport)), groups of duplicated controls, sorted by name
+    """
+
+    file_paths = list()
+    signatures = dict()
+    for controls_path in controls_paths:
+        signatures[controls_path] = shapelib.get_controls_signature(controls_path)
+        file_paths.extend(file_path for _, file_path in shapelib.iter_control_files(controls_path))
+
+    groups = dict()
+    for report in check_control_files(file_paths, max_workers=max_workers):
+        if report.valid:
+            groups.setdefault(report.shapes.content_hash(tolerance=tolerance), list()).append(report)
+
+    return sorted(
+        (group for group in groups.values() if len(group) > 1), key=lambda group: (group[0].name, group[0].path))
+
+
+def compile_libraries(controls_paths, output_path=None, precision='float32', max_workers=None, write=True):
+    """
+    Validates all the control files of the given directories and compiles the valid ones into a library per directory
+    :param controls_paths: list(str), controls directories
+    :param output_path: str or None, path of the compiled library. Only supported when a single directory is given.
+        If not given, each library is stored in the user cache directory
+    :param precision: str, precision used to store CVs ('float32' or 'float64')
+    :param max_workers: int or None, number of processes used to parse and validate control files
+    :param write: bool, Whether or not compiled libraries should be written. If False, files are only validated
+    :return: dict(str, list(ControlFileReport)), reports of each controls directory
+    """
+
+    if output_path and len(controls_paths) != 1:
+        raise ValueError('Output path can only be used when compiling a single controls directory')
+
+    file_paths = list()
+    signatures = dict()
+    for controls_path in controls_paths:
+        signatures[controls_path] = shapelib.get_controls_signature(controls_path)
+        file_paths.extend((controls_path, file_path) for _, file_path in shapelib.iter_control_files(controls_path))
+    reports = check_control_files([file_path for _, file_path in file_paths], max_workers=max_workers)
+
+    result = dict((controls_path, list()) for controls_path in controls_paths)
+    for (controls_path, _), report in zip(file_paths, reports):
+        result[controls_path].append(report)
+        for error in report.errors:
+            LOGGER.warning('{}: {}'.format(report.path, error))
+
+    if write:
+        for controls_path, path_reports in result.items():
+            library_path = output_path or shapelib.get_library_path(controls_path)
+            controls = [(report.name, report.shapes) for report in path_reports if report.valid]
+            shapelib.write_library(
+                shapelib.pack_library(controls, precision=precision, signature=signatures[controls_path]),
+                library_path)
+            LOGGER.info('Compiled {} controls into: {}'.format(len(controls), library_path))
+
+    return result
@@ -15,8 +15,22 @@ CONTROLS_SUFFIXES = ['_ctrl', '_CON', '_Ctrl', '_control']
 CONTROLS_SUFFIXES_TO_SKIP = ['_xform', '_driver', '_root', '_auto', '_follow', '_offset']
 CONTROLS_ATTRIBUTES = ['control']
 CONTROLS_ATTRIBUTES_TO_SKIP = ['POSE']
+CONTROLS_CHUNK_SIZE = 256
+CONTROLS_SIDE_TOKENS = [('Left', 'Right'), ('Lf', 'Rt'), ('L', 'R')]
+CONTROLS_SIDE_SEPARATORS = ['_']
+CONTROLS_MIRROR_TOLERANCE = 0.001
 
 TEMP_BREAK_CONTROL_ATTR = 'tempBreakTrack'
 TRACKER_CONTROL_TYPE_ATTR_NAME = 'controlTypeTrack'
 TRACKER_CONTROL_TYPE_DEFAULT_ATTR_NAME = 'controlTypeTrackDefault'
 ALL_CONTROL_TYPE_TRACKER_ATTRIBUTE_NAMES = [TRACKER_CONTROL_TYPE_ATTR_NAME, TRACKER_CONTROL_TYPE_DEFAULT_ATTR_NAME]
+
+CONTROL_EXT = '.control'
+COMPILED_LIBRARY_NAME = 'controls.ctrlib'
+LIBRARY_CACHE_PATH_ENV = 'TPRIGTOOLKIT_LIBS_CONTROLRIG_CACHE_PATH'
+CONTROLS_PATHS_ENV = 'TPRIGTOOLKIT_LIBS_CONTROLRIG_CONTROLS_PATHS'
+
+CONTROLS_REGISTRY_NODE = 'tpRigToolkitControlsRegistry'
+CONTROLS_REGISTRY_ATTR_NAME = 'controls'
+CONTROLS_REGISTRY_RULES_ATTR_NAME = 'rulesKey'
+CONTROLS_REGISTRY_NAMESPACES_ATTR_NAME = 'namespaces'
@@ -14,9 +14,13 @@ from tpDcc import dcc
 from tpDcc.core import library, reroute
 from tpDcc.libs.curves.core import curveslib
 
+from tpRigToolkit.libs.controlrig.core import consts, shapeindex, mirrorpairs
+
 LIB_ID = 'tpRigToolkit-libs-controlrig'
 LIB_ENV = LIB_ID.replace('-', '_').upper()
 CONTROL_EXT = '.control'
+MIRROR_KWARGS = (
+    'mirror_axis', 'mirror_mode', 'mirror_color', 'mirror_replace', 'keep_color', 'from_name', 'to_name')
 
 LOGGER = logging.getLogger('tpRigToolkit-libs-controlrig')
 
@@ -49,10 +53,15 @@ def control_exists(control_name, controls_path=None):
     """
     Returns whether or not given control rig exists in controls library
     :param control_name: str
-    :param controls_path: str
+    :param controls_path: str or list(str), controls directory or ordered list of controls directories
     :return: bool
     """
 
+    if shapeindex.get_index(controls_path).has_control(control_name):
+        return True
+    if controls_path:
+        return False
+
     curve_found = curveslib.find_curve_path_by_name(control_name, curves_path=controls_path)
 
     return bool(curve_found)
@@ -71,6 +80,17 @@ def create_control_curve(control_name='new_ctrl', control_type='circle', control
     raise NotImplementedError('Function create_text_control not implemented for current DCC!')
 
 
+@reroute.reroute_factory(LIB_ID, 'controllib')
+def create_control_curves(specs):
+    """
+    Creates multiple curve based controls at once, within a single undo chunk
+    :param specs: list(dict), each dictionary contains the keyword arguments supported by create_control_curve
+    :return: list(list(str)), created transforms of each spec, in the same order as the given specs
+    """
+
+    raise NotImplementedError('Function create_control_curves not implemented for current DCC!')
+
+
 @reroute.reroute_factory(LIB_ID, 'controllib')
 def create_text_control(text, font='Times New Roman'):
     """
@@ -142,22 +162,18 @@ def set_control_color(control_name, new_color, linear=True):
     raise NotImplementedError('Function get_control_color not implemented for current DCC!')
 
 
+@reroute.reroute_factory(LIB_ID, 'controllib')
 def set_controls_color(control_names, new_color, linear=True):
     """
-    Sets the control of the given control transform node
-    :param control_names: list(str), List of control names to set control of
-    :param new_color: list(float, float, float) or int, new color to apply to the control
+    Sets the color of the given control transform nodes
+    :param control_names: list(str), List of control names to set color of
+    :param new_color: list(float, float, float) or int or dict(str, list(float, float, float) or int), new color to
+        apply to all the controls or new color of each control
     :param linear, bool, Whether or not color is set in linear space
-    :return: list(str), list of
+    :return: list(str), list of controls whose color was set
     """
 
-    colored_controls = list()
-    for control_name in control_names:
-        colored_control = set_control_color(control_name, new_color, linear=linear)
-        if colored_control:
-            colored_controls.append(colored_control)
-
-    return colored_controls
+    raise NotImplementedError('Function set_controls_color not implemented for current DCC!')
 
 
 # ============================================================================================================
@@ -183,36 +199,103 @@ def duplicate_control(control_name, use_selected_name=False, copy_tracker=True,
 # ============================================================================================================
 
 @reroute.reroute_factory(LIB_ID, 'controllib')
-def mirror_control(source_control, target_control=None, mirror_axis='X', mirror_mode=0, keep_color=True):
+def mirror_control(
+        source_control, target_control=None, mirror_axis='X', mirror_mode=0, mirror_color=None, mirror_replace=False,
+        keep_color=True, from_name=None, to_name=None, side_tokens=None):
     """
     Find the right side control of a left side control and mirrors the control following next rules:
         - Mirror only will be applied if corresponding right side name exists
         - Replace left prefix and suffixes checking for validity
     :param source_control: str
+    :param target_control: str or None, control to mirror to. If not given, it is found using the side tokens
+    :param side_tokens: SideTokens or list(tuple(str, str)) or None, tokens used to find the target control
     :return: str, mirrored control
     """
 
-    raise NotImplementedError('Function select_controls not implemented for current DCC!')
+    raise NotImplementedError('Function mirror_control not implemented for current DCC!')
+
+
+@reroute.reroute_factory(LIB_ID, 'controllib')
+def get_controls_world_pivots(control_names):
+    """
+    Returns the world position of the pivot of the given controls
+    :param control_names: list(str)
+    :return: OrderedDict(str, tuple(float, float, float))
+    """
+
+    raise NotImplementedError('Function get_controls_world_pivots not implemented for current DCC!')
+
+
+def get_mirror_pairs(
+        nodes=None, side_tokens=None, use_positions=False, mirror_axis='X',
+        tolerance=consts.CONTROLS_MIRROR_TOLERANCE, from_name=None, to_name=None, **kwargs):
+    """
+    Pairs all the left side controls of the current scene with their right side control
+    :param nodes: list(str) or None, controls to pair. If not given, all the controls of the scene are paired
+    :param side_tokens: SideTokens or list(tuple(str, str)) or None, extra left and right token pairs
+    :param from_name: str or None, part of the left side control names that is replaced by to_name to find the right
+        side control names. It is checked before side tokens
+    :param to_name: str or None, part of the right side control names
+    :param use_positions: bool, Whether or not controls that can not be paired by name should be paired by
+        position, looking for controls placed at their reflection across the world plane of the mirror axis
+    :param mirror_axis: str, 'X', 'Y' or 'Z'
+    :param tolerance: float, maximum distance between the reflection of a control and its opposite side control
+    :return: MirrorPairTable
+    """
+
+    all_controls = nodes if nodes else get_controls(**kwargs)
+
+    side_tokens = mirrorpairs.SideTokens.from_value(side_tokens, from_name=from_name, to_name=to_name)
+    pair_table = mirrorpairs.build_pair_table(all_controls or list(), side_tokens=side_tokens)
+    if not use_positions:
+        return pair_table
+
+    unpaired_controls = pair_table.unmatched + pair_table.centered
+    if not unpaired_controls:
+        return pair_table
+    position_pair_table = mirrorpairs.build_position_pair_table(
+        get_controls_world_pivots(unpaired_controls), mirror_axis=mirror_axis, tolerance=tolerance)
+
+    return pair_table.merge(position_pair_table)
 
 
 @dcc.undo_decorator()
-def mirror_controls(nodes=None, **kwargs):
+def mirror_controls(
+        nodes=None, side_tokens=None, use_positions=False, tolerance=consts.CONTROLS_MIRROR_TOLERANCE, **kwargs):
     """
-    Mirrors the CV positions of all controls in the current scene
+    Mirrors the CV positions of all left side controls of the current scene into their right side control
+    Pairs are resolved for all the controls at once before mirroring them. Controls whose opposite side control is
+    not found or is ambiguous are reported
+    :param nodes: list(str) or None, controls to mirror. If not given, all the controls of the scene are mirrored
+    :param side_tokens: SideTokens or list(tuple(str, str)) or None, extra left and right token pairs
+    :param use_positions: bool, Whether or not controls that can not be paired by name should be paired by position
+    :param tolerance: float, maximum distance between the reflection of a control and its opposite side control
+    :return: list(str), mirrored controls
     """
 
+    mirror_kwargs = dict((key, kwargs.pop(key)) for key in MIRROR_KWARGS if key in kwargs)
+    mirror_kwargs.setdefault('mirror_replace', True)
     mirrored_controls = list()
 
-    all_controls = nodes if nodes else get_controls(**kwargs)
-    if not all_controls:
+    pair_table = get_mirror_pairs(
+        nodes=nodes, side_tokens=side_tokens, use_positions=use_positions,
+        mirror_axis=mirror_kwargs.get('mirror_axis', 'X'), tolerance=tolerance,
+        from_name=mirror_kwargs.get('from_name'), to_name=mirror_kwargs.get('to_name'), **kwargs)
+    if pair_table.unmatched:
+        LOGGER.warning('No opposite side control found for: {}'.format(', '.join(pair_table.unmatched)))
+    for control, candidates in pair_table.ambiguous.items():
+        LOGGER.warning('Opposite side control of "{}" is ambiguous: {}'.format(control, ', '.join(candidates)))
+    if not pair_table.pairs:
         return mirrored_controls
 
-    for control_to_mirror in all_controls:
-        if control_to_mirror in mirrored_controls:
+    mirrored_targets = set()
+    for source_control, target_control in pair_table.pairs.items():
+        if target_control in mirrored_targets:
             continue
-        mirrored_control = mirror_control(control_to_mirror, **kwargs)
+        mirrored_control = mirror_control(source_control, target_control=target_control, **mirror_kwargs)
         if not mirrored_control:
             continue
+        mirrored_targets.add(target_control)
         mirrored_controls.append(mirrored_control)
 
     if mirrored_controls:
@@ -293,6 +376,61 @@ def get_controls(**kwargs):
     raise NotImplementedError('Function get_controls not implemented for current DCC!')
 
 
+@reroute.reroute_factory(LIB_ID, 'controllib')
+def iter_controls(chunk_size=None, tagged_first=True, **kwargs):
+    """
+    Yields controls of the current scene as soon as they are found
+    Supports the same keyword arguments as get_controls
+    :param chunk_size: int or None, If given, controls are yielded in lists of this size
+    :param tagged_first: bool, If True, tagged controls are yielded first and untagged ones are only yielded if no
+        tagged control was found, following get_controls behaviour. If False, all the controls are yielded
+    :return: generator(str) or generator(list(str))
+    """
+
+    raise NotImplementedError('Function iter_controls not implemented for current DCC!')
+
+
+@reroute.reroute_factory(LIB_ID, 'controllib')
+def get_controls_cache_stats():
+    """
+    Returns hits, misses and invalidations of the get_controls cache
+    :return: dict
+    """
+
+    raise NotImplementedError('Function get_controls_cache_stats not implemented for current DCC!')
+
+
+@reroute.reroute_factory(LIB_ID, 'controllib')
+def clear_controls_cache():
+    """
+    Discards all cached get_controls results and resets cache counters
+    """
+
+    raise NotImplementedError('Function clear_controls_cache not implemented for current DCC!')
+
+
+@reroute.reroute_factory(LIB_ID, 'controllib')
+def create_controls_registry(**kwargs):
+    """
+    Creates the controls registry of the current scene and registers all its controls
+    Once created, controls created, tracked or duplicated through this library are registered automatically and
+    get_controls reads the registry instead of scanning the scene
+    :return: str, registry node
+    """
+
+    raise NotImplementedError('Function create_controls_registry not implemented for current DCC!')
+
+
+@reroute.reroute_factory(LIB_ID, 'controllib')
+def delete_controls_registry():
+    """
+    Deletes the controls registry of the current scene
+    :return: bool
+    """
+
+    raise NotImplementedError('Function delete_controls_registry not implemented for current DCC!')
+
+
 @reroute.reroute_factory(LIB_ID, 'controllib')
 def select_controls(**kwargs):
     """
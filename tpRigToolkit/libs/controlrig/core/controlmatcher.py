@@ -0,0 +1,263 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains the rules used to find out whether or not a scene node is a rig control
+Rules are compiled once into a ControlMatcher and reused for all the nodes of a scene scan
+"""
+
+from __future__ import print_function, division, absolute_import
+
+from tpRigToolkit.libs.controlrig.core import consts
+
+TAG_ATTRIBUTE = 'tag'
+TYPE_ATTRIBUTES = ('curveType', 'type')
+SHAPE_TYPES = ('nurbsCurve', 'nurbsSurface')
+
+# Results of ControlMatcher.match
+TAGGED = 'tagged'
+UNTAGGED = 'untagged'
+
+
+class ControlMatcher(object):
+    """
+    Class that stores control rules as precompiled tuples and sets and evaluates scene nodes against them
+    DCC queries are done through the functions given to match, so rules can be evaluated against any DCC
+    """
+
+    RULES = (
+        ('names_to_skip', consts.CONTROLS_NAMES_TO_SKIP),
+        ('prefixes_to_check', consts.CONTROLS_PREFIXES),
+        ('prefixes_to_skip', consts.CONTROLS_PREFIXES_TO_SKIP),
+        ('suffixes_to_check', consts.CONTROLS_SUFFIXES),
+        ('suffixes_to_skip', consts.CONTROLS_SUFFIXES_TO_SKIP),
+        ('attributes_to_check', consts.CONTROLS_ATTRIBUTES),
+        ('attributes_to_skip', consts.CONTROLS_ATTRIBUTES_TO_SKIP)
+    )
+
+    def __init__(
+            self, names_to_skip=None, prefixes_to_check=None, prefixes_to_skip=None, suffixes_to_check=None,
+            suffixes_to_skip=None, attributes_to_check=None, attributes_to_skip=None, use_defaults=True):
+        super(ControlMatcher, self).__init__()
+
+        given = {
+            'names_to_skip': names_to_skip, 'prefixes_to_check': prefixes_to_check,
+            'prefixes_to_skip': prefixes_to_skip, 'suffixes_to_check': suffixes_to_check,
+            'suffixes_to_skip': suffixes_to_skip, 'attributes_to_check': attributes_to_check,
+            'attributes_to_skip': attributes_to_skip
+        }
+        rules = dict()
+        for rule_name, defaults in self.RULES:
+            values = set(_as_list(given[rule_name]))
+            if use_defaults:
+                values.update(defaults)
+            rules[rule_name] = tuple(sorted(values))
+
+        self._names_to_skip = frozenset(rules['names_to_skip'])
+        self._prefixes_to_check = rules['prefixes_to_check']
+        self._prefixes_to_skip = rules['prefixes_to_skip']
+        self._suffixes_to_check = rules['suffixes_to_check']
+        self._suffixes_to_skip = rules['suffixes_to_skip']
+        self._attributes_to_check = rules['attributes_to_check']
+        self._attributes_to_skip = rules['attributes_to_skip']
+        self._key = tuple(rules[rule_name] for rule_name, _ in self.RULES)
+
+    def __eq__(self, other):
+        if not isinstance(other, ControlMatcher):
+            return NotImplemented
+        return self._key == other._key
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __hash__(self):
+        return hash(self._key)
+
+    @classmethod
+    def from_kwargs(cls, **kwargs):
+        """
+        Creates a new matcher from the keyword arguments supported by is_control and get_controls functions
+        Keyword arguments that are not control rules are ignored
+        :return: ControlMatcher
+        """
+
+        matcher = kwargs.get('matcher', None)
+        if isinstance(matcher, ControlMatcher):
+            return matcher
+
+        return cls(**dict((rule_name, kwargs[rule_name]) for rule_name, _ in cls.RULES if rule_name in kwargs))
+
+    @property
+    def key(self):
+        """
+        Returns a hashable key that identifies the rules of this matcher
+        :return: tuple
+        """
+
+        return self._key
+
+    @property
+    def attributes_to_check(self):
+        """
+        Returns attributes that identify a node as a control
+        :return: tuple(str)
+        """
+
+        return self._attributes_to_check
+
+    @property
+    def attributes_to_skip(self):
+        """
+        Returns attributes that identify a node as a non control
+        :return: tuple(str)
+        """
+
+        return self._attributes_to_skip
+
+    def check_name(self, node_name):
+        """
+        Evaluates the name rules against the given node name
+        :param node_name: str
+        :return: bool or None, False if the name must be skipped; True if the name follows controls nomenclature;
+            None otherwise
+        """
+
+        name = strip_namespace(node_name)
+        if name in self._names_to_skip:
+            return False
+        if name.startswith(self._prefixes_to_skip) or name.endswith(self._suffixes_to_skip):
+            return False
+        if name.startswith(self._prefixes_to_check) or name.endswith(self._suffixes_to_check):
+            return True
+
+        return None
+
+    def match(self, node, attribute_exists, get_attribute_value, has_shape_of_type, only_tagged=False):
+        """
+        Evaluates all the rules against the given node
+        :param node: str
+        :param attribute_exists: callable, function that receives a node and an attribute name and returns whether
+            or not the attribute exists
+        :param get_attribute_value: callable, function that receives a node and an attribute name and returns the
+            attribute value
+        :param has_shape_of_type: callable, function that receives a node and a shape type and returns whether or not
+            the node has a shape of that type
+        :param only_tagged: bool, Whether or not only tagged controls should be matched
+        :return: str or None, TAGGED if the node is a control with a tag; UNTAGGED if the node is a control without
+            tag; None if the node is not a control
+        """
+
+        if only_tagged:
+            return TAGGED if _is_tagged(node, attribute_exists, get_attribute_value) else None
+
+        # Tagged nodes still have to pass name and attribute rules, so the tag is only checked after them
+        maybe_control = self.check_name(node)
+        if maybe_control is False:
+            return None
+
+        for attr_to_skip in self._attributes_to_skip:
+            if attribute_exists(node, attr_to_skip):
+                return None
+        tagged = _is_tagged(node, attribute_exists, get_attribute_value)
+        found = TAGGED if tagged else UNTAGGED
+        for attr_to_check in self._attributes_to_check:
+            if attribute_exists(node, attr_to_check):
+                return found
+        if not maybe_control:
+            maybe_control = tagged
+        if not maybe_control:
+            for type_attribute in TYPE_ATTRIBUTES:
+                if attribute_exists(node, type_attribute) and get_attribute_value(node, type_attribute):
+                    maybe_control = True
+                    break
+
+        if maybe_control and any(has_shape_of_type(node, shape_type) for shape_type in SHAPE_TYPES):
+            return found
+
+        return None
+
+    def iter_matches(self, nodes, attribute_exists, get_attribute_value, has_shape_of_type, tagged_first=True):
+        """
+        Yields the given nodes that are controls as soon as they are evaluated
+        :param nodes: list(str)
+        :param attribute_exists: callable
+        :param get_attribute_value: callable
+        :param has_shape_of_type: callable
+        :param tagged_first: bool, If True, nodes are evaluated in two phases: tagged controls are yielded first and,
+            only if none was found, untagged controls are yielded after them. If False, all the controls are yielded
+            in a single phase
+        :return: generator(str)
+        """
+
+        if not tagged_first:
+            for node in nodes:
+                if self.match(node, attribute_exists, get_attribute_value, has_shape_of_type):
+                    yield node
+            return
+
+        tagged_found = False
+        for node in nodes:
+            if self.match(node, attribute_exists, get_attribute_value, has_shape_of_type, only_tagged=True):
+                tagged_found = True
+                yield node
+        if tagged_found:
+            return
+        for node in nodes:
+            if self.match(node, attribute_exists, get_attribute_value, has_shape_of_type) == UNTAGGED:
+                yield node
+
+
+def iter_chunks(items, chunk_size):
+    """
+    Groups the items of the given iterable into lists of the given size, without consuming more items than needed
+    :param items: iterable
+    :param chunk_size: int
+    :return: generator(list)
+    """
+
+    chunk = list()
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = list()
+    if chunk:
+        yield chunk
+
+
+def strip_namespace(node_name):
+    """
+    Returns the short name of the given node without its namespaces
+    :param node_name: str
+    :return: str
+    """
+
+    return node_name.rsplit('|', 1)[-1].rsplit(':', 1)[-1]
+
+
+def _as_list(value):
+    """
+    Internal function that converts given rule value into a list
+    :param value: str or list(str) or tuple(str) or None
+    :return: list(str)
+    """
+
+    if value is None:
+        return list()
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return list(value)
+
+    return [value]
+
+
+def _is_tagged(node, attribute_exists, get_attribute_value):
+    """
+    Internal function that returns whether or not the given node has a control tag
+    :param node: str
+    :param attribute_exists: callable
+    :param get_attribute_value: callable
+    :return: bool
+    """
+
+    return bool(attribute_exists(node, TAG_ATTRIBUTE) and get_attribute_value(node, TAG_ATTRIBUTE))
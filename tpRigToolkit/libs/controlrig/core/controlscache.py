@@ -0,0 +1,105 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains the cache of scene controls lookups
+Results are stored per namespace and control rules and are discarded as soon as the scene changes. DCC
+implementations are responsible of calling invalidate when nodes are added, removed or renamed, and of giving the state
+of the scene that is not watched, such as the attributes the rules check, when storing and reading results
+"""
+
+from __future__ import print_function, division, absolute_import
+
+from tpRigToolkit.libs.controlrig.core.shapecache import LRUCache
+
+DEFAULT_MAX_SIZE = 32
+
+
+class ControlsCache(object):
+    """
+    Class that stores scene controls lookups results and keeps track of its hits, misses and invalidations
+    """
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE):
+        super(ControlsCache, self).__init__()
+
+        self._cache = LRUCache(max_size=max_size)
+        self._invalidations = 0
+        self._generation = 0
+
+    def __len__(self):
+        return len(self._cache)
+
+    @property
+    def invalidations(self):
+        """
+        Returns the number of times the cache was invalidated
+        :return: int
+        """
+
+        return self._invalidations
+
+    @property
+    def generation(self):
+        """
+        Returns a number that changes every time cached results are discarded. Lookups that take a while should
+        store their results only if the generation did not change since they started
+        :return: int
+        """
+
+        return self._generation
+
+    def get(self, namespace, rules_key, state=None):
+        """
+        Returns the controls found in the given namespace with the given rules
+        :param namespace: str
+        :param rules_key: hashable, key that identifies the rules used to find the controls
+        :param state: object, current state of the scene data that is not watched. Controls stored with a different
+            state are discarded
+        :return: list(str) or None, copy of the cached controls or None if they are not cached
+        """
+
+        cached = self._cache.get((namespace or '', rules_key), validator=lambda item: item[0] == state)
+
+        return list(cached[1]) if cached is not None else None
+
+    def put(self, namespace, rules_key, controls, state=None):
+        """
+        Stores the controls found in the given namespace with the given rules
+        :param namespace: str
+        :param rules_key: hashable
+        :param controls: list(str)
+        :param state: object, state of the scene data that is not watched when the controls were found
+        """
+
+        self._cache.put((namespace or '', rules_key), (state, tuple(controls)))
+
+    def invalidate(self, *args, **kwargs):
+        """
+        Discards all cached results. Arguments are ignored, so this function can be used as a DCC callback
+        """
+
+        if len(self._cache):
+            self._cache.clear()
+        self._invalidations += 1
+        self._generation += 1
+
+    def clear(self):
+        """
+        Discards all cached results and resets counters
+        """
+
+        self._cache.clear(reset_stats=True)
+        self._invalidations = 0
+        self._generation += 1
+
+    def stats(self):
+        """
+        Returns cache usage statistics
+        :return: dict
+        """
+
+        stats = self._cache.stats()
+        stats['invalidations'] = self._invalidations
+
+        return stats
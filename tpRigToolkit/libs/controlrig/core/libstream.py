@@ -0,0 +1,252 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains functions to incrementally read aggregated control libraries files
+Aggregated libraries use the same layout as data.json: {"categories": [...], "controls": {"name": [shapes], ...}}
+Only the value being decoded is kept in memory, so peak memory is proportional to the largest control, not to the
+size of the file
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import io
+import re
+import json
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+WHITESPACE = ' \t\n\r'
+VALUE_END_TOKENS = re.compile(r'[\[\]{}",:\s]')
+STRUCTURE_TOKENS = re.compile(r'[\[\]{}"]')
+STRING_TOKENS = re.compile(r'["\\]')
+
+
+class _JSONStreamReader(object):
+    """
+    Internal class that reads a JSON document from a file object one token or one value at a time
+    """
+
+    def __init__(self, file_handle, chunk_size=DEFAULT_CHUNK_SIZE):
+        super(_JSONStreamReader, self).__init__()
+
+        self._file_handle = file_handle
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def peek(self):
+        """
+        Returns the next non whitespace character without consuming it
+        :return: str, next character or an empty string if the end of the file was reached
+        """
+
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer) or not self._read():
+                break
+
+        return self._buffer[self._pos:self._pos + 1]
+
+    def expect(self, characters):
+        """
+        Consumes the next non whitespace character, checking that it is one of the given ones
+        :param characters: str
+        :return: str, consumed character
+        """
+
+        character = self.peek()
+        if not character or character not in characters:
+            raise ValueError('Expected one of "{}" but found "{}" in JSON stream'.format(characters, character))
+        self._pos += 1
+
+        return character
+
+    def read_value(self):
+        """
+        Decodes and consumes the next JSON value
+        :return: object
+        """
+
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except ValueError:
+                if not self._read(len(self._buffer) - self._pos):
+                    raise
+                continue
+            # A value that ends with the buffer might be a truncated number, so we only trust it at the end of the file
+            if end < len(self._buffer) or self._eof or not self._read():
+                self._pos = end
+                return value
+
+    def skip_value(self):
+        """
+        Consumes the next JSON value without decoding it
+        """
+
+        depth = 0
+        in_string = False
+        self.peek()
+        while True:
+            if in_string:
+                pattern = STRING_TOKENS
+            else:
+                pattern = STRUCTURE_TOKENS if depth else VALUE_END_TOKENS
+            match = pattern.search(self._buffer, self._pos)
+            if not match:
+                self._pos = len(self._buffer)
+                if not self._read():
+                    if depth or in_string:
+                        raise ValueError('Unexpected end of JSON stream')
+                    return
+                continue
+            self._pos = match.start()
+            character = match.group()
+            if in_string:
+                if character == '\\':
+                    # Make sure the escaped character is in the buffer before jumping over it
+                    if self._pos + 1 >= len(self._buffer) and not self._read():
+                        raise ValueError('Unexpected end of JSON stream')
+                    self._pos += 2
+                    continue
+                in_string = False
+                self._pos += 1
+                if not depth:
+                    return
+            elif character == '"':
+                in_string = True
+                self._pos += 1
+            elif character in '[{':
+                depth += 1
+                self._pos += 1
+            elif character in ']}':
+                if not depth:
+                    return
+                depth -= 1
+                self._pos += 1
+                if not depth:
+                    return
+            else:
+                return
+
+    def _read(self, min_size=0):
+        """
+        Internal function that appends the next chunk of the file to the buffer
+        Consumed part of the buffer is discarded with the same copy that appends the chunk, so values read from the
+        buffer do not copy it
+        :param min_size: int, chunks are at least as big as this value, so retries on big values stay linear
+        :return: bool, False if the end of the file was reached; True otherwise
+        """
+
+        if self._eof:
+            return False
+
+        chunk = self._file_handle.read(max(self._chunk_size, min_size))
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+
+        return True
+
+
+def iter_library_section(file_path, section='controls', names=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yields key and value pairs of the given dictionary section of an aggregated controls library file one at a time
+    :param file_path: str, path of the library file
+    :param section: str, name of the root key whose dictionary we want to iterate
+    :param names: list(str) or None, if given, only the values of these keys are yielded
+    :param chunk_size: int, number of characters read from disk at once
+    :return: generator(tuple(str, object))
+    """
+
+    names = set(names) if names is not None else None
+
+    with io.open(file_path, 'r', encoding='utf-8') as fh:
+        reader = _JSONStreamReader(fh, chunk_size=chunk_size)
+        reader.expect('{')
+        if reader.peek() == '}':
+            return
+        while True:
+            key = reader.read_value()
+            reader.expect(':')
+            if key != section:
+                reader.skip_value()
+            else:
+                reader.expect('{')
+                if reader.peek() != '}':
+                    while True:
+                        name = reader.read_value()
+                        reader.expect(':')
+                        # Decoding runs in C, so it is faster than scanning entries we are not interested in; decoded
+                        # values are discarded right away, so only one entry is kept in memory
+                        value = reader.read_value()
+                        if names is None or name in names:
+                            yield name, value
+                        del value
+                        if reader.expect(',}') == '}':
+                            break
+                else:
+                    reader.expect('}')
+            if reader.expect(',}') == '}':
+                return
+
+
+def load_library_section(file_path, section, default=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Returns the value of a single root key of an aggregated controls library file, skipping the other ones
+    :param file_path: str, path of the library file
+    :param section: str, name of the root key to load
+    :param default: object, value returned if the key does not exist
+    :param chunk_size: int, number of characters read from disk at once
+    :return: object
+    """
+
+    with io.open(file_path, 'r', encoding='utf-8') as fh:
+        reader = _JSONStreamReader(fh, chunk_size=chunk_size)
+        reader.expect('{')
+        if reader.peek() == '}':
+            return default
+        while True:
+            key = reader.read_value()
+            reader.expect(':')
+            if key == section:
+                return reader.read_value()
+            reader.skip_value()
+            if reader.expect(',}') == '}':
+                return default
+
+
+def iter_library_controls(file_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yields the name and shapes data of each control stored in an aggregated controls library file one at a time
+    :param file_path: str, path of the library file
+    :param chunk_size: int, number of characters read from disk at once
+    :return: generator(tuple(str, list(dict)))
+    """
+
+    for name, shapes in iter_library_section(file_path, section='controls', chunk_size=chunk_size):
+        yield name, shapes
+
+
+def load_library_control(file_path, control_name, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Returns the shapes data of a single control stored in an aggregated controls library file
+    The file is only read until the control is found and other controls are discarded as soon as they are read
+    :param file_path: str, path of the library file
+    :param control_name: str, name of the control to load
+    :param chunk_size: int, number of characters read from disk at once
+    :return: list(dict) or None
+    """
+
+    controls = iter_library_section(file_path, section='controls', names=[control_name], chunk_size=chunk_size)
+    for _, shapes in controls:
+        controls.close()
+        return shapes
+
+    return None
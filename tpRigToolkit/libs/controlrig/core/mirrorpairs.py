@@ -0,0 +1,365 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains functions to pair left and right side controls before mirroring them
+Side tokens are compiled once into a SideTokens object and the pairs of all the controls are resolved at once with
+set lookups, so mirroring does not need to check the existence of candidate names in the scene
+Controls that do not follow naming conventions can be paired by position: pivots are bucketed in a spatial hash whose
+cells have the size of the tolerance, so the reflection of each pivot is only compared with the pivots of the 27
+cells around it
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import re
+import math
+from collections import OrderedDict
+
+from tpRigToolkit.libs.controlrig.core import consts
+
+LEFT = 'left'
+RIGHT = 'right'
+AXES = 'XYZ'
+
+# Case variants of each token pair that are also taken into account: as given, lower, upper and capitalized
+CASE_VARIANTS = (
+    lambda token: token, lambda token: token.lower(), lambda token: token.upper(),
+    lambda token: token[:1].upper() + token[1:])
+
+
+class SideTokens(object):
+    """
+    Class that stores left and right side tokens and finds the names of the opposite side of a node
+    Tokens are found as name prefix, suffix or infix delimited by a separator. Tokens that start with an uppercase
+    letter are also found as camel case words (armLeft_ctrl). Replacements are found anywhere in the name and are
+    checked before tokens
+    """
+
+    def __init__(self, tokens=None, separators=None, replacements=None, use_defaults=True):
+        super(SideTokens, self).__init__()
+
+        pairs = list(tokens or list())
+        separators = list(separators or list())
+        self._tokens = tuple(tuple(pair) for pair in pairs)
+        self._replacements = tuple(tuple(pair) for pair in replacements or list() if pair[0] and pair[1])
+        self._use_defaults = use_defaults
+        if use_defaults:
+            pairs.extend(consts.CONTROLS_SIDE_TOKENS)
+            separators.extend(consts.CONTROLS_SIDE_SEPARATORS)
+
+        self._swaps = OrderedDict()
+        for left_token, right_token in pairs:
+            for case_variant in CASE_VARIANTS:
+                left_variant, right_variant = case_variant(left_token), case_variant(right_token)
+                self._swaps.setdefault(left_variant, (right_variant, LEFT))
+                self._swaps.setdefault(right_variant, (left_variant, RIGHT))
+        self._separators = tuple(OrderedDict.fromkeys(separators))
+        self._key = (tuple(self._swaps.items()), self._separators, self._replacements)
+
+        camel_tokens = sorted(
+            (token for token in self._swaps if len(token) > 1 and token[0].isupper() and not token.isupper()),
+            key=len, reverse=True)
+        self._camel_regex = re.compile(
+            r'(?:(?<=[a-z0-9])|^)({})(?=[A-Z0-9]|${})'.format(
+                '|'.join(re.escape(token) for token in camel_tokens),
+                ''.join('|' + re.escape(separator) for separator in self._separators))) if camel_tokens else None
+
+    def __eq__(self, other):
+        if not isinstance(other, SideTokens):
+            return NotImplemented
+        return self._key == other._key
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __hash__(self):
+        return hash(self._key)
+
+    @classmethod
+    def from_value(cls, side_tokens=None, from_name=None, to_name=None):
+        """
+        Returns side tokens from the value supported by mirror functions
+        :param side_tokens: SideTokens or list(tuple(str, str)) or None, side tokens, extra left and right token
+            pairs or None to use default tokens
+        :param from_name: str or None, left side part of the names that is replaced by to_name to find right side names
+        :param to_name: str or None, right side part of the names
+        :return: SideTokens
+        """
+
+        replacements = [(from_name, to_name)] if from_name and to_name and from_name != to_name else list()
+        if isinstance(side_tokens, SideTokens):
+            if not replacements:
+                return side_tokens
+            return cls(
+                tokens=side_tokens._tokens, separators=side_tokens._separators,
+                replacements=replacements + list(side_tokens._replacements), use_defaults=side_tokens._use_defaults)
+
+        return cls(tokens=side_tokens, replacements=replacements)
+
+    @property
+    def key(self):
+        """
+        Returns a hashable key that identifies the tokens
+        :return: tuple
+        """
+
+        return self._key
+
+    def iter_mirror_names(self, node_name):
+        """
+        Yields the names the node of the opposite side of the given one can have, most specific first
+        :param node_name: str
+        :return: generator(tuple(str, str)), opposite side name and side of the given node (LEFT or RIGHT)
+        """
+
+        found = set()
+        for left_part, right_part in self._replacements:
+            for part, other_part, side in ((left_part, right_part, LEFT), (right_part, left_part, RIGHT)):
+                if part in node_name:
+                    mirror_name = node_name.replace(part, other_part)
+                    if mirror_name not in found:
+                        found.add(mirror_name)
+                        yield mirror_name, side
+
+        split_index = max(node_name.rfind('|'), node_name.rfind(':')) + 1
+        head, name = node_name[:split_index], node_name[split_index:]
+
+        for separator in self._separators:
+            parts = name.split(separator)
+            if len(parts) < 2:
+                continue
+            # Suffix first, then prefix and then infixes
+            for i in [len(parts) - 1, 0] + list(range(1, len(parts) - 1)):
+                swap = self._swaps.get(parts[i])
+                if not swap:
+                    continue
+                mirror_name = head + separator.join(parts[:i] + [swap[0]] + parts[i + 1:])
+                if mirror_name not in found:
+                    found.add(mirror_name)
+                    yield mirror_name, swap[1]
+
+        if not self._camel_regex:
+            return
+        for match in self._camel_regex.finditer(name):
+            swap = self._swaps[match.group(1)]
+            mirror_name = head + name[:match.start(1)] + swap[0] + name[match.end(1):]
+            if mirror_name not in found:
+                found.add(mirror_name)
+                yield mirror_name, swap[1]
+
+    def get_side(self, node_name):
+        """
+        Returns the side of the given node
+        :param node_name: str
+        :return: str or None, LEFT, RIGHT or None if the name has no side token
+        """
+
+        for _, side in self.iter_mirror_names(node_name):
+            return side
+
+        return None
+
+
+class MirrorPairTable(object):
+    """
+    Class that stores the result of pairing a list of controls
+    """
+
+    def __init__(self, pairs, unmatched, centered, ambiguous=None):
+        super(MirrorPairTable, self).__init__()
+
+        self._pairs = pairs
+        self._unmatched = unmatched
+        self._centered = centered
+        self._ambiguous = ambiguous if ambiguous is not None else OrderedDict()
+
+    def __len__(self):
+        return len(self._pairs)
+
+    @property
+    def pairs(self):
+        """
+        Returns left side controls with the right side control they are paired with
+        :return: OrderedDict(str, str)
+        """
+
+        return self._pairs
+
+    @property
+    def unmatched(self):
+        """
+        Returns controls with a side token whose opposite side control was not found
+        :return: list(str)
+        """
+
+        return self._unmatched
+
+    @property
+    def centered(self):
+        """
+        Returns controls that have no opposite side: controls without side token or, when paired by position,
+        controls that lie on the mirror plane
+        :return: list(str)
+        """
+
+        return self._centered
+
+    @property
+    def ambiguous(self):
+        """
+        Returns controls that were not paired because several controls can be their opposite side control
+        :return: OrderedDict(str, list(str)), controls with their candidate opposite side controls
+        """
+
+        return self._ambiguous
+
+    def merge(self, other):
+        """
+        Returns a new table with the pairs of both tables. Unresolved controls are taken from the given table, which
+        is expected to pair the controls this table did not resolve
+        :param other: MirrorPairTable
+        :return: MirrorPairTable
+        """
+
+        pairs = OrderedDict(self._pairs)
+        pairs.update(other.pairs)
+
+        return MirrorPairTable(pairs, list(other.unmatched), list(other.centered), OrderedDict(other.ambiguous))
+
+
+def build_pair_table(controls, side_tokens=None):
+    """
+    Pairs left and right side controls of the given list of controls
+    :param controls: list(str)
+    :param side_tokens: SideTokens or list(tuple(str, str)) or None
+    :return: MirrorPairTable
+    """
+
+    side_tokens = SideTokens.from_value(side_tokens)
+    controls = list(OrderedDict.fromkeys(controls))
+    names = set(controls)
+    controls_by_short_name = dict()
+    for control in controls:
+        controls_by_short_name.setdefault(control.rsplit('|', 1)[-1], list()).append(control)
+
+    pairs = OrderedDict()
+    unmatched = list()
+    centered = list()
+    for control in controls:
+        side = None
+        target = None
+        for mirror_name, side in side_tokens.iter_mirror_names(control):
+            if mirror_name in names:
+                target = mirror_name
+                break
+            # Parents of the opposite control do not need to be mirrored names of the parents of the control
+            same_short_name = controls_by_short_name.get(mirror_name.rsplit('|', 1)[-1], ())
+            if len(same_short_name) == 1:
+                target = same_short_name[0]
+                break
+        if side is None:
+            centered.append(control)
+        elif target is None:
+            unmatched.append(control)
+        elif side == LEFT:
+            pairs[control] = target
+
+    return MirrorPairTable(pairs, unmatched, centered)
+
+
+def build_position_pair_table(positions, mirror_axis='X', tolerance=consts.CONTROLS_MIRROR_TOLERANCE):
+    """
+    Pairs controls whose positions are the reflection of each other across the world plane of the given axis
+    Controls on the positive side of the axis are taken as left side controls
+    :param positions: OrderedDict(str, tuple(float, float, float)), world pivot of each control
+    :param mirror_axis: str, 'X', 'Y' or 'Z'
+    :param tolerance: float, maximum distance between the reflection of a control and its opposite side control
+    :return: MirrorPairTable
+    """
+
+    if tolerance <= 0:
+        raise ValueError('Mirror tolerance must be greater than zero: {}'.format(tolerance))
+    axis = AXES.index(mirror_axis.upper())
+    max_distance = tolerance * tolerance
+
+    grid = dict()
+    for control, position in positions.items():
+        grid.setdefault(_get_cell(position, tolerance), list()).append(control)
+
+    centered = list()
+    unmatched = list()
+    ambiguous = OrderedDict()
+    sources_by_target = OrderedDict()
+    for control, position in positions.items():
+        if abs(position[axis]) <= tolerance:
+            centered.append(control)
+            continue
+        if position[axis] < 0:
+            continue
+        reflected = list(position)
+        reflected[axis] = -reflected[axis]
+        candidates = [
+            other for other in _iter_cell_neighbours(grid, reflected, tolerance)
+            if _get_squared_distance(positions[other], reflected) <= max_distance]
+        if not candidates:
+            unmatched.append(control)
+        elif len(candidates) > 1:
+            ambiguous[control] = candidates
+        else:
+            sources_by_target.setdefault(candidates[0], list()).append(control)
+
+    pairs = OrderedDict()
+    for target, sources in sources_by_target.items():
+        if len(sources) == 1:
+            pairs[sources[0]] = target
+            continue
+        for source in sources:
+            ambiguous[source] = [target]
+
+    candidates = set(candidate for candidates in ambiguous.values() for candidate in candidates)
+    for control, position in positions.items():
+        if position[axis] < -tolerance and control not in sources_by_target and control not in candidates:
+            unmatched.append(control)
+
+    return MirrorPairTable(pairs, unmatched, centered, ambiguous)
+
+
+def _get_cell(position, cell_size):
+    """
+    Internal function that returns the spatial hash cell of the given position
+    :param position: tuple(float, float, float)
+    :param cell_size: float
+    :return: tuple(int, int, int)
+    """
+
+    return tuple(int(math.floor(value / cell_size)) for value in position)
+
+
+def _iter_cell_neighbours(grid, position, cell_size):
+    """
+    Internal function that yields the controls stored in the cell of the given position and in the cells around it
+    :param grid: dict(tuple(int, int, int), list(str))
+    :param position: tuple(float, float, float)
+    :param cell_size: float
+    :return: generator(str)
+    """
+
+    x, y, z = _get_cell(position, cell_size)
+    for i in (-1, 0, 1):
+        for j in (-1, 0, 1):
+            for k in (-1, 0, 1):
+                for control in grid.get((x + i, y + j, z + k), ()):
+                    yield control
+
+
+def _get_squared_distance(position_a, position_b):
+    """
+    Internal function that returns the squared distance between the given positions
+    :param position_a: tuple(float, float, float)
+    :param position_b: tuple(float, float, float)
+    :return: float
+    """
+
+    return sum((a - b) * (a - b) for a, b in zip(position_a, position_b))
@@ -0,0 +1,168 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains an optional profiler used to instrument scene controls lookups
+Lookups only instrument their phases and DCC calls when a profiler is given, so there is no overhead otherwise
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import copy
+import time
+import logging
+import functools
+from collections import OrderedDict
+from contextlib import contextmanager
+
+LOGGER = logging.getLogger('tpRigToolkit-libs-controlrig')
+
+
+class ScanProfiler(object):
+    """
+    Class that records the time spent in each phase of a lookup and the number and time of each kind of DCC call
+    """
+
+    def __init__(self, name='get_controls'):
+        super(ScanProfiler, self).__init__()
+
+        self._name = name
+        self._phases = OrderedDict()
+        self._calls = OrderedDict()
+        self._start = time.time()
+
+    @property
+    def name(self):
+        """
+        Returns the name of the profiled operation
+        :return: str
+        """
+
+        return self._name
+
+    @contextmanager
+    def phase(self, phase_name):
+        """
+        Context manager that adds the time spent inside it to the given phase
+        :param phase_name: str
+        """
+
+        start = time.time()
+        try:
+            yield
+        finally:
+            self._add_phase_time(phase_name, time.time() - start)
+
+    def iter_phase(self, phase_name, items):
+        """
+        Yields the items of the given iterable, adding the time spent producing them to the given phase
+        Time spent by the consumer between items is not taken into account
+        :param phase_name: str
+        :param items: iterable
+        :return: generator
+        """
+
+        iterator = iter(items)
+        while True:
+            start = time.time()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self._add_phase_time(phase_name, time.time() - start)
+                return
+            self._add_phase_time(phase_name, time.time() - start)
+            yield item
+
+    def wrap(self, call_name, function):
+        """
+        Returns a version of the given function that counts its calls and the time spent in them
+        :param call_name: str, name used to report the calls
+        :param function: callable
+        :return: callable
+        """
+
+        stats = self._calls.setdefault(call_name, {'count': 0, 'time': 0.0})
+
+        @functools.wraps(function)
+        def _wrapper(*args, **kwargs):
+            start = time.time()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                stats['count'] += 1
+                stats['time'] += time.time() - start
+
+        return _wrapper
+
+    def wrap_matcher(self, matcher):
+        """
+        Returns a copy of the given matcher whose name checks are counted
+        :param matcher: ControlMatcher
+        :return: ControlMatcher
+        """
+
+        profiled_matcher = copy.copy(matcher)
+        profiled_matcher.check_name = self.wrap('check_name', matcher.check_name)
+
+        return profiled_matcher
+
+    def report(self):
+        """
+        Returns the recorded timings and calls
+        :return: dict
+        """
+
+        return {
+            'name': self._name,
+            'total': time.time() - self._start,
+            'phases': OrderedDict(self._phases),
+            'calls': OrderedDict((name, dict(stats)) for name, stats in self._calls.items())
+        }
+
+    def format_report(self):
+        """
+        Returns the recorded timings and calls as a human readable text
+        :return: str
+        """
+
+        report = self.report()
+        lines = ['{}: {:.4f}s'.format(report['name'], report['total'])]
+        for phase_name, phase_time in report['phases'].items():
+            lines.append('    phase {}: {:.4f}s'.format(phase_name, phase_time))
+        for call_name, stats in report['calls'].items():
+            lines.append('    call {}: {} calls, {:.4f}s'.format(call_name, stats['count'], stats['time']))
+
+        return '\n'.join(lines)
+
+    def log_report(self, logger=None):
+        """
+        Logs the recorded timings and calls
+        :param logger: Logger or None
+        """
+
+        (logger or LOGGER).info(self.format_report())
+
+    def _add_phase_time(self, phase_name, elapsed):
+        """
+        Internal function that adds given time to the given phase
+        :param phase_name: str
+        :param elapsed: float
+        """
+
+        self._phases[phase_name] = self._phases.get(phase_name, 0.0) + elapsed
+
+
+@contextmanager
+def profile_phase(profiler, phase_name):
+    """
+    Context manager that adds the time spent inside it to the given phase of the given profiler, if any
+    :param profiler: ScanProfiler or None
+    :param phase_name: str
+    """
+
+    if not profiler:
+        yield
+        return
+
+    with profiler.phase(phase_name):
+        yield
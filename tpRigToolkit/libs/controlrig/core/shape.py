@@ -0,0 +1,278 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains compact data types to store control shapes
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import struct
+import hashlib
+from array import array
+
+HASH_TOLERANCE = 1e-4
+
+
+class ControlShape(object):
+    """
+    Class that stores a single control curve: its CVs as a flat XYZ float array, its degree and its periodic flag
+    """
+
+    __slots__ = ('cvs', 'degree', 'periodic', '__weakref__')
+
+    def __init__(self, cvs=None, degree=3, periodic=0):
+        self.cvs = cvs if isinstance(cvs, array) else _flatten_cvs(cvs)
+        self.degree = int(degree)
+        self.periodic = int(periodic)
+
+    def __len__(self):
+        return len(self.cvs) // 3
+
+    def __eq__(self, other):
+        if not isinstance(other, ControlShape):
+            return NotImplemented
+        return self.degree == other.degree and self.periodic == other.periodic and self.cvs == other.cvs
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __repr__(self):
+        return '{}(cvs={}, degree={}, periodic={})'.format(
+            self.__class__.__name__, len(self), self.degree, self.periodic)
+
+    @classmethod
+    def from_dict(cls, shape_dict):
+        """
+        Creates a new shape from the dictionary layout used by control files
+        :param shape_dict: dict
+        :return: ControlShape
+        """
+
+        return cls(shape_dict.get('cvs'), degree=shape_dict.get('degree', 3), periodic=shape_dict.get('periodic', 0))
+
+    @property
+    def cv_count(self):
+        """
+        Returns the number of CVs of the shape
+        :return: int
+        """
+
+        return len(self.cvs) // 3
+
+    def iter_cvs(self):
+        """
+        Yields the XYZ position of each CV of the shape
+        :return: generator(tuple(float, float, float))
+        """
+
+        cvs = self.cvs
+        for i in range(0, len(cvs), 3):
+            yield cvs[i], cvs[i + 1], cvs[i + 2]
+
+    def content_hash(self, tolerance=HASH_TOLERANCE):
+        """
+        Returns a canonical hash of the shape computed from its CVs quantized to the given tolerance, its degree and
+        its periodic flag. Shapes whose CVs differ less than the tolerance share the same hash
+        :param tolerance: float
+        :return: str
+        """
+
+        return _hash_shape(self.cvs, self.degree, self.periodic, tolerance).hexdigest()
+
+    def to_dict(self):
+        """
+        Returns shape data with the dictionary layout used by control files
+        :return: dict
+        """
+
+        return {'cvs': [list(cv) for cv in self.iter_cvs()], 'degree': self.degree, 'periodic': self.periodic}
+
+
+class ControlShapeSet(object):
+    """
+    Class that stores all the curves of a control in a single contiguous float array
+    Shape i CVs are stored between cvs[offsets[i] * 3] and cvs[offsets[i + 1] * 3]
+    """
+
+    __slots__ = ('name', 'cvs', 'offsets', 'degrees', 'periodics', '__weakref__')
+
+    def __init__(self, name=None, cvs=None, offsets=None, degrees=None, periodics=None):
+        self.name = name
+        self.cvs = cvs if cvs is not None else array('d')
+        self.offsets = offsets if offsets is not None else array('I', [0])
+        self.degrees = degrees if degrees is not None else array('B')
+        self.periodics = periodics if periodics is not None else array('B')
+
+    def __len__(self):
+        return len(self.degrees)
+
+    def __iter__(self):
+        for i in range(len(self.degrees)):
+            yield self.shape(i)
+
+    def __eq__(self, other):
+        if not isinstance(other, ControlShapeSet):
+            return NotImplemented
+        return (self.cvs == other.cvs and self.offsets == other.offsets and self.degrees == other.degrees and
+                self.periodics == other.periodics)
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def __repr__(self):
+        return '{}(name={!r}, shapes={}, cvs={})'.format(self.__class__.__name__, self.name, len(self), self.cv_count)
+
+    @classmethod
+    def from_shapes(cls, shapes, name=None):
+        """
+        Creates a new shape set from the given shapes
+        :param shapes: list(ControlShape or dict)
+        :param name: str or None
+        :return: ControlShapeSet
+        """
+
+        shape_set = cls(name=name)
+        for shape in shapes:
+            shape_set.add_shape(shape)
+
+        return shape_set
+
+    @classmethod
+    def from_data(cls, data, name=None):
+        """
+        Creates a new shape set from any of the control shape layouts used by the library:
+            - ControlShapeSet: returned as is
+            - {name: [shape dicts]}: control files layout
+            - [shape dicts or ControlShape]: shapes list
+        :param data: ControlShapeSet or dict or list
+        :param name: str or None
+        :return: ControlShapeSet or None
+        """
+
+        if data is None or isinstance(data, ControlShapeSet):
+            return data
+        if isinstance(data, dict):
+            if not data:
+                return cls(name=name)
+            data_name, shapes = next(iter(data.items()))
+            return cls.from_shapes(shapes, name=name or data_name)
+
+        return cls.from_shapes(data, name=name)
+
+    @property
+    def cv_count(self):
+        """
+        Returns the number of CVs of all the shapes
+        :return: int
+        """
+
+        return len(self.cvs) // 3
+
+    def add_shape(self, shape):
+        """
+        Appends given shape to the set
+        :param shape: ControlShape or dict
+        """
+
+        if not isinstance(shape, ControlShape):
+            shape = ControlShape.from_dict(shape)
+
+        self.cvs.extend(shape.cvs)
+        self.offsets.append(self.offsets[-1] + shape.cv_count)
+        self.degrees.append(shape.degree)
+        self.periodics.append(shape.periodic)
+
+    def shape(self, index):
+        """
+        Returns the shape with the given index
+        :param index: int
+        :return: ControlShape
+        """
+
+        return ControlShape(
+            self.cvs[self.offsets[index] * 3:self.offsets[index + 1] * 3], self.degrees[index], self.periodics[index])
+
+    def shape_cv_count(self, index):
+        """
+        Returns the number of CVs of the shape with the given index
+        :param index: int
+        :return: int
+        """
+
+        return self.offsets[index + 1] - self.offsets[index]
+
+    def copy(self, name=None):
+        """
+        Returns a copy of this shape set
+        :param name: str or None, name of the new shape set. If not given, current name is used
+        :return: ControlShapeSet
+        """
+
+        return ControlShapeSet(
+            name=name or self.name, cvs=array('d', self.cvs), offsets=array('I', self.offsets),
+            degrees=array('B', self.degrees), periodics=array('B', self.periodics))
+
+    def content_hash(self, tolerance=HASH_TOLERANCE):
+        """
+        Returns a canonical hash of all the shapes of the set. Name of the set is not taken into account
+        :param tolerance: float
+        :return: str
+        """
+
+        set_hash = hashlib.sha1(struct.pack('<I', len(self)))
+        for i in range(len(self)):
+            cvs = self.cvs[self.offsets[i] * 3:self.offsets[i + 1] * 3]
+            set_hash.update(_hash_shape(cvs, self.degrees[i], self.periodics[i], tolerance).digest())
+
+        return set_hash.hexdigest()
+
+    def shapes_data(self):
+        """
+        Returns shapes data with the dictionary layout used by control files
+        :return: list(dict)
+        """
+
+        return [shape.to_dict() for shape in self]
+
+    def to_data(self, name=None):
+        """
+        Returns control data with the layout used by control files
+        :param name: str or None, name used as data key. If not given, shape set name is used
+        :return: dict
+        """
+
+        return {name or self.name: self.shapes_data()}
+
+
+def _flatten_cvs(cvs):
+    """
+    Internal function that converts a list of XYZ positions into a flat float array
+    :param cvs: list(list(float, float, float)) or None
+    :return: array
+    """
+
+    flat_cvs = array('d')
+    for cv in cvs or list():
+        flat_cvs.extend((float(cv[0]), float(cv[1]), float(cv[2])))
+
+    return flat_cvs
+
+
+def _hash_shape(cvs, degree, periodic, tolerance):
+    """
+    Internal function that hashes the given shape values
+    :param cvs: array, flat XYZ values
+    :param degree: int
+    :param periodic: int
+    :param tolerance: float
+    :return: hashlib.sha1
+    """
+
+    quantized = [int(round(value / tolerance)) for value in cvs]
+    shape_hash = hashlib.sha1(struct.pack('<BBI', degree, periodic, len(quantized)))
+    shape_hash.update(struct.pack('<{}q'.format(len(quantized)), *quantized))
+
+    return shape_hash
@@ -0,0 +1,316 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains the in-process cache of parsed control shapes
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import os
+import weakref
+from collections import OrderedDict
+
+from tpRigToolkit.libs.controlrig.core import shapelib, shapeindex, shapemetrics, shapetransform
+from tpRigToolkit.libs.controlrig.core.shape import ControlShapeSet
+
+DEFAULT_MAX_SIZE = 128
+DEFAULT_TRANSFORMED_MAX_SIZE = 512
+
+
+class LRUCache(object):
+    """
+    Bounded least recently used cache that keeps track of its hits and misses
+    """
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE):
+        super(LRUCache, self).__init__()
+
+        self._max_size = max(int(max_size), 0)
+        self._items = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    @property
+    def max_size(self):
+        """
+        Returns the maximum number of items stored by the cache
+        :return: int
+        """
+
+        return self._max_size
+
+    @max_size.setter
+    def max_size(self, value):
+        self._max_size = max(int(value), 0)
+        self._trim()
+
+    @property
+    def hits(self):
+        """
+        Returns the number of lookups that found a valid item
+        :return: int
+        """
+
+        return self._hits
+
+    @property
+    def misses(self):
+        """
+        Returns the number of lookups that did not find a valid item
+        :return: int
+        """
+
+        return self._misses
+
+    def get(self, key, default=None, validator=None):
+        """
+        Returns the item stored with the given key, marking it as the most recently used one
+        :param key: hashable
+        :param default: object, value returned if the key is not cached
+        :param validator: callable or None, if given, cached item is discarded if this function returns False for it
+        :return: object
+        """
+
+        if key not in self._items:
+            self._misses += 1
+            return default
+
+        value = self._items.pop(key)
+        if validator is not None and not validator(value):
+            self._misses += 1
+            return default
+        self._items[key] = value
+        self._hits += 1
+
+        return value
+
+    def put(self, key, value):
+        """
+        Stores given value, discarding the least recently used items if the cache is full
+        :param key: hashable
+        :param value: object
+        """
+
+        self._items.pop(key, None)
+        self._items[key] = value
+        self._trim()
+
+    def pop(self, key, default=None):
+        """
+        Removes the item stored with the given key
+        :param key: hashable
+        :param default: object
+        :return: object
+        """
+
+        return self._items.pop(key, default)
+
+    def clear(self, reset_stats=False):
+        """
+        Removes all cached items
+        :param reset_stats: bool, Whether or not hits and misses counters should be reset
+        """
+
+        self._items.clear()
+        if reset_stats:
+            self._hits = 0
+            self._misses = 0
+
+    def stats(self):
+        """
+        Returns cache usage statistics
+        :return: dict
+        """
+
+        return {'hits': self._hits, 'misses': self._misses, 'size': len(self._items), 'max_size': self._max_size}
+
+    def _trim(self):
+        """
+        Internal function that discards least recently used items until the cache fits its maximum size
+        """
+
+        while len(self._items) > self._max_size:
+            self._items.popitem(last=False)
+
+
+_SHAPES_CACHE = LRUCache()
+_METADATA_CACHE = LRUCache()
+_TRANSFORMED_CACHE = LRUCache(max_size=DEFAULT_TRANSFORMED_MAX_SIZE)
+_CANONICAL_SHAPES = weakref.WeakValueDictionary()
+
+
+def get_cache():
+    """
+    Returns the cache used to store parsed control shapes
+    :return: LRUCache
+    """
+
+    return _SHAPES_CACHE
+
+
+def get_transformed_cache():
+    """
+    Returns the cache used to store transformed control shapes
+    :return: LRUCache
+    """
+
+    return _TRANSFORMED_CACHE
+
+
+def set_max_size(max_size, transformed_max_size=None):
+    """
+    Sets the maximum number of control types the shapes cache can store
+    :param max_size: int
+    :param transformed_max_size: int or None, maximum number of transformed shapes variants the cache can store
+    """
+
+    _SHAPES_CACHE.max_size = max_size
+    if transformed_max_size is not None:
+        _TRANSFORMED_CACHE.max_size = transformed_max_size
+
+
+def cache_stats():
+    """
+    Returns hits, misses and size of the shapes cache
+    :return: dict
+    """
+
+    return _SHAPES_CACHE.stats()
+
+
+def clear_cache(reset_stats=False):
+    """
+    Removes all parsed shapes and their metadata from the cache
+    :param reset_stats: bool
+    """
+
+    _SHAPES_CACHE.clear(reset_stats=reset_stats)
+    _METADATA_CACHE.clear(reset_stats=reset_stats)
+    _TRANSFORMED_CACHE.clear(reset_stats=reset_stats)
+
+
+def get_control_shapes(control_type, controls_path=None):
+    """
+    Returns the shapes of the given control type, loading them only if they are not cached or if their control file
+    changed. Returned shape set is shared between callers and must not be modified
+    :param control_type: str
+    :param controls_path: str or list(str) or None
+    :return: ControlShapeSet or None
+    """
+
+    control_path = shapeindex.find_control_path(control_type, controls_path)
+    if not control_path:
+        return None
+    try:
+        stat = os.stat(control_path)
+    except OSError:
+        return None
+
+    key = (shapeindex.get_index(controls_path).controls_path, control_type)
+    signature = (control_path, stat.st_mtime, stat.st_size)
+    cached = _SHAPES_CACHE.get(key, validator=lambda item: item[0] == signature)
+    if cached:
+        return cached[1]
+
+    library = shapelib.get_library(os.path.dirname(control_path))
+    if library and library.has_control(control_type) and library.mtime >= stat.st_mtime:
+        shape_set = library.shape_set(control_type)
+    else:
+        shape_set = ControlShapeSet.from_data(shapelib.read_control_file(control_path), name=control_type)
+
+    # Controls with the same content (aliases or copies in other libraries) share the same arrays in memory
+    content_hash = shape_set.content_hash()
+    canonical = _CANONICAL_SHAPES.get(content_hash)
+    if canonical is not None and canonical == shape_set:
+        shape_set = ControlShapeSet(
+            name=control_type, cvs=canonical.cvs, offsets=canonical.offsets, degrees=canonical.degrees,
+            periodics=canonical.periodics)
+    else:
+        _CANONICAL_SHAPES[content_hash] = shape_set
+    _SHAPES_CACHE.put(key, (signature, shape_set))
+
+    return shape_set
+
+
+def get_transformed_shapes(control_type, controls_path=None, **kwargs):
+    """
+    Returns the shapes of the given control type with the given creation parameters applied to their CVs
+    Transformed shapes are cached, so requesting the same variant again does not transform CVs again. Cached variants
+    are discarded when the shapes they were computed from change
+    Returned shape set is shared between callers and must not be modified
+    :param control_type: str
+    :param controls_path: str or list(str) or None
+    :param kwargs: dict, creation parameters supported by shapetransform.compose_matrix
+    :return: ControlShapeSet or None
+    """
+
+    shape_set = get_control_shapes(control_type, controls_path)
+    if shape_set is None:
+        return None
+
+    key = (shapeindex.get_index(controls_path).controls_path, control_type, shapetransform.transform_key(**kwargs))
+    cached = _TRANSFORMED_CACHE.get(key, validator=lambda item: item[0] is shape_set)
+    if cached:
+        return cached[1]
+
+    transformed = shapetransform.transform_shapes(shape_set, **kwargs)
+    _TRANSFORMED_CACHE.put(key, (shape_set, transformed))
+
+    return transformed
+
+
+def get_control_data(control_type, controls_path=None):
+    """
+    Returns the data of the given control type with the layout used by control files
+    :param control_type: str
+    :param controls_path: str or list(str) or None
+    :return: dict or None
+    """
+
+    shape_set = get_control_shapes(control_type, controls_path)
+
+    return shape_set.to_data() if shape_set is not None else None
+
+
+def get_control_metadata(control_type, controls_path=None):
+    """
+    Returns the geometric metadata of the given control type
+    Metadata is read from the compiled library if it is up to date; otherwise it is computed from the control shapes
+    :param control_type: str
+    :param controls_path: str or list(str) or None
+    :return: ShapeMetadata or None
+    """
+
+    control_path = shapeindex.find_control_path(control_type, controls_path)
+    if not control_path:
+        return None
+    try:
+        stat = os.stat(control_path)
+    except OSError:
+        return None
+
+    key = (shapeindex.get_index(controls_path).controls_path, control_type)
+    signature = (control_path, stat.st_mtime, stat.st_size)
+    cached = _METADATA_CACHE.get(key, validator=lambda item: item[0] == signature)
+    if cached:
+        return cached[1]
+
+    metadata = None
+    library = shapelib.get_library(os.path.dirname(control_path))
+    if library and library.has_control(control_type) and library.mtime >= stat.st_mtime:
+        metadata = library.metadata(control_type)
+    if metadata is None:
+        shape_set = get_control_shapes(control_type, controls_path)
+        if shape_set is None:
+            return None
+        metadata = shapemetrics.compute_metadata(shape_set)
+    _METADATA_CACHE.put(key, (signature, metadata))
+
+    return metadata
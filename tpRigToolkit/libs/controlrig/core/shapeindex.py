@@ -0,0 +1,296 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains the in-process index used to resolve control names into control files
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import os
+
+from tpRigToolkit.libs.controlrig.core import consts, shapelib
+
+_INDICES = dict()
+
+
+class ControlsIndex(object):
+    """
+    Class that maps control names to the control files of a controls directory and its subdirectories
+    The index is keyed by the modification time of each indexed directory, so it is only rebuilt when control files
+    are added to or removed from any of them; and in that case, only the added and removed entries are updated
+    Control files found in shallower directories take precedence over control files with the same name found in
+    subdirectories
+    """
+
+    def __init__(self, controls_path):
+        super(ControlsIndex, self).__init__()
+
+        self._controls_path = os.path.normpath(controls_path)
+        self._mtimes = None
+        self._entries = dict()
+
+    def __contains__(self, control_name):
+        return self.has_control(control_name)
+
+    def __len__(self):
+        self.refresh()
+        return len(self._entries)
+
+    @property
+    def controls_path(self):
+        """
+        Returns the directory indexed by this index
+        :return: str
+        """
+
+        return self._controls_path
+
+    def refresh(self, force=False):
+        """
+        Updates the index if the controls directory or any of its subdirectories changed since the last refresh
+        :param force: bool, Whether or not to rescan the directories even if their modification time did not change
+        :return: bool, True if the directories were rescanned; False otherwise
+        """
+
+        if not force and self._mtimes is not None and self._mtimes == _get_mtimes(self._mtimes):
+            return False
+
+        # New subdirectories change the modification time of their parent, so they are found when it is rescanned
+        mtimes = dict()
+        found = dict()
+        for dir_path, dir_names, file_names in os.walk(self._controls_path):
+            dir_names.sort()
+            mtimes.update(_get_mtimes([dir_path]))
+            depth = os.path.relpath(dir_path, self._controls_path).count(os.sep)
+            for file_name in sorted(file_names):
+                name, ext = os.path.splitext(file_name)
+                if ext == consts.CONTROL_EXT and (name not in found or depth < found[name][0]):
+                    found[name] = (depth, os.path.join(dir_path, file_name))
+        self._mtimes = mtimes or _get_mtimes([self._controls_path])
+
+        for name in set(self._entries) - set(found):
+            self._entries.pop(name)
+        for name, (_, control_path) in found.items():
+            self._entries[name] = control_path
+
+        return True
+
+    def has_control(self, control_name):
+        """
+        Returns whether or not a control file with the given name exists in the indexed directory
+        :param control_name: str
+        :return: bool
+        """
+
+        self.refresh()
+
+        return control_name in self._entries
+
+    def find_path(self, control_name):
+        """
+        Returns the path of the control file with the given name
+        :param control_name: str
+        :return: str or None
+        """
+
+        self.refresh()
+
+        return self._entries.get(control_name)
+
+    def names(self):
+        """
+        Returns all control names found in the indexed directory
+        :return: list(str)
+        """
+
+        self.refresh()
+
+        return sorted(self._entries.keys())
+
+    def paths(self):
+        """
+        Returns a dictionary that maps control names to their control files
+        :return: dict(str, str)
+        """
+
+        self.refresh()
+
+        return dict(self._entries)
+
+
+class ControlsSearchPath(object):
+    """
+    Class that merges the indices of an ordered list of controls directories into a single lookup table
+    Directories are layered in order: controls found in a directory shadow controls with the same name found in any of
+    the previous directories (for example: package controls, then studio controls, then show controls)
+    """
+
+    def __init__(self, controls_paths):
+        super(ControlsSearchPath, self).__init__()
+
+        self._layers = [get_index(controls_path) for controls_path in controls_paths]
+        self._entries = dict()
+        self._shadowed = dict()
+        self.refresh(force=True)
+
+    def __contains__(self, control_name):
+        return self.has_control(control_name)
+
+    def __len__(self):
+        self.refresh()
+        return len(self._entries)
+
+    @property
+    def controls_path(self):
+        """
+        Returns the ordered directories of the search path
+        :return: tuple(str)
+        """
+
+        return tuple(layer.controls_path for layer in self._layers)
+
+    def refresh(self, force=False):
+        """
+        Rebuilds the merged lookup table if any of the layers changed since the last refresh
+        :param force: bool
+        :return: bool, True if the lookup table was rebuilt; False otherwise
+        """
+
+        changed = [layer.refresh(force=force) for layer in self._layers]
+        if not force and not any(changed):
+            return False
+
+        entries = dict()
+        shadowed = dict()
+        for layer in self._layers:
+            for name, control_path in layer.paths().items():
+                if name in entries:
+                    shadowed.setdefault(name, [entries[name]]).append(control_path)
+                entries[name] = control_path
+        self._entries = entries
+        self._shadowed = shadowed
+
+        return True
+
+    def has_control(self, control_name):
+        """
+        Returns whether or not a control with the given name exists in any of the search path directories
+        :param control_name: str
+        :return: bool
+        """
+
+        self.refresh()
+
+        return control_name in self._entries
+
+    def find_path(self, control_name):
+        """
+        Returns the path of the control file with the given name found in the topmost search path directory
+        :param control_name: str
+        :return: str or None
+        """
+
+        self.refresh()
+
+        return self._entries.get(control_name)
+
+    def names(self):
+        """
+        Returns all control names found in the search path directories
+        :return: list(str)
+        """
+
+        self.refresh()
+
+        return sorted(self._entries.keys())
+
+    def paths(self):
+        """
+        Returns a dictionary that maps control names to the control files that are used for them
+        :return: dict(str, str)
+        """
+
+        self.refresh()
+
+        return dict(self._entries)
+
+    def shadowed(self):
+        """
+        Returns controls defined in more than one directory of the search path
+        :return: dict(str, list(str)), maps control names to their control files, from lowest to topmost layer
+        """
+
+        self.refresh()
+
+        return dict((name, list(control_paths)) for name, control_paths in self._shadowed.items())
+
+
+def get_search_paths():
+    """
+    Returns the default controls search path: controls shipped with the library followed by the directories defined
+    in the controls paths environment variable
+    :return: list(str)
+    """
+
+    search_paths = [shapelib.get_default_controls_path()]
+    for controls_path in os.environ.get(consts.CONTROLS_PATHS_ENV, '').split(os.pathsep):
+        if controls_path and os.path.normpath(controls_path) not in search_paths:
+            search_paths.append(os.path.normpath(controls_path))
+
+    return search_paths
+
+
+def get_index(controls_path=None):
+    """
+    Returns the index of the given controls directory or search path, creating it the first time it is requested
+    :param controls_path: str or list(str) or None, controls directory or ordered list of directories. If not given,
+        the default controls search path is used
+    :return: ControlsIndex or ControlsSearchPath
+    """
+
+    if not controls_path:
+        controls_path = get_search_paths()
+    if isinstance(controls_path, (list, tuple)):
+        controls_paths = tuple(os.path.normpath(path) for path in controls_path)
+        if len(controls_paths) == 1:
+            return get_index(controls_paths[0])
+        index = _INDICES.get(controls_paths)
+        if index is None:
+            index = _INDICES[controls_paths] = ControlsSearchPath(controls_paths)
+        return index
+
+    controls_path = os.path.normpath(controls_path)
+    index = _INDICES.get(controls_path)
+    if index is None:
+        index = _INDICES[controls_path] = ControlsIndex(controls_path)
+
+    return index
+
+
+def _get_mtimes(dir_paths):
+    """
+    Internal function that returns the modification time of the given directories
+    :param dir_paths: list(str)
+    :return: dict(str, float or None), None for directories that do not exist
+    """
+
+    mtimes = dict()
+    for dir_path in dir_paths:
+        try:
+            mtimes[dir_path] = os.stat(dir_path).st_mtime
+        except OSError:
+            mtimes[dir_path] = None
+
+    return mtimes
+
+
+def find_control_path(control_name, controls_path=None):
+    """
+    Returns the path of the control file with the given name located in the given controls directory or search path
+    :param control_name: str
+    :param controls_path: str or list(str) or None
+    :return: str or None
+    """
+
+    return get_index(controls_path).find_path(control_name)
@@ -0,0 +1,660 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains functions to compile control shape files into a packed binary library and to read from it
+
+Binary layout (all values little endian):
+    - header: magic, version, float size, controls count, shapes count, names offset, CVs offset and signature of
+      the control files the library was compiled from
+    - controls table: name offset, name length, first shape index and shapes count of each control
+    - shapes table: CVs byte offset, CVs count, degree and periodic flag of each shape
+    - metadata table: bounding box min and max, centroid, arc length, CVs count and spans count of each control
+    - names table: UTF-8 encoded control names
+    - CVs blocks: packed XYZ float32/float64 values of each shape. Shapes with the same CVs point to the same block
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import os
+import sys
+import json
+import hashlib
+import mmap
+import time
+import struct
+import logging
+import tempfile
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from tpRigToolkit.libs.controlrig.core import consts, shapemetrics
+from tpRigToolkit.libs.controlrig.core.shape import ControlShapeSet
+
+LOGGER = logging.getLogger('tpRigToolkit-libs-controlrig')
+
+MAGIC = b'TPCL'
+VERSION = 4
+HEADER = struct.Struct('<4sHHIIII20s')
+CONTROL_ENTRY = struct.Struct('<IHIH')
+SHAPE_ENTRY = struct.Struct('<IIBB')
+METADATA_ENTRY = struct.Struct('<10dII')
+FLOAT_FORMATS = {4: 'f', 8: 'd'}
+PRECISIONS = {'float32': 4, 'float64': 8}
+
+_LIBRARIES = dict()
+
+
+class ControlShapeLibrary(object):
+    """
+    Class that gives read access to a packed binary control shapes library
+    """
+
+    def __init__(self, buffer, path=None, file_handle=None, mtime=None):
+        super(ControlShapeLibrary, self).__init__()
+
+        self._buffer = buffer
+        self._path = path
+        self._file_handle = file_handle
+        self._mtime = mtime if mtime is not None else time.time()
+        self._controls = dict()
+
+        if len(buffer) < HEADER.size:
+            raise ValueError('Truncated control shapes library: {}'.format(path or '<memory>'))
+        magic, version, float_size, controls_count, shapes_count, names_offset, cvs_offset, signature = (
+            HEADER.unpack_from(buffer, 0))
+        if magic != MAGIC:
+            raise ValueError('Invalid control shapes library: {}'.format(path or '<memory>'))
+        if version != VERSION:
+            raise ValueError('Unsupported control shapes library version {}: {}'.format(version, path or '<memory>'))
+        if float_size not in FLOAT_FORMATS:
+            raise ValueError('Unsupported control shapes library float size {}: {}'.format(
+                float_size, path or '<memory>'))
+
+        self._float_size = float_size
+        self._signature = signature
+        self._shapes_offset = HEADER.size + controls_count * CONTROL_ENTRY.size
+        self._metadata_offset = self._shapes_offset + shapes_count * SHAPE_ENTRY.size
+        self._cvs_offset = cvs_offset
+
+        # Files can be truncated or still being written by another process, so tables are checked against the
+        # buffer size before reading them
+        tables_end = self._metadata_offset + controls_count * METADATA_ENTRY.size
+        if not tables_end <= names_offset <= cvs_offset <= len(buffer):
+            raise ValueError('Truncated control shapes library: {}'.format(path or '<memory>'))
+        for i in range(shapes_count):
+            shape_cvs_offset, cvs_count, _, _ = self._shape_entry(i)
+            if cvs_offset + shape_cvs_offset + cvs_count * 3 * float_size > len(buffer):
+                raise ValueError('Truncated control shapes library: {}'.format(path or '<memory>'))
+
+        view = memoryview(buffer)
+        for i in range(controls_count):
+            name_offset, name_length, first_shape, shape_count = CONTROL_ENTRY.unpack_from(
+                buffer, HEADER.size + i * CONTROL_ENTRY.size)
+            start = names_offset + name_offset
+            if start + name_length > cvs_offset or first_shape + shape_count > shapes_count:
+                raise ValueError('Corrupted control shapes library: {}'.format(path or '<memory>'))
+            name = view[start:start + name_length].tobytes().decode('utf-8')
+            self._controls[name] = (first_shape, shape_count, i)
+
+    @classmethod
+    def from_file(cls, file_path):
+        """
+        Memory maps a packed binary control shapes library from disk
+        Mapped pages are read-only and backed by the OS page cache, so they are shared between all the processes
+        that load the same library
+        :param file_path: str, path of the compiled library file
+        :return: ControlShapeLibrary
+        """
+
+        file_handle = open(file_path, 'rb')
+        try:
+            buffer = mmap.mmap(file_handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            file_handle.close()
+            raise
+
+        return cls(buffer, path=file_path, file_handle=file_handle, mtime=os.path.getmtime(file_path))
+
+    @property
+    def path(self):
+        """
+        Returns path of the compiled library file or None if the library only lives in memory
+        :return: str or None
+        """
+
+        return self._path
+
+    @property
+    def mtime(self):
+        """
+        Returns the time the library was compiled at
+        :return: float
+        """
+
+        return self._mtime
+
+    @property
+    def signature(self):
+        """
+        Returns the signature of the control files the library was compiled from
+        :return: bytes
+        """
+
+        return self._signature
+
+    @property
+    def float_size(self):
+        """
+        Returns the size in bytes of the floats used to store CVs
+        :return: int
+        """
+
+        return self._float_size
+
+    @property
+    def closed(self):
+        """
+        Returns whether or not the library buffer was already released
+        :return: bool
+        """
+
+        return self._buffer is None
+
+    def close(self):
+        """
+        Releases the library buffer and closes the memory mapped file, if any
+        Views returned by cvs_view must not be used after closing the library
+        """
+
+        if self._buffer is None:
+            return
+
+        if isinstance(self._buffer, mmap.mmap):
+            try:
+                self._buffer.close()
+            except BufferError:
+                # There are still exported views; the mapping is released when the last one is garbage collected
+                pass
+        if self._file_handle:
+            self._file_handle.close()
+        self._buffer = None
+        self._file_handle = None
+
+    def names(self):
+        """
+        Returns all control names stored in the library
+        :return: list(str)
+        """
+
+        return sorted(self._controls.keys())
+
+    def has_control(self, control_name):
+        """
+        Returns whether or not given control is stored in the library
+        :param control_name: str
+        :return: bool
+        """
+
+        return control_name in self._controls
+
+    def shapes_count(self, control_name):
+        """
+        Returns the number of shapes of the given control
+        :param control_name: str
+        :return: int
+        """
+
+        control = self._controls.get(control_name)
+
+        return control[1] if control else 0
+
+    def cvs_view(self, control_name, shape_index=0):
+        """
+        Returns a read-only zero-copy view of the CVs of the given control shape
+        If NumPy is available, a (CVs count, 3) array is returned; otherwise a flat memoryview of XYZ values
+        Views can be given to shapetransform.transform_cvs. Shape sets returned by shape_set, used to create controls,
+        own a float64 copy of the CVs instead
+        :param control_name: str
+        :param shape_index: int
+        :return: numpy.ndarray or memoryview or None
+        """
+
+        control = self._controls.get(control_name)
+        if not control or not 0 <= shape_index < control[1]:
+            return None
+
+        cvs_offset, cvs_count, _, _ = self._shape_entry(control[0] + shape_index)
+        start = self._cvs_offset + cvs_offset
+        if numpy is not None:
+            view = numpy.frombuffer(
+                self._buffer, dtype='<f{}'.format(self._float_size), count=cvs_count * 3, offset=start)
+            view = view.reshape(cvs_count, 3)
+            view.flags.writeable = False
+            return view
+
+        view = memoryview(self._buffer)[start:start + cvs_count * 3 * self._float_size]
+
+        return view.cast(FLOAT_FORMATS[self._float_size])
+
+    def shapes_data(self, control_name):
+        """
+        Returns the shapes data of the given control with the same layout used by control files
+        :param control_name: str
+        :return: list(dict) or None
+        """
+
+        control = self._controls.get(control_name)
+        if not control:
+            return None
+
+        first_shape, shape_count, _ = control
+        float_format = FLOAT_FORMATS[self._float_size]
+        shapes = list()
+        for shape_index in range(first_shape, first_shape + shape_count):
+            cvs_offset, cvs_count, degree, periodic = self._shape_entry(shape_index)
+            values = struct.unpack_from(
+                '<{}{}'.format(cvs_count * 3, float_format), self._buffer, self._cvs_offset + cvs_offset)
+            cvs = [list(values[i:i + 3]) for i in range(0, len(values), 3)]
+            shapes.append({'cvs': cvs, 'degree': degree, 'periodic': periodic})
+
+        return shapes
+
+    def shape_set(self, control_name):
+        """
+        Returns the shapes of the given control as a shape set, copying contiguous CVs blocks with a single read
+        :param control_name: str
+        :return: ControlShapeSet or None
+        """
+
+        control = self._controls.get(control_name)
+        if not control:
+            return None
+
+        first_shape, shape_count, _ = control
+        shape_set = ControlShapeSet(name=control_name)
+        ranges = list()
+        for shape_index in range(first_shape, first_shape + shape_count):
+            cvs_offset, cvs_count, degree, periodic = self._shape_entry(shape_index)
+            start = self._cvs_offset + cvs_offset
+            end = start + cvs_count * 3 * self._float_size
+            # Deduplicated shapes can point to blocks stored anywhere, so we only merge blocks that are contiguous
+            if ranges and ranges[-1][1] == start:
+                ranges[-1][1] = end
+            else:
+                ranges.append([start, end])
+            shape_set.offsets.append(shape_set.offsets[-1] + cvs_count)
+            shape_set.degrees.append(degree)
+            shape_set.periodics.append(periodic)
+
+        view = memoryview(self._buffer)
+        values = array(FLOAT_FORMATS[self._float_size])
+        for start, end in ranges:
+            _array_frombytes(values, view[start:end])
+        shape_set.cvs = values if self._float_size == 8 else array('d', values)
+
+        return shape_set
+
+    def metadata(self, control_name):
+        """
+        Returns the precomputed geometric metadata of the given control
+        :param control_name: str
+        :return: ShapeMetadata or None
+        """
+
+        control = self._controls.get(control_name)
+        if not control:
+            return None
+
+        values = METADATA_ENTRY.unpack_from(self._buffer, self._metadata_offset + control[2] * METADATA_ENTRY.size)
+
+        return shapemetrics.ShapeMetadata(
+            bbox_min=values[0:3], bbox_max=values[3:6], centroid=values[6:9], arc_length=values[9],
+            cv_count=values[10], span_count=values[11])
+
+    def control_data(self, control_name):
+        """
+        Returns the data of the given control with the same layout used by control files
+        :param control_name: str
+        :return: dict or None
+        """
+
+        shapes = self.shapes_data(control_name)
+        if shapes is None:
+            return None
+
+        return {control_name: shapes}
+
+    def _shape_entry(self, shape_index):
+        """
+        Internal function that returns the table entry of the given shape
+        :param shape_index: int
+        :return: tuple(int, int, int, int), CVs byte offset, CVs count, degree and periodic flag
+        """
+
+        return SHAPE_ENTRY.unpack_from(self._buffer, self._shapes_offset + shape_index * SHAPE_ENTRY.size)
+
+
+def get_default_controls_path():
+    """
+    Returns path where controls shipped with tpRigToolkit-libs-controlrig are located
+    :return: str
+    """
+
+    return os.path.normpath(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'controls'))
+
+
+def get_cache_path():
+    """
+    Returns the user directory where compiled libraries are stored, so they are never written into installed packages
+    Directory can be changed with an environment variable
+    :return: str
+    """
+
+    cache_path = os.environ.get(consts.LIBRARY_CACHE_PATH_ENV)
+    if cache_path:
+        return os.path.normpath(cache_path)
+
+    if sys.platform == 'win32':
+        root = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    elif sys.platform == 'darwin':
+        root = os.path.join(os.path.expanduser('~'), 'Library', 'Caches')
+    else:
+        root = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+
+    return os.path.join(root, 'tpRigToolkit', 'controlrig')
+
+
+def get_library_path(controls_path=None):
+    """
+    Returns path where the compiled library of the given controls directory is stored
+    Each controls directory has its own library file in the user cache directory
+    :param controls_path: str or None
+    :return: str
+    """
+
+    controls_path = os.path.normcase(os.path.abspath(controls_path or get_default_controls_path()))
+    name, ext = os.path.splitext(consts.COMPILED_LIBRARY_NAME)
+    path_hash = hashlib.sha1(controls_path.encode('utf-8')).hexdigest()[:16]
+
+    return os.path.join(get_cache_path(), '{}_{}{}'.format(name, path_hash, ext))
+
+
+def get_controls_signature(controls_path=None):
+    """
+    Returns the signature of the control files of the given directory: a digest of their names, modification times
+    and sizes. It changes when any control file is added, removed or modified
+    :param controls_path: str or None
+    :return: bytes
+    """
+
+    digest = hashlib.sha1()
+    for name, file_path in iter_control_files(controls_path or get_default_controls_path()):
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            continue
+        digest.update('{}:{!r}:{}\n'.format(name, stat.st_mtime, stat.st_size).encode('utf-8'))
+
+    return digest.digest()
+
+
+def iter_control_files(controls_path):
+    """
+    Yields name and path of all control files located in the given directory sorted by name
+    :param controls_path: str
+    :return: generator(tuple(str, str))
+    """
+
+    if not controls_path or not os.path.isdir(controls_path):
+        return
+
+    for file_name in sorted(os.listdir(controls_path)):
+        name, ext = os.path.splitext(file_name)
+        if ext != consts.CONTROL_EXT:
+            continue
+        yield name, os.path.join(controls_path, file_name)
+
+
+def read_control_file(file_path):
+    """
+    Parses given control file and returns its shapes data
+    :param file_path: str
+    :return: list(dict)
+    """
+
+    with open(file_path, 'r') as fh:
+        data = json.load(fh)
+
+    if not data:
+        return list()
+
+    return list(data.values())[0]
+
+
+def pack_library(controls, precision='float32', signature=b''):
+    """
+    Packs given controls into a binary library buffer
+    Shapes with identical CVs, once packed with the given precision, share a single CVs block
+    :param controls: list(tuple(str, list(dict) or ControlShapeSet)), list of control names and their shapes
+    :param precision: str, precision used to store CVs ('float32' or 'float64')
+    :param signature: bytes, signature of the control files the controls were read from, as returned by
+        get_controls_signature
+    :return: bytes
+    """
+
+    float_size = PRECISIONS[precision]
+    float_format = FLOAT_FORMATS[float_size]
+
+    controls = sorted(
+        ((name, ControlShapeSet.from_data(shapes, name=name)) for name, shapes in controls),
+        key=lambda control: control[0])
+    control_entries = list()
+    shape_entries = list()
+    metadata_entries = list()
+    names = list()
+    cv_blocks = list()
+    block_offsets = dict()
+    names_size = 0
+    cvs_size = 0
+    for name, shape_set in controls:
+        encoded_name = name.encode('utf-8')
+        control_entries.append(CONTROL_ENTRY.pack(names_size, len(encoded_name), len(shape_entries), len(shape_set)))
+        names.append(encoded_name)
+        names_size += len(encoded_name)
+        metadata = shapemetrics.compute_metadata(shape_set)
+        metadata_entries.append(METADATA_ENTRY.pack(*(
+            metadata.bbox_min + metadata.bbox_max + metadata.centroid +
+            (metadata.arc_length, metadata.cv_count, metadata.span_count))))
+        for shape in shape_set:
+            block = struct.pack('<{}{}'.format(len(shape.cvs), float_format), *shape.cvs)
+            block_offset = block_offsets.get(block)
+            if block_offset is None:
+                block_offset = block_offsets[block] = cvs_size
+                cv_blocks.append(block)
+                cvs_size += len(block)
+            shape_entries.append(SHAPE_ENTRY.pack(block_offset, shape.cv_count, shape.degree, shape.periodic))
+
+    names_offset = (HEADER.size + len(control_entries) * CONTROL_ENTRY.size + len(shape_entries) * SHAPE_ENTRY.size +
+                    len(metadata_entries) * METADATA_ENTRY.size)
+    padding = -(names_offset + names_size) % 8
+    cvs_offset = names_offset + names_size + padding
+
+    header = HEADER.pack(
+        MAGIC, VERSION, float_size, len(control_entries), len(shape_entries), names_offset, cvs_offset, signature)
+
+    return b''.join(
+        [header] + control_entries + shape_entries + metadata_entries + names + [b'\x00' * padding] + cv_blocks)
+
+
+def write_library(data, output_path):
+    """
+    Writes given packed library into the given path
+    Data is written into a temporary file of the same directory that replaces the library once complete, so other
+    processes never load a partially written library
+    :param data: bytes, packed library
+    :param output_path: str
+    :return: str, path of the written library
+    """
+
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    if not os.path.isdir(output_dir):
+        os.makedirs(output_dir)
+    file_descriptor, temp_path = tempfile.mkstemp(
+        prefix='.{}.'.format(os.path.basename(output_path)), suffix='.tmp', dir=output_dir)
+    try:
+        with os.fdopen(file_descriptor, 'wb') as fh:
+            fh.write(data)
+        # Temporary files are only readable by their owner, but libraries can be shared between users
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(temp_path, 0o666 & ~umask)
+        _replace_file(temp_path, output_path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    return output_path
+
+
+def compile_library(controls_path=None, output_path=None, precision='float32'):
+    """
+    Compiles all control files of the given directory into a single packed binary library file
+    :param controls_path: str or None, directory where control files are located
+    :param output_path: str or None, path of the compiled library. If not given, the library is stored in the user
+        cache directory
+    :param precision: str, precision used to store CVs ('float32' or 'float64')
+    :return: str, path of the compiled library
+    """
+
+    controls_path = controls_path or get_default_controls_path()
+    output_path = output_path or get_library_path(controls_path)
+
+    # Signature is computed before reading the files, so a file modified while compiling makes the library outdated
+    signature = get_controls_signature(controls_path)
+    controls = [(name, read_control_file(file_path)) for name, file_path in iter_control_files(controls_path)]
+    write_library(pack_library(controls, precision=precision, signature=signature), output_path)
+
+    LOGGER.debug('Compiled {} controls into: {}'.format(len(controls), output_path))
+
+    return output_path
+
+
+def is_library_outdated(controls_path=None, library_path=None):
+    """
+    Returns whether or not the compiled library is missing or was compiled from other control files than the current
+    ones: a control file was added, removed or modified since it was compiled
+    :param controls_path: str or None
+    :param library_path: str or None
+    :return: bool
+    """
+
+    controls_path = controls_path or get_default_controls_path()
+    library_path = library_path or get_library_path(controls_path)
+    try:
+        with open(library_path, 'rb') as fh:
+            header = fh.read(HEADER.size)
+    except (IOError, OSError):
+        return True
+    if len(header) < HEADER.size:
+        return True
+
+    magic, version = HEADER.unpack(header)[:2]
+    if magic != MAGIC or version != VERSION:
+        return True
+
+    return HEADER.unpack(header)[-1] != get_controls_signature(controls_path)
+
+
+def get_library(controls_path=None, force=False):
+    """
+    Returns the compiled library of the given controls directory, compiling it if necessary
+    Signature of the control files is checked on every call, so a library is compiled again as soon as its control
+    files change. Replaced libraries are not closed: shapes and views still using them keep them alive
+    If the compiled library cannot be written to disk, it is compiled in memory instead
+    :param controls_path: str or None
+    :param force: bool, Whether or not to reload the library even if it is up to date
+    :return: ControlShapeLibrary or None
+    """
+
+    controls_path = os.path.normpath(controls_path or get_default_controls_path())
+    if not os.path.isdir(controls_path):
+        _LIBRARIES.pop(controls_path, None)
+        return None
+
+    signature = get_controls_signature(controls_path)
+    library = _LIBRARIES.get(controls_path)
+    if not force and library is not None and library.signature == signature:
+        return library
+
+    library_path = get_library_path(controls_path)
+    library = None
+    if not is_library_outdated(controls_path, library_path):
+        try:
+            library = ControlShapeLibrary.from_file(library_path)
+        except (ValueError, struct.error) as exc:
+            # Corrupted libraries are compiled again
+            LOGGER.debug('Compiled library "{}" will be compiled again: {}'.format(library_path, exc))
+    if library is None:
+        try:
+            compile_library(controls_path, output_path=library_path)
+            library = ControlShapeLibrary.from_file(library_path)
+        except (IOError, OSError, ValueError, struct.error) as exc:
+            LOGGER.debug('Impossible to write compiled library "{}": {}'.format(library_path, exc))
+            controls = [(name, read_control_file(file_path)) for name, file_path in iter_control_files(controls_path)]
+            library = ControlShapeLibrary(pack_library(controls, signature=signature))
+    _LIBRARIES[controls_path] = library
+
+    return library
+
+
+def get_control_data(control_type, controls_path=None):
+    """
+    Returns the data of the given control type from the compiled library of the given controls directory
+    :param control_type: str
+    :param controls_path: str or None
+    :return: dict or None
+    """
+
+    library = get_library(controls_path)
+    if not library:
+        return None
+
+    return library.control_data(control_type)
+
+
+def _array_frombytes(values, data):
+    """
+    Internal function that appends little endian packed values to the given array
+    :param values: array
+    :param data: bytes or memoryview
+    """
+
+    if hasattr(values, 'frombytes'):
+        values.frombytes(data)
+    else:
+        values.fromstring(data.tobytes() if isinstance(data, memoryview) else data)
+    if sys.byteorder != 'little':
+        values.byteswap()
+
+
+def _replace_file(source_path, target_path):
+    """
+    Internal function that moves given file into the given path, replacing it if it already exists
+    :param source_path: str
+    :param target_path: str
+    """
+
+    if hasattr(os, 'replace'):
+        os.replace(source_path, target_path)
+        return
+
+    # Python 2: rename is atomic on POSIX, but fails on Windows if the target exists
+    if os.name == 'nt' and os.path.exists(target_path):
+        os.remove(target_path)
+    os.rename(source_path, target_path)
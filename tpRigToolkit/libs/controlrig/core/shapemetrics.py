@@ -0,0 +1,181 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains functions to compute geometric metadata of control shapes
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import math
+
+DEFAULT_SAMPLES_PER_SPAN = 8
+
+
+class ShapeMetadata(object):
+    """
+    Class that stores geometric metadata of all the curves of a control
+    Bounding box is computed from the CVs of the curves, so it matches the bounding box Maya reports for NURBS curves,
+    which encloses their CVs and not only the points on the curves. Arc length is measured on points sampled on the
+    curves
+    """
+
+    __slots__ = ('bbox_min', 'bbox_max', 'centroid', 'cv_count', 'span_count', 'arc_length')
+
+    def __init__(
+            self, bbox_min=(0.0, 0.0, 0.0), bbox_max=(0.0, 0.0, 0.0), centroid=(0.0, 0.0, 0.0), cv_count=0,
+            span_count=0, arc_length=0.0):
+        self.bbox_min = tuple(bbox_min)
+        self.bbox_max = tuple(bbox_max)
+        self.centroid = tuple(centroid)
+        self.cv_count = int(cv_count)
+        self.span_count = int(span_count)
+        self.arc_length = float(arc_length)
+
+    def __repr__(self):
+        return '{}(size={}, cv_count={}, span_count={}, arc_length={})'.format(
+            self.__class__.__name__, self.size, self.cv_count, self.span_count, self.arc_length)
+
+    @property
+    def extents(self):
+        """
+        Returns the bounding box dimensions along each axis
+        :return: tuple(float, float, float)
+        """
+
+        return tuple(self.bbox_max[i] - self.bbox_min[i] for i in range(3))
+
+    @property
+    def size(self):
+        """
+        Returns the bounding box size: the distance between bounding box min and max points
+        :return: float
+        """
+
+        return math.sqrt(sum(extent * extent for extent in self.extents))
+
+    def scaled_size(self, control_size=1.0, scale=(1.0, 1.0, 1.0)):
+        """
+        Returns the bounding box size of the shape once the given size and scale are applied to it
+        :param control_size: float, uniform size
+        :param scale: tuple(float, float, float), per axis scale
+        :return: float
+        """
+
+        return math.sqrt(sum(
+            (extent * scale[i] * control_size) ** 2 for i, extent in enumerate(self.extents)))
+
+
+def span_count(cv_count, degree, periodic):
+    """
+    Returns the number of spans of a curve
+    :param cv_count: int
+    :param degree: int
+    :param periodic: int
+    :return: int
+    """
+
+    if periodic:
+        return cv_count if degree > 1 or cv_count > 2 else max(cv_count - 1, 0)
+
+    return max(cv_count - degree, 0)
+
+
+def sample_shape(shape, samples_per_span=DEFAULT_SAMPLES_PER_SPAN):
+    """
+    Returns points evaluated along the given curve
+    Periodic curves are evaluated as uniform closed B-splines and open curves as uniform clamped B-splines
+    :param shape: ControlShape
+    :param samples_per_span: int, number of points evaluated per span for curves with degree higher than 1
+    :return: list(tuple(float, float, float))
+    """
+
+    points = list(shape.iter_cvs())
+    degree = shape.degree
+    if not points:
+        return list()
+    if degree <= 1 or len(points) <= degree:
+        if shape.periodic and len(points) > 2:
+            points.append(points[0])
+        return points
+
+    if shape.periodic:
+        control_points = points + points[:degree]
+        spans = len(points)
+        knots = list(range(len(control_points) + degree + 1))
+        start = degree
+    else:
+        control_points = points
+        spans = len(points) - degree
+        knots = [0] * (degree + 1) + list(range(1, spans)) + [spans] * (degree + 1)
+        start = 0
+
+    samples = list()
+    for span in range(spans):
+        for i in range(samples_per_span):
+            samples.append(_de_boor(start + span + i / samples_per_span, knots, control_points, degree))
+    if not shape.periodic:
+        samples.append(tuple(control_points[-1]))
+    else:
+        samples.append(samples[0])
+
+    return samples
+
+
+def compute_metadata(shape_set, samples_per_span=DEFAULT_SAMPLES_PER_SPAN):
+    """
+    Computes geometric metadata of the given shapes
+    :param shape_set: ControlShapeSet
+    :param samples_per_span: int
+    :return: ShapeMetadata
+    """
+
+    bbox_min = [float('inf')] * 3
+    bbox_max = [float('-inf')] * 3
+    cvs_sum = [0.0, 0.0, 0.0]
+    spans = 0
+    arc_length = 0.0
+    for shape in shape_set:
+        spans += span_count(shape.cv_count, shape.degree, shape.periodic)
+        for cv in shape.iter_cvs():
+            for axis in range(3):
+                cvs_sum[axis] += cv[axis]
+                bbox_min[axis] = min(bbox_min[axis], cv[axis])
+                bbox_max[axis] = max(bbox_max[axis], cv[axis])
+        samples = sample_shape(shape, samples_per_span=samples_per_span)
+        for i, point in enumerate(samples):
+            if i:
+                arc_length += math.sqrt(sum((point[axis] - samples[i - 1][axis]) ** 2 for axis in range(3)))
+
+    cv_count = shape_set.cv_count
+    if not cv_count:
+        return ShapeMetadata()
+
+    return ShapeMetadata(
+        bbox_min=bbox_min, bbox_max=bbox_max, centroid=[value / cv_count for value in cvs_sum], cv_count=cv_count,
+        span_count=spans, arc_length=arc_length)
+
+
+def _de_boor(x, knots, control_points, degree):
+    """
+    Internal function that evaluates a B-spline at the given parameter using de Boor's algorithm
+    :param x: float, parameter
+    :param knots: list(float), knot vector
+    :param control_points: list(tuple(float, float, float))
+    :param degree: int
+    :return: tuple(float, float, float)
+    """
+
+    k = degree
+    while k < len(control_points) - 1 and knots[k + 1] <= x:
+        k += 1
+
+    d = [list(control_points[j + k - degree]) for j in range(degree + 1)]
+    for r in range(1, degree + 1):
+        for j in range(degree, r - 1, -1):
+            left = knots[j + k - degree]
+            right = knots[j + 1 + k - r]
+            alpha = (x - left) / (right - left) if right != left else 0.0
+            d[j] = [(1.0 - alpha) * d[j - 1][axis] + alpha * d[j][axis] for axis in range(3)]
+
+    return tuple(d[degree])
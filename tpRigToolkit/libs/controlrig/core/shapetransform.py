@@ -0,0 +1,251 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains functions to transform control shapes CVs before they are created in the DCC
+All creation parameters (size, scale, axis order, mirror, translate and rotate offsets) are composed into a single
+4x4 matrix that is applied to all the CVs of a control in one operation. Transforms are applied in this order:
+    1. size and scale
+    2. axis order permutation
+    3. mirror
+    4. translate offset
+    5. rotate offset (around the control origin, in XYZ rotation order)
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import math
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from tpRigToolkit.libs.controlrig.core.shape import ControlShapeSet
+
+AXES = 'XYZ'
+IDENTITY = ((1.0, 0.0, 0.0, 0.0), (0.0, 1.0, 0.0, 0.0), (0.0, 0.0, 1.0, 0.0), (0.0, 0.0, 0.0, 1.0))
+
+
+def multiply_matrices(matrix_a, matrix_b):
+    """
+    Returns the product of the given 4x4 matrices. Resulting matrix applies matrix_b first and matrix_a after it
+    :param matrix_a: tuple(tuple(float))
+    :param matrix_b: tuple(tuple(float))
+    :return: tuple(tuple(float))
+    """
+
+    return tuple(
+        tuple(sum(matrix_a[row][k] * matrix_b[k][column] for k in range(4)) for column in range(4))
+        for row in range(4))
+
+
+def scale_matrix(scale):
+    """
+    Returns a matrix that scales along each axis
+    :param scale: tuple(float, float, float)
+    :return: tuple(tuple(float))
+    """
+
+    return tuple(
+        tuple(float(scale[row]) if row == column and row < 3 else float(row == column) for column in range(4))
+        for row in range(4))
+
+
+def axis_order_matrix(axis_order='XYZ'):
+    """
+    Returns a matrix that permutes CVs coordinates following the given axis order. Component i of transformed CVs
+    is taken from the axis found at position i of the axis order: with "ZXY", new X is old Z, new Y is old X and new
+    Z is old Y
+    :param axis_order: str
+    :return: tuple(tuple(float))
+    """
+
+    axis_order = (axis_order or AXES).upper()
+    if sorted(axis_order) != list(AXES):
+        raise ValueError('Invalid axis order: "{}"'.format(axis_order))
+
+    return tuple(
+        tuple(float(row == column == 3 or (row < 3 and column == AXES.index(axis_order[row]))) for column in range(4))
+        for row in range(4))
+
+
+def mirror_matrix(mirror=None, pivot=None):
+    """
+    Returns a matrix that mirrors CVs along the given axis
+    :param mirror: str or None, 'X', 'Y' or 'Z'
+    :param pivot: tuple(float, float, float) or None, point the mirror plane goes through. If not given, the plane
+        goes through the origin
+    :return: tuple(tuple(float))
+    """
+
+    if not mirror:
+        return IDENTITY
+
+    mirror = mirror.upper()
+    if mirror not in AXES:
+        raise ValueError('Invalid mirror axis: "{}"'.format(mirror))
+
+    matrix = scale_matrix([-1.0 if axis == mirror else 1.0 for axis in AXES])
+    if pivot and any(pivot):
+        matrix = multiply_matrices(
+            translate_matrix(pivot), multiply_matrices(matrix, translate_matrix([-value for value in pivot])))
+
+    return matrix
+
+
+def translate_matrix(translate):
+    """
+    Returns a matrix that translates CVs by the given offset
+    :param translate: tuple(float, float, float)
+    :return: tuple(tuple(float))
+    """
+
+    return tuple(
+        tuple(float(translate[row]) if column == 3 and row < 3 else float(row == column) for column in range(4))
+        for row in range(4))
+
+
+def rotate_matrix(rotate):
+    """
+    Returns a matrix that rotates CVs by the given XYZ euler angles, in degrees, using XYZ rotation order
+    :param rotate: tuple(float, float, float)
+    :return: tuple(tuple(float))
+    """
+
+    matrix = IDENTITY
+    for axis, angle in enumerate(rotate):
+        if not angle:
+            continue
+        cos = math.cos(math.radians(angle))
+        sin = math.sin(math.radians(angle))
+        first, second = [i for i in range(3) if i != axis]
+        axis_matrix = [list(row) for row in IDENTITY]
+        axis_matrix[first][first] = cos
+        axis_matrix[second][second] = cos
+        # Keep right handed rotations: Y axis rotation has its sine terms flipped
+        axis_matrix[first][second] = -sin if axis != 1 else sin
+        axis_matrix[second][first] = sin if axis != 1 else -sin
+        matrix = multiply_matrices(tuple(tuple(row) for row in axis_matrix), matrix)
+
+    return matrix
+
+
+def invert_matrix(matrix):
+    """
+    Returns the inverse of the given affine 4x4 matrix
+    :param matrix: tuple(tuple(float))
+    :return: tuple(tuple(float))
+    """
+
+    (a, b, c), (d, e, f), (g, h, i) = [row[:3] for row in matrix[:3]]
+    cofactors = (
+        (e * i - f * h, c * h - b * i, b * f - c * e),
+        (f * g - d * i, a * i - c * g, c * d - a * f),
+        (d * h - e * g, b * g - a * h, a * e - b * d))
+    determinant = a * cofactors[0][0] + b * cofactors[1][0] + c * cofactors[2][0]
+    if not determinant:
+        raise ValueError('Matrix is not invertible')
+
+    rotation = [[value / determinant for value in row] for row in cofactors]
+    translation = [row[3] for row in matrix[:3]]
+    rows = [
+        tuple(rotation[row]) + (-sum(rotation[row][k] * translation[k] for k in range(3)),) for row in range(3)]
+
+    return tuple(rows) + ((0.0, 0.0, 0.0, 1.0),)
+
+
+def compose_matrix(
+        control_size=1.0, translate_offset=(0.0, 0.0, 0.0), rotate_offset=(0.0, 0.0, 0.0), scale=(1.0, 1.0, 1.0),
+        axis_order='XYZ', mirror=None):
+    """
+    Returns the matrix that applies all the given creation parameters to control CVs
+    :param control_size: float, global size of the control
+    :param translate_offset: tuple(float, float, float), XYZ translation offset
+    :param rotate_offset: tuple(float, float, float), XYZ rotation offset in degrees
+    :param scale: tuple(float, float, float), XYZ scale
+    :param axis_order: str, axis order of the control
+    :param mirror: str or None, mirror axis ('X', 'Y' or 'Z')
+    :return: tuple(tuple(float))
+    """
+
+    control_size = float(control_size if control_size is not None else 1.0)
+    matrix = scale_matrix([value * control_size for value in (scale or (1.0, 1.0, 1.0))])
+    if axis_order and axis_order.upper() != AXES:
+        matrix = multiply_matrices(axis_order_matrix(axis_order), matrix)
+    if mirror:
+        matrix = multiply_matrices(mirror_matrix(mirror), matrix)
+    if translate_offset and any(translate_offset):
+        matrix = multiply_matrices(translate_matrix(translate_offset), matrix)
+    if rotate_offset and any(rotate_offset):
+        matrix = multiply_matrices(rotate_matrix(rotate_offset), matrix)
+
+    return matrix
+
+
+def transform_cvs(cvs, matrix):
+    """
+    Applies given matrix to all the given CVs at once
+    :param cvs: array or memoryview or numpy.ndarray, flat XYZ values or read-only CVs view of a compiled library,
+        stored as float32 or float64 values
+    :param matrix: tuple(tuple(float))
+    :return: array, new flat XYZ values
+    """
+
+    if numpy is not None and len(cvs):
+        points = numpy.asarray(cvs, dtype=numpy.float64).reshape(-1, 3)
+        np_matrix = numpy.array(matrix, dtype=numpy.float64)
+        result = points.dot(np_matrix[:3, :3].T) + np_matrix[:3, 3]
+        return array('d', result.ravel().tobytes())
+
+    (m00, m01, m02, m03), (m10, m11, m12, m13), (m20, m21, m22, m23) = matrix[:3]
+    result = array('d', cvs)
+    for i in range(0, len(cvs), 3):
+        x, y, z = cvs[i], cvs[i + 1], cvs[i + 2]
+        result[i] = m00 * x + m01 * y + m02 * z + m03
+        result[i + 1] = m10 * x + m11 * y + m12 * z + m13
+        result[i + 2] = m20 * x + m21 * y + m22 * z + m23
+
+    return result
+
+
+def transform_key(
+        control_size=1.0, translate_offset=(0.0, 0.0, 0.0), rotate_offset=(0.0, 0.0, 0.0), scale=(1.0, 1.0, 1.0),
+        axis_order='XYZ', mirror=None):
+    """
+    Returns a hashable key that identifies the given creation parameters. Equivalent parameters share the same key
+    :param control_size: float
+    :param translate_offset: tuple(float, float, float)
+    :param rotate_offset: tuple(float, float, float)
+    :param scale: tuple(float, float, float)
+    :param axis_order: str
+    :param mirror: str or None
+    :return: tuple
+    """
+
+    return (
+        float(control_size if control_size is not None else 1.0),
+        tuple(float(value) for value in (translate_offset or (0.0, 0.0, 0.0))),
+        tuple(float(value) for value in (rotate_offset or (0.0, 0.0, 0.0))),
+        tuple(float(value) for value in (scale or (1.0, 1.0, 1.0))),
+        (axis_order or AXES).upper(),
+        mirror.upper() if mirror else None)
+
+
+def transform_shapes(shape_set, **kwargs):
+    """
+    Returns a copy of the given shapes with all the given creation parameters applied to their CVs
+    Curves topology arrays are shared with the given shape set, only CVs are copied
+    :param shape_set: ControlShapeSet
+    :param kwargs: dict, creation parameters supported by compose_matrix
+    :return: ControlShapeSet, given shape set if the parameters do not modify it
+    """
+
+    matrix = compose_matrix(**kwargs)
+    if matrix == IDENTITY:
+        return shape_set
+
+    return ControlShapeSet(
+        name=shape_set.name, cvs=transform_cvs(shape_set.cvs, matrix), offsets=shape_set.offsets,
+        degrees=shape_set.degrees, periodics=shape_set.periodics)
@@ -0,0 +1,264 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains the category and tag model of the controls library
+Controls are tagged with:
+    - the tokens of their name: "arrow_style_3D" -> "arrow", "style", "3d"
+    - their dimensionality, if it is not part of their name: "2d" if all their CVs lie in an axis plane; "3d" otherwise
+    - "closed" or "open" depending on whether their curves are periodic or not
+    - the categories they belong to, as defined in the "categories" section of the library data file
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import os
+import re
+
+from tpRigToolkit.libs.controlrig.core import shapeindex, shapecache, libstream
+
+NAME_TOKENS = re.compile(r'\d+d|[a-z]+')
+PLANAR_TOLERANCE = 1e-6
+
+_TAG_INDICES = dict()
+
+
+class TagIndex(object):
+    """
+    Inverted index that maps tags to the set of ids tagged with them
+    """
+
+    def __init__(self):
+        super(TagIndex, self).__init__()
+
+        self._ids_by_tag = dict()
+        self._tags_by_id = dict()
+
+    def __contains__(self, item_id):
+        return item_id in self._tags_by_id
+
+    def __len__(self):
+        return len(self._tags_by_id)
+
+    def add(self, item_id, tags):
+        """
+        Tags given id with the given tags
+        :param item_id: str
+        :param tags: list(str)
+        """
+
+        item_tags = self._tags_by_id.setdefault(item_id, set())
+        for tag in tags:
+            tag = normalize_tag(tag)
+            item_tags.add(tag)
+            self._ids_by_tag.setdefault(tag, set()).add(item_id)
+
+    def remove(self, item_id):
+        """
+        Removes given id and all its tags from the index
+        :param item_id: str
+        """
+
+        for tag in self._tags_by_id.pop(item_id, set()):
+            ids = self._ids_by_tag[tag]
+            ids.discard(item_id)
+            if not ids:
+                self._ids_by_tag.pop(tag)
+
+    def ids(self, tag=None):
+        """
+        Returns ids tagged with the given tag or all the ids if no tag is given
+        :param tag: str or None
+        :return: set(str)
+        """
+
+        if tag is None:
+            return set(self._tags_by_id)
+
+        return set(self._ids_by_tag.get(normalize_tag(tag), set()))
+
+    def tags(self, item_id=None):
+        """
+        Returns tags of the given id or all the tags of the index if no id is given
+        :param item_id: str or None
+        :return: set(str)
+        """
+
+        if item_id is None:
+            return set(self._ids_by_tag)
+
+        return set(self._tags_by_id.get(item_id, set()))
+
+    def intersection(self, *tags):
+        """
+        Returns ids tagged with all the given tags
+        :return: set(str)
+        """
+
+        id_sets = sorted((self._ids_by_tag.get(normalize_tag(tag), set()) for tag in tags), key=len)
+        if not id_sets:
+            return set()
+
+        return set(id_sets[0]).intersection(*id_sets[1:])
+
+    def union(self, *tags):
+        """
+        Returns ids tagged with any of the given tags
+        :return: set(str)
+        """
+
+        return set().union(*(self._ids_by_tag.get(normalize_tag(tag), set()) for tag in tags))
+
+    def query(self, all_of=None, any_of=None, none_of=None):
+        """
+        Returns ids that have all the tags of all_of, at least one of the tags of any_of and none of the tags of
+        none_of. If all_of and any_of are not given, all the ids are taken into account
+        :param all_of: list(str) or None
+        :param any_of: list(str) or None
+        :param none_of: list(str) or None
+        :return: set(str)
+        """
+
+        result = self.intersection(*all_of) if all_of else None
+        if any_of:
+            matches = self.union(*any_of)
+            result = matches if result is None else result & matches
+        if result is None:
+            result = self.ids()
+        if none_of and result:
+            result -= self.union(*none_of)
+
+        return result
+
+
+def normalize_tag(tag):
+    """
+    Returns the normalized version of the given tag
+    :param tag: str
+    :return: str
+    """
+
+    return tag.strip().lower()
+
+
+def name_tags(control_name):
+    """
+    Returns tags extracted from the given control name
+    :param control_name: str
+    :return: list(str)
+    """
+
+    return NAME_TOKENS.findall(control_name.lower())
+
+
+def shape_tags(shape_set):
+    """
+    Returns tags computed from the geometry of the given shapes
+    :param shape_set: ControlShapeSet
+    :return: list(str)
+    """
+
+    tags = list()
+    cvs = shape_set.cvs
+    if cvs:
+        planar = any(max(cvs[axis::3]) - min(cvs[axis::3]) <= PLANAR_TOLERANCE for axis in range(3))
+        tags.append('2d' if planar else '3d')
+    tags.append('closed' if all(shape_set.periodics) else 'open')
+
+    return tags
+
+
+def read_categories(data_path):
+    """
+    Reads categories from the given library data file. Following layouts are supported:
+        - [{"name": "category", "controls": ["control", ...]}, ...]
+        - {"category": ["control", ...], ...}
+    :param data_path: str
+    :return: dict(str, list(str)), maps category names to control names
+    """
+
+    if not data_path or not os.path.isfile(data_path):
+        return dict()
+
+    categories = libstream.load_library_section(data_path, 'categories', default=list())
+    if isinstance(categories, dict):
+        return dict((name, list(controls)) for name, controls in categories.items())
+
+    return dict(
+        (category['name'], list(category.get('controls', list())))
+        for category in categories if isinstance(category, dict) and category.get('name'))
+
+
+def get_default_data_path():
+    """
+    Returns path of the data file shipped with the library
+    :return: str
+    """
+
+    return os.path.normpath(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data.json'))
+
+
+def build_tag_index(controls_path=None, data_path=None):
+    """
+    Builds the tag index of all the controls of the given controls directory or search path
+    :param controls_path: str or list(str) or None
+    :param data_path: str or None, library data file with categories. If not given, library data file is used
+    :return: TagIndex
+    """
+
+    tag_index = TagIndex()
+    for control_name in shapeindex.get_index(controls_path).names():
+        tags = name_tags(control_name)
+        shape_set = shapecache.get_control_shapes(control_name, controls_path)
+        if shape_set is not None:
+            geometry_tags = shape_tags(shape_set)
+            if '2d' in tags or '3d' in tags:
+                geometry_tags = [tag for tag in geometry_tags if tag not in ('2d', '3d')]
+            tags.extend(geometry_tags)
+        tag_index.add(control_name, tags)
+
+    for category, control_names in read_categories(data_path or get_default_data_path()).items():
+        for control_name in control_names:
+            if control_name in tag_index:
+                tag_index.add(control_name, [category])
+
+    return tag_index
+
+
+def get_tag_index(controls_path=None, data_path=None):
+    """
+    Returns the tag index of the given controls directory or search path
+    Index is only rebuilt if controls were added or removed, or if the data file changed
+    :param controls_path: str or list(str) or None
+    :param data_path: str or None
+    :return: TagIndex
+    """
+
+    data_path = data_path or get_default_data_path()
+    index = shapeindex.get_index(controls_path)
+    key = (index.controls_path, data_path)
+    signature = (tuple(index.names()), os.path.getmtime(data_path) if os.path.isfile(data_path) else None)
+    cached = _TAG_INDICES.get(key)
+    if cached and cached[0] == signature:
+        return cached[1]
+
+    tag_index = build_tag_index(controls_path, data_path=data_path)
+    _TAG_INDICES[key] = (signature, tag_index)
+
+    return tag_index
+
+
+def find_controls(all_of=None, any_of=None, none_of=None, controls_path=None, data_path=None):
+    """
+    Returns the names of the controls that match the given tags query
+    :param all_of: list(str) or None, tags controls must have
+    :param any_of: list(str) or None, controls must have at least one of these tags
+    :param none_of: list(str) or None, tags controls must not have
+    :param controls_path: str or list(str) or None
+    :param data_path: str or None
+    :return: list(str), sorted control names
+    """
+
+    tag_index = get_tag_index(controls_path, data_path=data_path)
+
+    return sorted(tag_index.query(all_of=all_of, any_of=any_of, none_of=none_of))
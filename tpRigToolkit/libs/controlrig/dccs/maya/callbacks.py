@@ -0,0 +1,76 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains a manager of Maya API callbacks used by tpRigToolkit-libs-controlrig
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import logging
+
+import maya.api.OpenMaya as OpenMaya
+
+LOGGER = logging.getLogger('tpRigToolkit-libs-controlrig')
+
+
+class CallbackManager(object):
+    """
+    Class that keeps track of registered Maya API callbacks by name, so they can be removed together
+    """
+
+    def __init__(self):
+        super(CallbackManager, self).__init__()
+
+        self._callback_ids = dict()
+
+    def __contains__(self, name):
+        return name in self._callback_ids
+
+    def add(self, name, callback_id):
+        """
+        Stores given callback id with the given name
+        :param name: str
+        :param callback_id: int, id returned by Maya API when registering the callback
+        """
+
+        self._callback_ids.setdefault(name, list()).append(callback_id)
+
+    def remove(self, name):
+        """
+        Removes all callbacks registered with the given name
+        :param name: str
+        """
+
+        for callback_id in self._callback_ids.pop(name, list()):
+            try:
+                OpenMaya.MMessage.removeCallback(callback_id)
+            except RuntimeError as exc:
+                LOGGER.debug('Impossible to remove callback "{}": {}'.format(name, exc))
+
+    def remove_all(self):
+        """
+        Removes all registered callbacks
+        """
+
+        for name in list(self._callback_ids):
+            self.remove(name)
+
+
+def add_scene_changed_callbacks(manager, name, callback, scene_callback=None):
+    """
+    Registers callbacks that call the given function when DAG nodes are added or removed, when nodes are renamed and
+    when a new scene is created or opened. Dependency nodes such as animation curves created when keying controls
+    cannot be controls, so adding or removing them is ignored
+    :param manager: CallbackManager
+    :param name: str, name used to register the callbacks in the manager
+    :param callback: callable, function called with the arguments of each callback
+    :param scene_callback: callable or None, if given, function called instead of callback when a new scene is
+        created or opened
+    """
+
+    manager.add(name, OpenMaya.MDGMessage.addNodeAddedCallback(callback, 'dagNode'))
+    manager.add(name, OpenMaya.MDGMessage.addNodeRemovedCallback(callback, 'dagNode'))
+    manager.add(name, OpenMaya.MNodeMessage.addNameChangedCallback(OpenMaya.MObject(), callback))
+    for message in (OpenMaya.MSceneMessage.kAfterNew, OpenMaya.MSceneMessage.kAfterOpen):
+        manager.add(name, OpenMaya.MSceneMessage.addCallback(message, scene_callback or callback))
@@ -0,0 +1,62 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains Dcc commands to create control curves in Maya
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import maya.cmds
+import maya.api.OpenMaya
+
+from tpDcc.core import command
+from tpDcc.dccs.maya.api import node as api_node
+
+from tpRigToolkit.libs.controlrig.dccs.maya import controlcurves
+
+
+class CreateControlCurves(command.DccCommand, object):
+
+    id = 'tpRigToolkit-libs-controlrig-dccs-maya-createControlCurves'
+    creator = 'Tomas Poveda'
+    is_undoable = True
+
+    _created_nodes = list()
+
+    def resolve_arguments(self, arguments):
+        shape_sets = arguments.shape_sets
+        if not shape_sets:
+            self.cancel('No control shapes given')
+        try:
+            parents = arguments.parents
+        except AttributeError:
+            parents = None
+        parents = list(parents or [None] * len(shape_sets))
+        for parent in parents:
+            if parent is None:
+                continue
+            handle = maya.api.OpenMaya.MObjectHandle(parent)
+            if not handle.isValid() or not handle.isAlive():
+                self.cancel('Parent no longer exists in current scene: "{}"'.format(parent))
+
+        arguments['parents'] = parents
+
+        return arguments
+
+    def run(self, shape_sets=None, parents=None):
+        curves = controlcurves.create_curves(shape_sets, parents=parents)
+
+        # New transforms own all their curves, so deleting them is enough to undo the creation
+        created_nodes = list()
+        for parent, (parent_mobj, shape_mobjs) in zip(parents, curves):
+            created_nodes.extend(shape_mobjs if parent is not None else [parent_mobj])
+        self._created_nodes = [maya.api.OpenMaya.MObjectHandle(node) for node in created_nodes if node is not None]
+
+        return curves
+
+    def undo(self):
+        nodes = [api_node.name_from_mobject(
+            handle.object()) for handle in self._created_nodes if handle.isValid() and handle.isAlive()]
+        if nodes:
+            maya.cmds.delete(nodes)
@@ -0,0 +1,144 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains functions to color rig controls in Maya in bulk
+Controls are grouped by color, so each color is only converted once and the curve shapes of all the controls that
+share a color are retrieved with a single query. Override attributes of all those shapes are then written at once with
+a single DG modifier
+"""
+
+from __future__ import print_function, division, absolute_import
+
+from collections import OrderedDict
+
+import maya.cmds
+import maya.api.OpenMaya as OpenMaya
+
+
+def srgb_to_linear(value):
+    """
+    Converts given sRGB color component into linear space
+    :param value: float
+    :return: float
+    """
+
+    if value <= 0.04045:
+        return value / 12.92
+
+    return ((value + 0.055) / 1.055) ** 2.4
+
+
+def convert_color(color, linear=True):
+    """
+    Returns the value that must be written in the override attributes of a shape to display the given color
+    :param color: int or list(float, float, float), index or RGB color
+    :param linear: bool, Whether or not given RGB color is already in linear space
+    :return: int or tuple(float, float, float)
+    """
+
+    if isinstance(color, int):
+        return color
+
+    color = tuple(float(value) for value in color[:3])
+
+    return color if linear else tuple(srgb_to_linear(value) for value in color)
+
+
+def set_shapes_color(shapes, color):
+    """
+    Writes the override attributes of the given shapes so they display the given color
+    All the writes are queued in a single DG modifier, so they are applied with one call whatever the number of shapes
+    :param shapes: list(str)
+    :param color: int or tuple(float, float, float), index or linear RGB color, as returned by convert_color
+    :return: MDGModifier, modifier used to write the attributes, that can be used to undo the writes
+    """
+
+    use_rgb = not isinstance(color, int)
+    selection = OpenMaya.MSelectionList()
+    for shape in shapes:
+        selection.add(shape)
+
+    modifier = OpenMaya.MDGModifier()
+    for i in range(selection.length()):
+        shape_node = OpenMaya.MFnDependencyNode(selection.getDependNode(i))
+        modifier.newPlugValueBool(shape_node.findPlug('overrideEnabled', False), True)
+        modifier.newPlugValueBool(shape_node.findPlug('overrideRGBColors', False), use_rgb)
+        if use_rgb:
+            rgb_plug = shape_node.findPlug('overrideColorRGB', False)
+            for j, value in enumerate(color):
+                modifier.newPlugValueFloat(rgb_plug.child(j), value)
+        else:
+            modifier.newPlugValueInt(shape_node.findPlug('overrideColor', False), color)
+    modifier.doIt()
+
+    return modifier
+
+
+def group_controls_by_color(control_names, new_color, linear=True):
+    """
+    Groups given controls by the converted color they must be set to
+    :param control_names: list(str)
+    :param new_color: int or list(float, float, float) or dict(str, int or list(float, float, float)), color for all
+        the controls or color of each control. Controls without color are skipped
+    :param linear: bool, Whether or not given RGB colors are already in linear space
+    :return: OrderedDict(int or tuple(float, float, float), list(str))
+    """
+
+    colors_by_control = new_color if isinstance(new_color, dict) else None
+    converted_colors = dict()
+    controls_by_color = OrderedDict()
+    for control_name in OrderedDict.fromkeys(control_names):
+        color = colors_by_control.get(control_name) if colors_by_control is not None else new_color
+        if color is None:
+            continue
+        color_key = color if isinstance(color, int) else tuple(color)
+        if color_key not in converted_colors:
+            converted_colors[color_key] = convert_color(color, linear=linear)
+        controls_by_color.setdefault(converted_colors[color_key], list()).append(control_name)
+
+    return controls_by_color
+
+
+def set_controls_color(control_names, new_color, linear=True):
+    """
+    Sets the color of all the curve shapes of the given controls
+    :param control_names: list(str)
+    :param new_color: int or list(float, float, float) or dict(str, int or list(float, float, float)), color for all
+        the controls or color of each control
+    :param linear: bool, Whether or not given RGB colors are already in linear space
+    :return: list(str), controls with curve shapes whose color was set
+    """
+
+    colored_controls = list()
+    for color, controls in group_controls_by_color(control_names, new_color, linear=linear).items():
+        shapes = maya.cmds.listRelatives(controls, shapes=True, type='nurbsCurve', fullPath=True) or list()
+        if not shapes:
+            continue
+        set_shapes_color(shapes, color)
+        colored_parents = set(shape.rsplit('|', 1)[0] for shape in shapes)
+        for control_name, long_name in zip(controls, _get_long_names(controls)):
+            if long_name in colored_parents:
+                colored_controls.append(control_name)
+
+    return colored_controls
+
+
+def _get_long_names(nodes):
+    """
+    Internal function that returns the full path of each one of the given nodes
+    :param nodes: list(str)
+    :return: list(str or None), None for nodes that do not exist or whose name is not unique
+    """
+
+    long_names = maya.cmds.ls(nodes, long=True) or list()
+    if len(long_names) == len(nodes):
+        return long_names
+
+    # Some nodes are missing or ambiguous, so results can not be matched by position
+    long_names = list()
+    for node in nodes:
+        found = maya.cmds.ls(node, long=True) or list()
+        long_names.append(found[0] if len(found) == 1 else None)
+
+    return long_names
@@ -0,0 +1,81 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains functions to create control curves in Maya from control shape sets
+CVs are read straight from the flat arrays of the shape sets, so no per CV lists or dictionaries are built to create
+the curves
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import maya.api.OpenMaya as OpenMaya
+
+
+def get_knots(cv_count, degree, periodic):
+    """
+    Returns the knot vector of a uniform curve with the given topology
+    :param cv_count: int, number of CVs of the curve. Periodic curves CVs that overlap are not included
+    :param degree: int
+    :param periodic: bool
+    :return: list(float)
+    """
+
+    if periodic:
+        return [float(i) for i in range(-degree + 1, cv_count + degree)]
+
+    spans = cv_count - degree
+
+    return [0.0] * (degree - 1) + [float(i) for i in range(spans + 1)] + [float(spans)] * (degree - 1)
+
+
+def get_shape_points(shape_set, index):
+    """
+    Returns the CVs of the shape with the given index as a point array. First CVs of periodic shapes are repeated at
+    the end, as Maya expects them
+    :param shape_set: ControlShapeSet
+    :param index: int
+    :return: OpenMaya.MPointArray
+    """
+
+    cvs = shape_set.cvs
+    points = OpenMaya.MPointArray()
+    for i in range(shape_set.offsets[index] * 3, shape_set.offsets[index + 1] * 3, 3):
+        points.append(OpenMaya.MPoint(cvs[i], cvs[i + 1], cvs[i + 2]))
+    if shape_set.periodics[index]:
+        cv_count = len(points)
+        for i in range(shape_set.degrees[index]):
+            points.append(points[i % cv_count])
+
+    return points
+
+
+def create_curves(shape_sets, parents=None):
+    """
+    Creates the curves of all the given shape sets
+    :param shape_sets: list(ControlShapeSet)
+    :param parents: list(OpenMaya.MObject or None) or None, transform that takes ownership of the curves of each shape
+        set. A new transform is created for the shape sets without parent
+    :return: list(tuple(OpenMaya.MObject, list(OpenMaya.MObject))), parent transform and curve shapes of each shape set
+    """
+
+    curve_fn = OpenMaya.MFnNurbsCurve()
+    result = list()
+    for i, shape_set in enumerate(shape_sets):
+        parent = parents[i] if parents else None
+        shapes = list()
+        for index in range(len(shape_set)):
+            degree = shape_set.degrees[index]
+            periodic = shape_set.periodics[index]
+            form = OpenMaya.MFnNurbsCurve.kPeriodic if periodic else OpenMaya.MFnNurbsCurve.kOpen
+            knots = get_knots(shape_set.shape_cv_count(index), degree, periodic)
+            new_node = curve_fn.create(
+                get_shape_points(shape_set, index), knots, degree, form, False, True,
+                parent if parent is not None else OpenMaya.MObject.kNullObj)
+            # Without parent, Maya creates a new transform for the curve and returns it instead of the curve shape
+            if parent is None:
+                parent = new_node
+            shapes.append(curve_fn.object())
+        result.append((parent, shapes))
+
+    return result
@@ -7,6 +7,8 @@ Module that contains tpRigToolkit-libs-controllib function implementations for M
 
 from __future__ import print_function, division, absolute_import
 
+import os
+
 import maya.cmds
 
 from tpDcc import dcc
@@ -14,11 +16,25 @@ from tpDcc.core import command
 from tpDcc.libs.python import python
 
 from tpDcc.dccs.maya.api import node as api_node
-from tpDcc.dccs.maya.core import filtertypes, curve, name as name_utils, shape as shape_utils, node as node_utils
+from tpDcc.dccs.maya.core import filtertypes, curve, shape as shape_utils, node as node_utils
 from tpDcc.dccs.maya.core import transform as xform_utils, color as color_utils
 
-from tpRigToolkit.libs.controlrig.core import consts
-from tpRigToolkit.libs.controlrig.dccs.maya import controlutils
+from tpRigToolkit.libs.controlrig.core import consts, shapecache, shapetransform, controlmatcher, controlscache
+from tpRigToolkit.libs.controlrig.core import mirrorpairs
+from tpRigToolkit.libs.controlrig.core.shape import ControlShapeSet
+from tpRigToolkit.libs.controlrig.core.profiler import ScanProfiler, profile_phase
+from tpRigToolkit.libs.controlrig.dccs.maya import controlutils, controlscan, controlregistry, callbacks
+from tpRigToolkit.libs.controlrig.dccs.maya import controlcolor, controlmirror
+
+TRANSFORM_KWARGS = ('control_size', 'translate_offset', 'rotate_offset', 'scale', 'axis_order', 'mirror')
+CREATE_CONTROL_CURVES_COMMAND = 'tpRigToolkit-libs-controlrig-dccs-maya-createControlCurves'
+
+_CALLBACKS = callbacks.CallbackManager()
+_CONTROLS_CACHE = controlscache.ControlsCache()
+_CONTROLS_CACHE_CALLBACKS = 'controlsCache'
+# Generation of the controls cache the controls registry was up to date at. Registry is stale once the scene changes
+_REGISTRY_STATE = {'generation': None}
+_COMMANDS_STATE = {'registered': False}
 
 
 # ============================================================================================================
@@ -34,7 +50,8 @@ def create_control_curve(
     Creates a new curve based control
     :param control_name: str, name of the new control to create
     :param control_type: str, curve types used by the new control
-    :param controls_path: str or None, path were control curve types can be located
+    :param controls_path: str or list(str) or None, path or ordered list of paths were control curve types can be
+        located. Controls found in later paths shadow the ones found in previous paths
     :param control_size: float, global size of the control
     :param translate_offset: tuple(float, float, float), XYZ translation offset to apply to the control curves
     :param rotate_offset: tuple(float, float, float), XYZ rotation offset to apply to the control curves
@@ -52,77 +69,106 @@ def create_control_curve(
         rotation of the current DCC selected node
     :param match_scale: bool, Whether or not new control root node should match the scale with the
         scale of the current DCC selected node
+    :param control_data: ControlShapeSet or dict or list(dict), If given, these shapes are used instead of the ones
+        of the control type
     :return:
     """
 
-    current_selection = dcc.selected_nodes()
-
-    parent_mobj = None
-    if parent:
-        parent_mobj = api_node.as_mobject(parent)
+    registry_current = _is_registry_current()
+    control_shapes = _get_control_shapes(
+        control_type, controls_path=controls_path, control_data=kwargs.pop('control_data', None),
+        control_size=control_size, translate_offset=translate_offset, rotate_offset=rotate_offset, scale=scale,
+        axis_order=axis_order, mirror=mirror)
+
+    transforms, curves, controls = _build_control_curve(
+        _get_command_runner(), dcc.selected_nodes(), control_name=control_name, control_type=control_type,
+        controls_path=controls_path, control_shapes=control_shapes, control_size=control_size,
+        translate_offset=translate_offset, rotate_offset=rotate_offset, scale=scale, axis_order=axis_order,
+        mirror=mirror, create_buffers=create_buffers, buffers_depth=buffers_depth, match_translate=match_translate,
+        match_rotate=match_rotate, match_scale=match_scale, parent=parent)
+    if line_width != -1:
+        curve.set_curve_line_thickness(curves, line_width=line_width)
+    if color is not None:
+        _set_curves_color(curves, color)
+    _register_controls(controls, registry_current)
 
-    runner = command.CommandRunner()
+    return transforms
 
-    control_data = kwargs.pop('control_data', None)
-    if control_data:
-        parent_mobj, shape_mobjs = runner.run(
-            'tpDcc-libs-curves-dccs-maya-createCurveFromData', curve_data=control_data, curve_size=control_size,
-            translate_offset=translate_offset, scale=scale, axis_order=axis_order, mirror=mirror, parent=parent_mobj)
-    else:
-        parent_mobj, shape_mobjs = runner.run(
-            'tpDcc-libs-curves-dccs-maya-createCurveFromPath', curve_type=control_type, curves_path=controls_path,
-            curve_size=control_size, translate_offset=translate_offset, scale=scale, axis_order=axis_order,
-            mirror=mirror, parent=parent_mobj)
 
-    if parent_mobj:
-        for shape in shape_mobjs:
-            api_node.rename_mobject(shape, control_name)
-        curve_long_name_list = api_node.names_from_mobject_handles(shape_mobjs)
-    else:
-        api_node.rename_mobject(shape_mobjs[0], control_name)
-        curve_long_name = api_node.names_from_mobject_handles(shape_mobjs)[0]
-        curve_long_name_list = [curve_long_name]
+@dcc.undo_decorator()
+def create_control_curves(specs):
+    """
+    Creates multiple curve based controls at once, within a single undo chunk
+    Shapes of each control type are only resolved once, the curves of all the controls are created with a single
+    command and curves sharing the same color or line width are updated with a single call
+    :param specs: list(dict), each dictionary contains the keyword arguments supported by create_control_curve
+    :return: list(list(str)), created transforms of each spec, in the same order as the given specs
+    """
 
-    if rotate_offset != (0.0, 0.0, 0.0):
-        shape_utils.rotate_node_shape_cvs(curve_long_name_list, rotate_offset)
-    if line_width != -1:
-        curve.set_curve_line_thickness(curve_long_name_list, line_width=line_width)
+    specs = [dict(spec) for spec in specs]
+    registry_current = _is_registry_current()
+    runner = _get_command_runner()
+    current_selection = dcc.selected_nodes()
 
-    # TODO: Support index based color
-    if color is not None:
-        if isinstance(color, int):
-            node_utils.set_color(curve_long_name_list, color)
+    shapes_by_spec = dict()
+    specs_shapes = list()
+    for spec in specs:
+        control_type = spec.get('control_type', 'circle')
+        controls_path = spec.get('controls_path', None)
+        control_data = spec.pop('control_data', None)
+        transform_kwargs = dict((key, spec[key]) for key in TRANSFORM_KWARGS if key in spec)
+        if control_data is None:
+            shapes_key = (
+                control_type, tuple(python.force_list(controls_path)),
+                shapetransform.transform_key(**transform_kwargs))
+            if shapes_key not in shapes_by_spec:
+                shapes_by_spec[shapes_key] = _get_control_shapes(control_type, controls_path, **transform_kwargs)
+            specs_shapes.append(shapes_by_spec[shapes_key])
         else:
-            node_utils.set_rgb_color(curve_long_name_list, color, linear=True, color_shapes=True)
-
-    transforms = list()
-    for curve_shape in curve_long_name_list:
-        parent = dcc.node_parent(curve_shape)
-        if parent:
-            if parent not in transforms:
-                transforms.append(parent)
+            specs_shapes.append(_get_control_shapes(
+                control_type, controls_path, control_data=control_data, **transform_kwargs))
+
+    parents = [api_node.as_mobject(spec['parent']) if spec.get('parent') else None for spec in specs]
+    batch = [i for i, control_shapes in enumerate(specs_shapes) if control_shapes is not None]
+    batch_curves = dict()
+    if batch:
+        created_curves = runner.run(
+            CREATE_CONTROL_CURVES_COMMAND, shape_sets=[specs_shapes[i] for i in batch],
+            parents=[parents[i] for i in batch])
+        batch_curves = dict(zip(batch, created_curves))
+
+    results = list()
+    created_controls = list()
+    curves_by_color = dict()
+    curves_by_line_width = dict()
+    for i, spec in enumerate(specs):
+        color = spec.pop('color', None)
+        line_width = spec.pop('line_width', -1)
+        if i in batch_curves:
+            # Creation parameters are already applied to the CVs of the shapes
+            setup_kwargs = dict((key, value) for key, value in spec.items() if key not in TRANSFORM_KWARGS)
+            transforms, curves, controls = _setup_control_curve(
+                parents[i], batch_curves[i], current_selection, **setup_kwargs)
         else:
-            if curve_shape not in transforms:
-                transforms.append(curve_shape)
+            # Control types that are not available as shapes are created with the curves library
+            transforms, curves, controls = _build_control_curve(runner, current_selection, **spec)
+        results.append(transforms)
+        created_controls.extend(controls)
+        if color is not None:
+            color_key = color if isinstance(color, int) else tuple(color)
+            curves_by_color.setdefault(color_key, list()).extend(curves)
+        if line_width != -1:
+            curves_by_line_width.setdefault(line_width, list()).extend(curves)
 
-    if not parent and transforms:
-        if create_buffers and buffers_depth > 0:
-            transforms = create_buffer_groups(transforms, buffers_depth)
-        if current_selection:
-            match_transform = current_selection[0]
-            if match_transform and dcc.node_exists(match_transform):
-                for transform in transforms:
-                    if match_translate:
-                        dcc.match_translation(match_transform, transform)
-                    if match_rotate:
-                        dcc.match_rotation(match_transform, transform)
-                    if match_scale:
-                        dcc.match_scale(match_transform, transform)
+    for line_width, curves in curves_by_line_width.items():
+        curve.set_curve_line_thickness(curves, line_width=line_width)
+    for color, curves in curves_by_color.items():
+        _set_curves_color(curves, color)
+    _register_controls(created_controls, registry_current)
 
-    return transforms
+    return results
 
 
-@dcc.undo_decorator()
 def create_text_control(text, font='Times New Roman'):
     """
     Creates a new text based control
@@ -184,10 +230,17 @@ def replace_control_curves(
     if keep_color:
         orig_color = get_control_color(control_name)
 
+    new_scale = None
+    if auto_scale and orig_size is not None and 'control_data' not in kwargs:
+        new_scale = _get_control_type_size(
+            control_type, controls_path=controls_path, control_size=kwargs.get('control_size', 1.0),
+            scale=kwargs.get('scale', (1.0, 1.0, 1.0)), rotate_offset=kwargs.get('rotate_offset', (0.0, 0.0, 0.0)))
+
     new_control = create_control_curve(
         control_name='new_ctrl', control_type=control_type, controls_path=controls_path, color=orig_color, **kwargs)[0]
     if auto_scale and orig_size is not None:
-        new_scale = get_control_size(new_control)
+        if not new_scale:
+            new_scale = get_control_size(new_control)
         scale_factor = orig_size / new_scale
         dcc.scale_shapes(new_control, scale_factor, relative=False)
 
@@ -246,15 +299,23 @@ def set_control_color(control_name, new_color, linear=True):
     :return: bool, True if the color is applied successfully; False otherwise
     """
 
-    shapes = dcc.list_shapes_of_type(control_name, shape_type='nurbsCurve')
-    if not shapes:
-        return False
+    return bool(controlcolor.set_controls_color([control_name], new_color, linear=linear))
 
-    # TODO: Add support for index based colors
-    for shape in shapes:
-        node_utils.set_rgb_color(shape, new_color, linear=linear)
 
-    return True
+@dcc.undo_decorator()
+def set_controls_color(control_names, new_color, linear=True):
+    """
+    Sets the color of the given control transform nodes
+    Controls are grouped by color, so each color is only converted once and the curve shapes of all the controls that
+    share a color are retrieved at once
+    :param control_names: list(str), List of control names to set color of
+    :param new_color: list(float, float, float) or int or dict(str, list(float, float, float) or int), new color to
+        apply to all the controls or new color of each control
+    :param linear, bool, Whether or not color is set in linear space
+    :return: list(str), list of controls whose color was set
+    """
+
+    return controlcolor.set_controls_color(control_names, new_color, linear=linear)
 
 
 # ============================================================================================================
@@ -273,6 +334,7 @@ def duplicate_control(
     :return:
     """
 
+    registry_current = _is_registry_current()
     if not duplicate_name and use_selected_name:
         duplicate_name = control_name
     duplicated_control = xform_utils.duplicate_transform_without_children(
@@ -284,6 +346,9 @@ def duplicate_control(
     if dcc.node_type(duplicated_control) == 'joint':
         pass
 
+    if controlregistry.is_registered(control_name):
+        _register_controls([duplicated_control], registry_current)
+
     return duplicated_control
 
 
@@ -293,16 +358,22 @@ def duplicate_control(
 
 def mirror_control(
         source_control, target_control=None, mirror_axis='X', mirror_mode=0, mirror_color=None, mirror_replace=False,
-        keep_color=True, from_name=None, to_name=None):
+        keep_color=True, from_name=None, to_name=None, side_tokens=None):
     """
     Find the right side control of a left side control and mirrors the control following next rules:
         - Mirror only will be applied if corresponding right side name exists
         - Replace left prefix and suffixes checking for validity
-    :param mirror_axis: str
-    :param mirror_mode: int or None
+    Source CVs are read in world space, reflected and written into the local space of the mirrored control, so no
+    temporary node is created. If the target control is replaced and has the same curves topology, its CVs are
+    updated in place without creating any node
+    :param mirror_axis: str, 'X', 'Y' or 'Z'
+    :param mirror_mode: int or None, 0 to mirror across the world plane of the axis; 1 to mirror across the plane of
+        the axis that goes through the source control pivot
     :param mirror_color: int or list(float, float, float)
     :param mirror_replace: bool
     :param keep_color: bool
+    :param side_tokens: SideTokens or list(tuple(str, str)) or None, tokens used to find the target control if it is
+        not given
     :return: str, mirrored control
     """
 
@@ -315,41 +386,40 @@ def mirror_control(
     if not source_shapes:
         return None
 
-    duplicated_control = duplicate_control(source_control)
-    mirror_pivot_grp = dcc.create_empty_group(name='temp_mirrorPivot')
-    duplicated_control = dcc.set_parent(duplicated_control, mirror_pivot_grp)
-
-    dcc.set_attribute_value(mirror_pivot_grp, 'scale{}'.format(mirror_axis.upper()), -1)
-
-    target_control = target_control or source_control.replace(from_name, to_name)
-
-    # We force this conversion. This is something that we should remove in the future
-    if target_control and not dcc.node_exists(target_control):
-        target_control = target_control.replace('Left', 'Right')
-
     if target_control and not dcc.node_exists(target_control):
         target_control = dcc.node_short_name(target_control)
+    if not target_control:
+        target_names = list()
+        if from_name and to_name and from_name in source_control:
+            target_names.append(source_control.replace(from_name, to_name))
+        side_tokens = mirrorpairs.SideTokens.from_value(side_tokens)
+        target_names.extend(name for name, _ in side_tokens.iter_mirror_names(source_control))
+        target_control = next((name for name in target_names if dcc.node_exists(name)), None)
+
+    mirror_matrix = controlmirror.get_mirror_matrix(source_control, mirror_axis=mirror_axis, mirror_mode=mirror_mode)
 
     if target_control and dcc.node_exists(target_control) and mirror_replace:
         if keep_color:
             target_control_color = get_control_color(target_control)
-        mirrored_control = xform_utils.parent_transforms_shapes(
-            target_control, duplicated_control, delete_original=True)
+        mirrored_control = target_control
+        if not controlmirror.mirror_shapes(source_control, target_control, mirror_matrix):
+            # Curves topology is different, so target shapes are replaced by mirrored copies of the source ones
+            duplicated_control = duplicate_control(source_control)
+            maya.cmds.xform(
+                duplicated_control, worldSpace=True,
+                matrix=maya.cmds.xform(target_control, query=True, worldSpace=True, matrix=True))
+            controlmirror.mirror_shapes(source_control, duplicated_control, mirror_matrix)
+            mirrored_control = xform_utils.parent_transforms_shapes(
+                target_control, duplicated_control, delete_original=True)
     else:
-        mirrored_control = dcc.set_parent_to_world(duplicated_control)
-
-    maya.cmds.delete(mirror_pivot_grp)
-
-    if mirror_mode == 0:
-        dcc.move_node(mirrored_control, 0, 0, 0, world_space=True)
-    elif mirror_mode == 1:
-        orig_pos = dcc.node_world_space_pivot(source_control)
-        dcc.move_node(mirrored_control, orig_pos[0], orig_pos[1], orig_pos[2], world_space=True)
+        mirrored_control = duplicate_control(source_control)
+        if mirror_mode == controlmirror.WORLD_MIRROR:
+            pivot = controlmirror.get_mirrored_pivot(source_control, mirror_matrix)
+            dcc.move_node(mirrored_control, pivot[0], pivot[1], pivot[2], world_space=True)
+        controlmirror.mirror_shapes(source_control, mirrored_control, mirror_matrix)
 
     if target_control_color:
-        target_shapes = dcc.list_shapes_of_type(mirrored_control, shape_type='nurbsCurve')
-        for target_shape in target_shapes:
-            dcc.set_node_color(target_shape, target_control_color)
+        controlcolor.set_controls_color([mirrored_control], target_control_color)
 
     if from_name and to_name and from_name != to_name:
         if from_name in mirrored_control:
@@ -358,6 +428,16 @@ def mirror_control(
     return mirrored_control
 
 
+def get_controls_world_pivots(control_names):
+    """
+    Returns the world position of the pivot of the given controls
+    :param control_names: list(str)
+    :return: OrderedDict(str, tuple(float, float, float))
+    """
+
+    return controlmirror.get_world_pivots(control_names)
+
+
 # ============================================================================================================
 # TRACK
 # ============================================================================================================
@@ -375,6 +455,7 @@ def add_control_tracker_attributes(
     :param color: list(float), initial color as linear color
     """
 
+    registry_current = _is_registry_current()
     xform_utils.add_transform_tracker_attributes(control_name, translate=translate, rotate=rotate, scale=scale)
 
     if not color:
@@ -392,6 +473,9 @@ def add_control_tracker_attributes(
     dcc.set_attribute_value(control_name, consts.TRACKER_CONTROL_TYPE_ATTR_NAME, control_type)
     dcc.set_attribute_value(control_name, consts.TRACKER_CONTROL_TYPE_DEFAULT_ATTR_NAME, control_type)
 
+    _CONTROLS_CACHE.invalidate()
+    _register_controls([control_name], registry_current)
+
 
 # ============================================================================================================
 # TRANSFORM
@@ -416,80 +500,18 @@ def is_control(transform_node, only_tagged=False, **kwargs):
     Returns whether or not given transform is a rig control
     :param transform_node: str
     :param only_tagged: bool
+    :param matcher: ControlMatcher or None, compiled control rules. If not given, rules are compiled from the given
+        keyword arguments
+    :param profiler: ScanProfiler or None, if given, DCC calls done to evaluate the rules are recorded
     :return: bool
     """
 
-    maybe_control = False
-
-    names_to_skip = python.force_list(kwargs.get('names_to_skip', list()))
-    prefixes_to_check = python.force_list(kwargs.get('prefixes_to_check', list()))
-    prefixes_to_skip = python.force_list(kwargs.get('prefixes_to_skip', list()))
-    suffixes_to_check = python.force_list(kwargs.get('suffixes_to_check', list()))
-    suffixes_to_skip = python.force_list(kwargs.get('suffixes_to_skip', list()))
-    attributes_to_check = python.force_list(kwargs.get('attributes_to_check', list()))
-    attributes_to_skip = python.force_list(kwargs.get('attributes_to_skip', list()))
-    names_to_skip.extend(consts.CONTROLS_NAMES_TO_SKIP)
-    prefixes_to_check.extend(consts.CONTROLS_PREFIXES)
-    prefixes_to_skip.extend(consts.CONTROLS_PREFIXES_TO_SKIP)
-    suffixes_to_check.extend(consts.CONTROLS_SUFFIXES)
-    suffixes_to_skip.extend(consts.CONTROLS_SUFFIXES_TO_SKIP)
-    attributes_to_check.extend(consts.CONTROLS_ATTRIBUTES)
-    attributes_to_skip.extend(consts.CONTROLS_ATTRIBUTES_TO_SKIP)
-    names_to_skip = tuple(set(names_to_skip))
-    prefixes_to_check = tuple(set(prefixes_to_check))
-    prefixes_to_skip = tuple(set(prefixes_to_skip))
-    suffixes_to_check = tuple(set(suffixes_to_check))
-    suffixes_to_skip = tuple(set(suffixes_to_skip))
-    attributes_to_check = tuple(set(attributes_to_check))
-    attributes_to_skip = tuple(set(attributes_to_skip))
-
-    # TODO: We could use nomenclature to check control validity
-
-    transform = name_utils.remove_namespace_from_string(transform_node)
-
-    if only_tagged:
-        if dcc.attribute_exists(transform, 'tag'):
-            value = dcc.get_attribute_value(transform, 'tag')
-            if value:
-                return True
-        return False
-    else:
-        # Check names
-        if transform in names_to_skip:
-            return False
-
-        # Check prefix and suffix
-        if transform.startswith(prefixes_to_skip) or transform.endswith(suffixes_to_skip):
-            return False
-        if transform.startswith(prefixes_to_check) or transform.endswith(suffixes_to_check):
-            maybe_control = True
-
-        # Check attributes
-        for attr_to_skip in attributes_to_skip:
-            if dcc.attribute_exists(transform, attr_to_skip):
-                return False
-        for attr_to_check in attributes_to_check:
-            if dcc.attribute_exists(transform, attr_to_check):
-                return True
-        if dcc.attribute_exists(transform, 'tag'):
-            value = dcc.get_attribute_value(transform, 'tag')
-            if value:
-                maybe_control = True
-        if dcc.attribute_exists(transform, 'curveType') or dcc.attribute_exists(transform, 'type'):
-            value = dcc.get_attribute_value(transform, 'curveType')
-            if value:
-                maybe_control = True
-        if dcc.attribute_exists(transform, 'type'):
-            value = dcc.get_attribute_value(transform, 'type')
-            if value:
-                maybe_control = True
-
-        if maybe_control:
-            if dcc.node_has_shape_of_type(
-                    transform, 'nurbsCurve') or dcc.node_has_shape_of_type(transform, 'nurbsSurface'):
-                return True
-
-    return False
+    matcher = controlmatcher.ControlMatcher.from_kwargs(**kwargs)
+    profiler = kwargs.get('profiler', None)
+    if profiler:
+        matcher = profiler.wrap_matcher(matcher)
+
+    return bool(matcher.match(transform_node, *_get_query_functions(profiler), only_tagged=only_tagged))
 
 
 def get_controls(**kwargs):
@@ -500,56 +522,302 @@ def get_controls(**kwargs):
         - Check if the controls have a specific control attribute
         - Check if a transform has an attribute called tag (with value) and the transform has a nurbsCurve at least
     :param namespace: str, only controls with the given namespace will be search.
+    :param bulk_scan: bool, Whether or not the scene should be scanned with a few bulk queries instead of querying
+        each node. Default is True
+    :param use_registry: bool, Whether or not the controls registry should be used if the scene has one, it was
+        built with the same rules and the scene did not change since. Default is True
+    :param use_references: bool, Whether or not controls of namespaces that belong to the same referenced file should
+        only be looked for once. Default is True
+    :param use_cache: bool, Whether or not results can be returned from the controls cache. Cached results are
+        discarded when DAG nodes are added or removed, nodes are renamed or the attributes checked by the rules are
+        added, removed or set. Default is True
+    :param profiler: ScanProfiler or None, if given, time spent in each phase of the lookup and DCC calls are
+        recorded in it
+    :param profile: bool, Whether or not the lookup should be profiled and its report logged. Default is False
     :return: list(str), list of control names
     """
 
+    kwargs.pop('chunk_size', None)
+
+    return list(iter_controls(**kwargs))
+
+
+def iter_controls(chunk_size=None, tagged_first=True, **kwargs):
+    """
+    Yields controls of the current scene as soon as they are found
+    Supports the same keyword arguments as get_controls
+    :param chunk_size: int or None, If given, controls are yielded in lists of this size
+    :param tagged_first: bool, If True, tagged controls are yielded first and untagged ones are only yielded if no
+        tagged control was found, following get_controls behaviour. If False, all the controls are yielded
+    :return: generator(str) or generator(list(str))
+    """
+
     namespace = kwargs.get('namespace', '')
-    name = '{}:*'.format(namespace) if namespace else '*'
+    matcher = controlmatcher.ControlMatcher.from_kwargs(**kwargs)
+    use_registry = kwargs.get('use_registry', True)
+    use_cache = kwargs.get('use_cache', True)
+    cache_key = (matcher.key, use_registry, tagged_first)
+    profiler = kwargs.get('profiler', None)
+    log_profile = not profiler and kwargs.get('profile', False)
+    if log_profile:
+        profiler = ScanProfiler('get_controls')
+
+    controls = None
+    attributes_state = None
+    if use_cache or use_registry:
+        _watch_scene()
+    if use_cache:
+        with profile_phase(profiler, 'cache'):
+            attributes_state = controlscan.get_attributes_state(matcher, namespace=namespace, profiler=profiler)
+            controls = _CONTROLS_CACHE.get(namespace, cache_key, state=attributes_state)
+    if controls is None:
+        generation = _CONTROLS_CACHE.generation
+        controls = _iter_found_controls(
+            matcher, namespace=namespace, use_registry=use_registry, bulk_scan=kwargs.get('bulk_scan', True),
+            use_references=kwargs.get('use_references', True), tagged_first=tagged_first, profiler=profiler)
+        if use_cache:
+            controls = _iter_and_cache_controls(controls, namespace, cache_key, generation, attributes_state)
+    if log_profile:
+        controls = _iter_and_log_profile(controls, profiler)
+
+    return controlmatcher.iter_chunks(controls, chunk_size) if chunk_size else iter(controls)
+
+
+def get_controls_cache_stats():
+    """
+    Returns hits, misses and invalidations of the get_controls cache
+    :return: dict
+    """
+
+    return _CONTROLS_CACHE.stats()
+
+
+def clear_controls_cache():
+    """
+    Discards all cached get_controls results, including the controls cached for each referenced file, resets cache
+    counters and removes the callbacks used to invalidate the cache. Callbacks are registered again next time the
+    cache is used
+    """
+
+    _CALLBACKS.remove(_CONTROLS_CACHE_CALLBACKS)
+    _CONTROLS_CACHE.clear()
+    _REGISTRY_STATE['generation'] = None
+    controlscan.clear_reference_cache()
 
-    transforms = dcc.list_nodes(name, node_type='transform', full_path=False)
-    joints = dcc.list_nodes(name, node_type='joint', full_path=False)
-    if joints:
-        transforms += joints
+
+def _iter_and_cache_controls(controls, namespace, cache_key, generation, attributes_state):
+    """
+    Internal function that yields given controls and stores them in the controls cache once all of them are consumed
+    Controls are not stored if the cache was invalidated while they were consumed, because the scene changed
+    :param controls: generator(str)
+    :param namespace: str
+    :param cache_key: tuple
+    :param generation: int, generation of the controls cache before the controls were looked for
+    :param attributes_state: tuple, state of the attributes checked by the rules before the controls were looked for
+    :return: generator(str)
+    """
 
     found = list()
-    found_with_value = list()
+    for control in controls:
+        found.append(control)
+        yield control
+
+    if _CONTROLS_CACHE.generation == generation:
+        _CONTROLS_CACHE.put(namespace, cache_key, found, state=attributes_state)
+
+
+def _watch_scene():
+    """
+    Internal function that registers the callbacks that invalidate the controls cache when the scene changes, if they
+    are not registered yet. Controls registry is trusted when the scene starts being watched and when a scene is
+    opened; any other change makes it stale until it is created again
+    """
+
+    if _CONTROLS_CACHE_CALLBACKS in _CALLBACKS:
+        return
+
+    callbacks.add_scene_changed_callbacks(
+        _CALLBACKS, _CONTROLS_CACHE_CALLBACKS, _CONTROLS_CACHE.invalidate, scene_callback=_on_scene_opened)
+    _on_scene_opened()
+
+
+def _on_scene_opened(*args, **kwargs):
+    """
+    Internal callback function called when a new scene is created or opened. Arguments are ignored
+    """
+
+    _CONTROLS_CACHE.invalidate()
+    _REGISTRY_STATE['generation'] = _CONTROLS_CACHE.generation
+
+
+def _is_registry_current():
+    """
+    Internal function that returns whether or not the scene did not change since the controls registry was known to be
+    up to date
+    :return: bool
+    """
+
+    return _REGISTRY_STATE['generation'] == _CONTROLS_CACHE.generation
+
+
+def _register_controls(controls, registry_current):
+    """
+    Internal function that registers controls created through this library. If the registry was up to date before
+    they were created, it is still up to date once they are registered
+    :param controls: list(str)
+    :param registry_current: bool, value returned by _is_registry_current before creating the controls
+    """
+
+    if not controlregistry.register_controls(controls):
+        return
+    if registry_current:
+        _REGISTRY_STATE['generation'] = _CONTROLS_CACHE.generation
+
+
+def _iter_and_log_profile(controls, profiler):
+    """
+    Internal function that yields given controls and logs the report of the given profiler once all of them are
+    consumed
+    :param controls: generator(str)
+    :param profiler: ScanProfiler
+    :return: generator(str)
+    """
+
+    for control in controls:
+        yield control
+
+    profiler.log_report()
+
+
+def _get_query_functions(profiler=None):
+    """
+    Internal function that returns the DCC functions used to evaluate control rules
+    :param profiler: ScanProfiler or None, if given, returned functions record their calls in it
+    :return: tuple(callable, callable, callable), attribute exists, get attribute value and has shape of type functions
+    """
+
+    if not profiler:
+        return dcc.attribute_exists, dcc.get_attribute_value, dcc.node_has_shape_of_type
+
+    return (
+        profiler.wrap('attribute_exists', dcc.attribute_exists),
+        profiler.wrap('get_attribute_value', dcc.get_attribute_value),
+        profiler.wrap('node_has_shape_of_type', dcc.node_has_shape_of_type))
+
+
+def _iter_found_controls(
+        matcher, namespace='', use_registry=True, bulk_scan=True, use_references=True, tagged_first=True,
+        profiler=None):
+    """
+    Internal function that looks for the controls of the current scene
+    :param matcher: ControlMatcher
+    :param namespace: str
+    :param use_registry: bool
+    :param bulk_scan: bool
+    :param use_references: bool
+    :param tagged_first: bool
+    :param profiler: ScanProfiler or None
+    :return: generator(str)
+    """
+
+    if use_registry and _is_registry_current():
+        with profile_phase(profiler, 'registry'):
+            registered_controls = controlregistry.get_registered_controls(matcher, namespace=namespace)
+        if registered_controls is not None:
+            # Registered nodes are checked against the rules, so nodes registered by other tools or edited after
+            # being registered are only returned if a scan would find them too
+            if profiler:
+                matcher = profiler.wrap_matcher(matcher)
+            for control in matcher.iter_matches(
+                    registered_controls, *_get_query_functions(profiler), tagged_first=tagged_first):
+                yield control
+            return
+    if bulk_scan:
+        for control in controlscan.iter_controls(
+                matcher, namespace=namespace, tagged_first=tagged_first, use_references=use_references,
+                profiler=profiler):
+            yield control
+        return
+
+    name = '{}:*'.format(namespace) if namespace else '*'
+    list_nodes = profiler.wrap('list_nodes', dcc.list_nodes) if profiler else dcc.list_nodes
+    with profile_phase(profiler, 'list_nodes'):
+        transforms = list_nodes(name, node_type='transform', full_path=False)
+        joints = list_nodes(name, node_type='joint', full_path=False)
+        if joints:
+            transforms += joints
+
+    if profiler:
+        matcher = profiler.wrap_matcher(matcher)
+    controls = matcher.iter_matches(transforms, *_get_query_functions(profiler), tagged_first=tagged_first)
+    if profiler:
+        controls = profiler.iter_phase('match', controls)
+    for control in controls:
+        yield control
 
-    for transform_node in transforms:
-        if is_control(transform_node, only_tagged=True, **kwargs):
-            found_with_value.append(transform_node)
-        elif is_control(transform_node, only_tagged=False, **kwargs):
-            found.append(transform_node)
 
-    return found_with_value if found_with_value else found
+@dcc.undo_decorator()
+def create_controls_registry(**kwargs):
+    """
+    Creates the controls registry of the current scene and registers all its controls
+    Once created, controls created, tracked or duplicated through this library are registered automatically and
+    get_controls reads the registry instead of scanning the scene. Any other change of the scene makes the registry
+    stale and get_controls scans the scene again until the registry is created again
+    :return: str, registry node
+    """
+
+    matcher = controlmatcher.ControlMatcher.from_kwargs(**kwargs)
+    namespaces = maya.cmds.namespaceInfo(':', listOnlyNamespaces=True, recurse=True) or list()
+    namespaces = [''] + [namespace for namespace in namespaces if namespace not in ('UI', 'shared')]
+    controls = list()
+    for namespace in namespaces:
+        controls.extend(get_controls(
+            matcher=matcher, namespace=namespace, use_registry=False, bulk_scan=kwargs.get('bulk_scan', True)))
+
+    registry = controlregistry.create_registry(controls, matcher, namespaces=namespaces)
+    _watch_scene()
+    _REGISTRY_STATE['generation'] = _CONTROLS_CACHE.generation
+
+    return registry
+
+
+@dcc.undo_decorator()
+def delete_controls_registry():
+    """
+    Deletes the controls registry of the current scene
+    :return: bool
+    """
+
+    return controlregistry.delete_registry()
 
 
 @dcc.undo_decorator()
 def select_controls(**kwargs):
     """
     Select all controls in current scene
+    Controls are selected in chunks as soon as they are found
     """
 
-    namespace = kwargs.get('namespace', '')
-    all_controls = get_controls(namespace=namespace, **kwargs)
-    if not all_controls:
-        return
-
-    dcc.select_node(all_controls)
+    kwargs.setdefault('chunk_size', consts.CONTROLS_CHUNK_SIZE)
+    selected = False
+    for controls in iter_controls(**kwargs):
+        maya.cmds.select(controls, add=selected)
+        selected = True
 
 
 @dcc.undo_decorator()
 def key_controls(**kwargs):
     """
     Sets a keyframe in all controls in current scene
+    Controls are collected before keying them, so the animation curves created while keying do not modify the
+    scene while it is still being scanned
     :param kwargs:
     """
 
-    namespace = kwargs.get('namespace', '')
-    all_controls = get_controls(namespace=namespace, **kwargs)
-    if not all_controls:
-        return
-
-    dcc.set_keyframe(all_controls, shape=0, controlPoints=0, hierarchy='none', breakdown=0)
+    chunk_size = kwargs.pop('chunk_size', None) or consts.CONTROLS_CHUNK_SIZE
+    controls = get_controls(**kwargs)
+    for i in range(0, len(controls), chunk_size):
+        dcc.set_keyframe(controls[i:i + chunk_size], shape=0, controlPoints=0, hierarchy='none', breakdown=0)
 
 
 @dcc.undo_decorator()
@@ -558,8 +826,8 @@ def scale_controls(value, controls=None, **kwargs):
     Scale current selected controls by given value
     """
 
-    namespace = kwargs.get('namespace', '')
-    all_controls = controls or get_controls(namespace=namespace, **kwargs) or list()
+    kwargs.pop('chunk_size', None)
+    all_controls = controls or iter_controls(**kwargs)
     for control in all_controls:
         dcc.scale_transform_shapes(control, value)
 
@@ -579,7 +847,9 @@ def get_control_transform_rgb_color(control_transform, linear=True):
     return node_utils.get_rgb_color(control_shapes[0], linear=linear)
 
 
-def set_shape(crv, crv_shape_list, size=None, select_new_shape=False, keep_color=False):
+def set_shape(
+        crv, crv_shape_list, size=None, select_new_shape=False, keep_color=False, control_type=None,
+        controls_path=None):
     """
     Creates a new shape on the given curve
     :param crv:
@@ -587,6 +857,9 @@ def set_shape(crv, crv_shape_list, size=None, select_new_shape=False, keep_color
     :param size:
     :param select_new_shape: bool
     :param keep_color: bool
+    :param control_type: str or None, control type new shapes were created from. If given, the size of the new shapes
+        is retrieved from the library metadata instead of being queried to the DCC
+    :param controls_path: str or list(str) or None, paths where control type is located
     """
 
     crv_shapes = controlutils.validate_curve(crv)
@@ -610,7 +883,11 @@ def set_shape(crv, crv_shape_list, size=None, select_new_shape=False, keep_color
             dcc.set_node_color(new_shape, orig_color)
         dcc.combine_shapes(crv, new_shape, delete_after_combine=True)
 
-    new_size = dcc.node_bounding_box_size(crv)
+    new_size = None
+    if orig_size and control_type:
+        new_size = _get_control_type_size(control_type, controls_path=controls_path)
+    if not new_size:
+        new_size = dcc.node_bounding_box_size(crv)
 
     if orig_size and new_size:
         scale_size = orig_size / new_size
@@ -654,3 +931,164 @@ def create_buffer_groups(target=None, depth=1):
             result.append(empty_group)
 
     return result
+
+
+def _get_control_type_size(
+        control_type, controls_path=None, control_size=1.0, scale=(1.0, 1.0, 1.0), rotate_offset=(0.0, 0.0, 0.0)):
+    """
+    Internal function that returns the bounding box size a control of the given type will have once created, using
+    the precomputed metadata of the controls library so the DCC does not need to be queried
+    Scale is applied before axis order permutation, so axis order, mirror and translate offset do not change the
+    bounding box size and they are not needed. Metadata bounding box encloses the CVs of the curves, as the one Maya
+    reports for NURBS curves, so both sizes can be compared
+    :param control_type: str
+    :param controls_path: str or list(str) or None
+    :param control_size: float
+    :param scale: tuple(float, float, float)
+    :param rotate_offset: tuple(float, float, float)
+    :return: float or None, None if the size cannot be computed from the metadata
+    """
+
+    # Rotation changes the bounding box in a way that cannot be computed from the original one
+    if rotate_offset and any(rotate_offset):
+        return None
+
+    metadata = shapecache.get_control_metadata(control_type, controls_path)
+    if metadata is None:
+        return None
+
+    return metadata.scaled_size(control_size, scale)
+
+
+def _get_command_runner():
+    """
+    Internal function that returns the DCC command runner, registering the commands of this library the first time
+    :return: CommandRunner
+    """
+
+    runner = command.CommandRunner()
+    if not _COMMANDS_STATE['registered']:
+        commands_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'commands')
+        runner.manager().register_path(commands_path, 'tpDcc')
+        _COMMANDS_STATE['registered'] = True
+
+    return runner
+
+
+def _get_control_shapes(control_type, controls_path=None, control_data=None, **kwargs):
+    """
+    Internal function that returns the shapes of a new control with all the given creation parameters applied to
+    their CVs, so the DCC receives their final positions and no CV is edited after creation
+    Variants of library control types are cached, so creating the same variant again does not transform CVs again
+    :param control_type: str
+    :param controls_path: str or list(str) or None
+    :param control_data: ControlShapeSet or dict or list(dict) or None, custom shapes used instead of the control type
+    :param kwargs: dict, creation parameters supported by shapetransform.compose_matrix
+    :return: ControlShapeSet or None
+    """
+
+    control_shapes = ControlShapeSet.from_data(control_data)
+    if control_shapes is not None:
+        return shapetransform.transform_shapes(control_shapes, **kwargs)
+
+    return shapecache.get_transformed_shapes(control_type, controls_path, **kwargs)
+
+
+def _build_control_curve(
+        runner, current_selection, control_name='new_ctrl', control_type='circle', controls_path=None,
+        control_shapes=None, control_size=1.0, translate_offset=(0.0, 0.0, 0.0), rotate_offset=(0.0, 0.0, 0.0),
+        scale=(1.0, 1.0, 1.0), axis_order='XYZ', mirror=None, parent=None, **kwargs):
+    """
+    Internal function that creates the curves of a new control. Color and line width are not applied, so callers
+    can apply them to multiple controls at once
+    :param runner: CommandRunner, runner used to execute curve creation commands
+    :param current_selection: list(str), DCC selection before creating the control
+    :param control_shapes: ControlShapeSet or None, shapes of the control with all creation parameters already
+        applied to their CVs. If not given, curves library is used
+    :return: tuple(list(str), list(str), list(str)), created transforms (buffer groups if created), curves and
+        control transforms
+    """
+
+    parent_mobj = api_node.as_mobject(parent) if parent else None
+    if control_shapes is not None:
+        curves = runner.run(CREATE_CONTROL_CURVES_COMMAND, shape_sets=[control_shapes], parents=[parent_mobj])
+        return _setup_control_curve(
+            parent_mobj, curves[0], current_selection, control_name=control_name, parent=parent, **kwargs)
+
+    parent_mobj, shape_mobjs = runner.run(
+        'tpDcc-libs-curves-dccs-maya-createCurveFromPath', curve_type=control_type, curves_path=controls_path,
+        curve_size=control_size, translate_offset=translate_offset, scale=scale, axis_order=axis_order,
+        mirror=mirror, parent=parent_mobj)
+
+    return _setup_control_curve(
+        parent_mobj, (parent_mobj, shape_mobjs), current_selection, control_name=control_name,
+        rotate_offset=rotate_offset, parent=parent, **kwargs)
+
+
+def _setup_control_curve(
+        parent_mobj, curves, current_selection, control_name='new_ctrl', rotate_offset=(0.0, 0.0, 0.0),
+        create_buffers=False, buffers_depth=0, match_translate=False, match_rotate=False, match_scale=False,
+        parent=None, **kwargs):
+    """
+    Internal function that names the curves of a new control once they are created, and creates its buffer groups
+    and matches it to the current selection when it is not parented to an existing node
+    :param parent_mobj: MObject or None, existing transform the curves of the control were added to
+    :param curves: tuple(MObject, list(MObject)), transform that owns the curves of the control and its curve shapes
+    :param current_selection: list(str), DCC selection before creating the control
+    :param rotate_offset: tuple(float, float, float), rotation offset not applied yet to the CVs of the curves
+    :return: tuple(list(str), list(str), list(str)), created transforms (buffer groups if created), curves and
+        control transforms
+    """
+
+    curves_parent_mobj, shape_mobjs = curves
+    if parent_mobj:
+        for shape in shape_mobjs:
+            api_node.rename_mobject(shape, control_name)
+        curve_long_name_list = api_node.names_from_mobject_handles(shape_mobjs)
+    else:
+        api_node.rename_mobject(curves_parent_mobj, control_name)
+        curve_long_name_list = api_node.names_from_mobject_handles([curves_parent_mobj])
+
+    if tuple(rotate_offset) != (0.0, 0.0, 0.0):
+        shape_utils.rotate_node_shape_cvs(curve_long_name_list, rotate_offset)
+
+    transforms = list()
+    for curve_shape in curve_long_name_list:
+        curve_parent = dcc.node_parent(curve_shape)
+        if curve_parent:
+            if curve_parent not in transforms:
+                transforms.append(curve_parent)
+        else:
+            if curve_shape not in transforms:
+                transforms.append(curve_shape)
+
+    controls = list(transforms)
+    if not parent and transforms:
+        if create_buffers and buffers_depth > 0:
+            transforms = create_buffer_groups(transforms, buffers_depth)
+        if current_selection:
+            match_transform = current_selection[0]
+            if match_transform and dcc.node_exists(match_transform):
+                for transform in transforms:
+                    if match_translate:
+                        dcc.match_translation(match_transform, transform)
+                    if match_rotate:
+                        dcc.match_rotation(match_transform, transform)
+                    if match_scale:
+                        dcc.match_scale(match_transform, transform)
+
+    return transforms, curve_long_name_list, controls
+
+
+def _set_curves_color(curves, color):
+    """
+    Internal function that applies given color to the given curves
+    :param curves: list(str)
+    :param color: int or list(float, float, float), index or RGB color
+    """
+
+    # TODO: Support index based color
+    if isinstance(color, int):
+        node_utils.set_color(curves, color)
+    else:
+        node_utils.set_rgb_color(curves, color, linear=True, color_shapes=True)
@@ -0,0 +1,142 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains functions to mirror rig controls shapes in Maya without creating temporary nodes
+Source CVs are read in world space, reflected with a single matrix and written into the local space of the target
+"""
+
+from __future__ import print_function, division, absolute_import
+
+from array import array
+from collections import OrderedDict
+
+import maya.cmds
+
+from tpRigToolkit.libs.controlrig.core import shapetransform
+
+# Mirror modes
+WORLD_MIRROR = 0
+PIVOT_MIRROR = 1
+
+
+def get_curve_shapes(node):
+    """
+    Returns the non intermediate curve shapes of the given node
+    :param node: str
+    :return: list(str)
+    """
+
+    return maya.cmds.listRelatives(
+        node, shapes=True, type='nurbsCurve', noIntermediate=True, fullPath=True) or list()
+
+
+def get_world_matrix(node):
+    """
+    Returns the world matrix of the given node
+    :param node: str
+    :return: tuple(tuple(float)), matrix that transforms column vectors
+    """
+
+    # Maya matrices transform row vectors, so the queried matrix is transposed
+    values = maya.cmds.xform(node, query=True, worldSpace=True, matrix=True)
+
+    return tuple(tuple(float(values[column * 4 + row]) for column in range(4)) for row in range(4))
+
+
+def get_world_pivot(node):
+    """
+    Returns the world position of the rotate pivot of the given node
+    :param node: str
+    :return: tuple(float, float, float)
+    """
+
+    return tuple(maya.cmds.xform(node, query=True, worldSpace=True, rotatePivot=True))
+
+
+def get_world_pivots(nodes):
+    """
+    Returns the world position of the rotate pivot of each one of the given nodes
+    :param nodes: list(str)
+    :return: OrderedDict(str, tuple(float, float, float))
+    """
+
+    return OrderedDict((node, get_world_pivot(node)) for node in nodes)
+
+
+def get_mirrored_pivot(node, mirror_matrix):
+    """
+    Returns the world position of the rotate pivot of the given node once reflected with the given matrix
+    :param node: str
+    :param mirror_matrix: tuple(tuple(float))
+    :return: tuple(float, float, float)
+    """
+
+    return tuple(shapetransform.transform_cvs(array('d', get_world_pivot(node)), mirror_matrix))
+
+
+def get_world_cvs(shape):
+    """
+    Returns the world position of all the CVs of the given curve shape
+    :param shape: str
+    :return: array, flat XYZ values
+    """
+
+    return array('d', maya.cmds.xform('{}.cv[*]'.format(shape), query=True, worldSpace=True, translation=True))
+
+
+def set_world_cvs(shape, cvs, world_inverse_matrix):
+    """
+    Moves all the CVs of the given curve shape to the given world positions
+    :param shape: str
+    :param cvs: array, flat XYZ world values
+    :param world_inverse_matrix: tuple(tuple(float)), inverse of the world matrix of the shape transform
+    """
+
+    local_cvs = shapetransform.transform_cvs(cvs, world_inverse_matrix)
+    if not local_cvs:
+        return
+
+    # Control points are stored in object space and a ranged write sets all of them with a single call
+    maya.cmds.setAttr('{}.controlPoints[0:{}]'.format(shape, len(local_cvs) // 3 - 1), *local_cvs)
+
+
+def get_mirror_matrix(source_control, mirror_axis='X', mirror_mode=WORLD_MIRROR):
+    """
+    Returns the matrix that reflects the world CVs of the given control
+    :param source_control: str
+    :param mirror_axis: str, 'X', 'Y' or 'Z'
+    :param mirror_mode: int, WORLD_MIRROR to reflect across the world plane of the axis; PIVOT_MIRROR to reflect
+        across the plane of the axis that goes through the pivot of the control
+    :return: tuple(tuple(float))
+    """
+
+    pivot = get_world_pivot(source_control) if mirror_mode == PIVOT_MIRROR else None
+
+    return shapetransform.mirror_matrix(mirror_axis, pivot=pivot)
+
+
+def mirror_shapes(source_control, target_control, mirror_matrix):
+    """
+    Moves the CVs of the target control shapes so they match the reflected CVs of the source control shapes
+    :param source_control: str
+    :param target_control: str
+    :param mirror_matrix: tuple(tuple(float)), matrix returned by get_mirror_matrix
+    :return: bool, True if the shapes were mirrored; False if both controls do not have the same curves topology
+    """
+
+    source_shapes = get_curve_shapes(source_control)
+    target_shapes = get_curve_shapes(target_control)
+    if not source_shapes or len(source_shapes) != len(target_shapes):
+        return False
+
+    source_cvs = [get_world_cvs(shape) for shape in source_shapes]
+    for cvs, target_shape in zip(source_cvs, target_shapes):
+        if len(cvs) // 3 != maya.cmds.getAttr('{}.controlPoints'.format(target_shape), size=True):
+            return False
+
+    world_inverse_matrix = shapetransform.invert_matrix(get_world_matrix(target_control))
+    for cvs, target_shape in zip(source_cvs, target_shapes):
+        set_world_cvs(target_shape, shapetransform.transform_cvs(cvs, mirror_matrix), world_inverse_matrix)
+
+    return True
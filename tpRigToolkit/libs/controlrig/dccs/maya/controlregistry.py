@@ -0,0 +1,173 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains the in-scene registry of rig controls for Maya
+Registry is an opt-in network node whose multi message attribute is connected to the message attribute of each
+control, so controls can be listed without scanning the scene. Maya removes the connection of deleted controls and
+keeps connections of renamed or reparented controls. Registered nodes are not guaranteed to be controls: readers are
+expected to check them against the control rules
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import hashlib
+
+import maya.cmds
+
+from tpRigToolkit.libs.controlrig.core import consts
+
+
+def rules_key(matcher):
+    """
+    Returns the key stored in the registry to identify the control rules used to build it
+    :param matcher: ControlMatcher
+    :return: str
+    """
+
+    return hashlib.sha1(repr(matcher.key).encode('utf-8')).hexdigest()
+
+
+def get_registry():
+    """
+    Returns the registry node of the current scene
+    :return: str or None
+    """
+
+    return consts.CONTROLS_REGISTRY_NODE if maya.cmds.objExists(consts.CONTROLS_REGISTRY_NODE) else None
+
+
+def create_registry(controls, matcher, namespaces=None):
+    """
+    Creates the registry node of the current scene, or resets it if it already exists, and registers given controls
+    :param controls: list(str)
+    :param matcher: ControlMatcher, rules used to find the given controls
+    :param namespaces: list(str) or None, namespaces whose controls were looked for. Registry is stale for any other
+        namespace. If not given, the root namespace and the namespaces of the given controls are used
+    :return: str, registry node
+    """
+
+    if namespaces is None:
+        namespaces = [''] + [_node_namespace(control) for control in controls]
+    namespaces = sorted(set(namespace.strip(':') for namespace in namespaces))
+
+    registry = get_registry()
+    if registry:
+        maya.cmds.delete(registry)
+    registry = maya.cmds.createNode('network', name=consts.CONTROLS_REGISTRY_NODE, skipSelect=True)
+    maya.cmds.addAttr(
+        registry, longName=consts.CONTROLS_REGISTRY_ATTR_NAME, attributeType='message', multi=True,
+        indexMatters=False)
+    maya.cmds.addAttr(registry, longName=consts.CONTROLS_REGISTRY_RULES_ATTR_NAME, dataType='string')
+    maya.cmds.setAttr(
+        '{}.{}'.format(registry, consts.CONTROLS_REGISTRY_RULES_ATTR_NAME), rules_key(matcher), type='string')
+    maya.cmds.addAttr(registry, longName=consts.CONTROLS_REGISTRY_NAMESPACES_ATTR_NAME, dataType='string')
+    # Namespace names can not contain spaces, and the root namespace is stored as an empty item
+    maya.cmds.setAttr(
+        '{}.{}'.format(registry, consts.CONTROLS_REGISTRY_NAMESPACES_ATTR_NAME), ' '.join(namespaces) + ' ',
+        type='string')
+    register_controls(controls)
+
+    return registry
+
+
+def delete_registry():
+    """
+    Deletes the registry node of the current scene
+    :return: bool, True if the registry existed; False otherwise
+    """
+
+    registry = get_registry()
+    if not registry:
+        return False
+
+    maya.cmds.delete(registry)
+
+    return True
+
+
+def get_registered_controls(matcher=None, namespace=''):
+    """
+    Returns the registered controls
+    :param matcher: ControlMatcher or None, if given, controls are only returned if the registry was built with the
+        same rules
+    :param namespace: str, only controls of the given namespace are returned
+    :return: list(str) or None, None if there is no registry or if it is stale, either because it was built with
+        other rules or because the given namespace was not looked for when it was built
+    """
+
+    registry = get_registry()
+    if not registry:
+        return None
+    if matcher is not None:
+        stored_key = maya.cmds.getAttr('{}.{}'.format(registry, consts.CONTROLS_REGISTRY_RULES_ATTR_NAME))
+        if stored_key != rules_key(matcher):
+            return None
+    try:
+        stored_namespaces = maya.cmds.getAttr(
+            '{}.{}'.format(registry, consts.CONTROLS_REGISTRY_NAMESPACES_ATTR_NAME))
+    except (RuntimeError, ValueError):
+        stored_namespaces = None
+    namespace = (namespace or '').strip(':')
+    if stored_namespaces is None or namespace not in stored_namespaces.split(' '):
+        return None
+
+    controls = maya.cmds.listConnections(
+        '{}.{}'.format(registry, consts.CONTROLS_REGISTRY_ATTR_NAME), source=True, destination=False) or list()
+
+    return [control for control in controls if _node_namespace(control) == namespace]
+
+
+def register_controls(controls):
+    """
+    Registers given controls if the current scene has a registry node
+    :param controls: list(str)
+    :return: bool, True if the scene has a registry; False otherwise
+    """
+
+    registry = get_registry()
+    if not registry:
+        return False
+    if not controls:
+        return True
+
+    registry_attr = '{}.{}'.format(registry, consts.CONTROLS_REGISTRY_ATTR_NAME)
+    # Full paths are compared, so a node given with a short name is not connected again
+    registered = set(
+        maya.cmds.listConnections(registry_attr, source=True, destination=False, fullPath=True) or list())
+    for control in maya.cmds.ls(controls, long=True) or list():
+        if control in registered:
+            continue
+        maya.cmds.connectAttr('{}.message'.format(control), registry_attr, nextAvailable=True)
+        registered.add(control)
+
+    return True
+
+
+def is_registered(control):
+    """
+    Returns whether or not given control is connected to the registry node
+    :param control: str
+    :return: bool
+    """
+
+    registry = get_registry()
+    if not registry:
+        return False
+
+    connections = maya.cmds.listConnections(
+        '{}.message'.format(control), source=False, destination=True, type='network') or list()
+
+    return registry in connections
+
+
+def _node_namespace(node):
+    """
+    Internal function that returns the namespace of the given node
+    :param node: str
+    :return: str
+    """
+
+    short_name = node.rsplit('|', 1)[-1]
+
+    return short_name.rsplit(':', 1)[0] if ':' in short_name else ''
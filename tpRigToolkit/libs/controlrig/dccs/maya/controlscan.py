@@ -0,0 +1,322 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains functions to find rig controls in Maya scenes with bulk queries
+Instead of querying each attribute and shape of each node, the scan retrieves with a few queries the set of nodes
+that have each attribute used by the control rules and the set of nodes that have curve shapes. Rules are then
+evaluated in Python against those sets
+Controls of referenced files are only looked for once per file: the result is reused for all the namespaces the file
+is referenced with, as long as the current scene applies the same edits to those references
+"""
+
+from __future__ import print_function, division, absolute_import
+
+import os
+import hashlib
+
+import maya.cmds
+
+from tpRigToolkit.libs.controlrig.core import controlmatcher
+from tpRigToolkit.libs.controlrig.core.shapecache import LRUCache
+from tpRigToolkit.libs.controlrig.core.profiler import profile_phase
+
+# Rules only check whether or not these attributes have a value, so their values are part of the attributes state
+VALUE_ATTRIBUTES = (controlmatcher.TAG_ATTRIBUTE,) + controlmatcher.TYPE_ATTRIBUTES
+
+_REFERENCE_CONTROLS = LRUCache(max_size=64)
+
+
+class SceneSnapshot(object):
+    """
+    Class that stores the result of the bulk queries needed to evaluate control rules against the nodes of a scene
+    """
+
+    def __init__(self, nodes, nodes_by_attribute, nodes_by_shape_type, get_attr=None):
+        super(SceneSnapshot, self).__init__()
+
+        self._nodes = nodes
+        self._nodes_by_attribute = nodes_by_attribute
+        self._nodes_by_shape_type = nodes_by_shape_type
+        self._get_attr = get_attr
+        self._values = dict()
+
+    @property
+    def nodes(self):
+        """
+        Returns all transform and joint nodes of the scan
+        :return: list(str)
+        """
+
+        return self._nodes
+
+    def attribute_exists(self, node, attribute_name):
+        """
+        Returns whether or not given node has the given attribute
+        :param node: str
+        :param attribute_name: str
+        :return: bool
+        """
+
+        return node in self._nodes_by_attribute.get(attribute_name, ())
+
+    def get_attribute_value(self, node, attribute_name):
+        """
+        Returns the value of the given attribute. Values are only queried once
+        :param node: str
+        :param attribute_name: str
+        :return: object
+        """
+
+        key = (node, attribute_name)
+        if key not in self._values:
+            try:
+                self._values[key] = (self._get_attr or maya.cmds.getAttr)('{}.{}'.format(node, attribute_name))
+            except (RuntimeError, ValueError):
+                self._values[key] = None
+
+        return self._values[key]
+
+    def has_shape_of_type(self, node, shape_type):
+        """
+        Returns whether or not given node has a shape of the given type
+        :param node: str
+        :param shape_type: str
+        :return: bool
+        """
+
+        return node in self._nodes_by_shape_type.get(shape_type, ())
+
+
+def take_snapshot(matcher, namespace='', profiler=None):
+    """
+    Runs the bulk queries needed to evaluate the given rules against all the transforms and joints of the scene
+    :param matcher: ControlMatcher
+    :param namespace: str, only nodes with the given namespace are taken into account
+    :param profiler: ScanProfiler or None, if given, queries are counted
+    :return: SceneSnapshot
+    """
+
+    ls = maya.cmds.ls
+    list_relatives = maya.cmds.listRelatives
+    get_attr = None
+    if profiler:
+        ls = profiler.wrap('ls', ls)
+        list_relatives = profiler.wrap('listRelatives', list_relatives)
+        get_attr = profiler.wrap('getAttr', maya.cmds.getAttr)
+
+    pattern = '{}:*'.format(namespace) if namespace else '*'
+
+    nodes = ls(pattern, type=('transform', 'joint')) or list()
+
+    nodes_by_attribute = dict()
+    for attribute_name in _get_rules_attributes(matcher):
+        nodes_by_attribute[attribute_name] = set(
+            ls('{}.{}'.format(pattern, attribute_name), objectsOnly=True) or list())
+
+    nodes_by_shape_type = dict()
+    for shape_type in controlmatcher.SHAPE_TYPES:
+        shapes = ls(type=shape_type) or list()
+        parents = list_relatives(shapes, parent=True) if shapes else None
+        nodes_by_shape_type[shape_type] = set(parents or list())
+
+    return SceneSnapshot(nodes, nodes_by_attribute, nodes_by_shape_type, get_attr=get_attr)
+
+
+def get_attributes_state(matcher, namespace='', profiler=None):
+    """
+    Returns the nodes that have each attribute checked by the given rules and whether or not their tag and type
+    attributes have a value. Maya does not notify attributes added to or set on existing nodes to the callbacks that
+    discard cached controls, so cached controls are only valid while this state does not change
+    Only nodes with those attributes are queried, so it is cheaper than scanning the scene
+    :param matcher: ControlMatcher
+    :param namespace: str, only nodes with the given namespace are taken into account
+    :param profiler: ScanProfiler or None, if given, queries are counted
+    :return: tuple
+    """
+
+    ls = maya.cmds.ls
+    get_attr = maya.cmds.getAttr
+    if profiler:
+        ls = profiler.wrap('ls', ls)
+        get_attr = profiler.wrap('getAttr', get_attr)
+
+    pattern = '{}:*'.format(namespace) if namespace else '*'
+
+    state = list()
+    for attribute_name in sorted(_get_rules_attributes(matcher)):
+        nodes = tuple(sorted(ls('{}.{}'.format(pattern, attribute_name), objectsOnly=True) or list()))
+        if attribute_name in VALUE_ATTRIBUTES:
+            values = list()
+            for node in nodes:
+                try:
+                    values.append(bool(get_attr('{}.{}'.format(node, attribute_name))))
+                except (RuntimeError, ValueError):
+                    values.append(False)
+            nodes = tuple(zip(nodes, values))
+        state.append((attribute_name, nodes))
+
+    return tuple(state)
+
+
+def get_namespace_reference(namespace):
+    """
+    Returns the reference the given namespace belongs to
+    :param namespace: str
+    :return: str or None, path of the reference, including its copy number, or None if the namespace does not belong
+        to a loaded reference
+    """
+
+    namespace = (namespace or '').strip(':')
+    if not namespace:
+        return None
+
+    for reference_file in maya.cmds.file(query=True, reference=True) or list():
+        if maya.cmds.referenceQuery(reference_file, namespace=True).strip(':') != namespace:
+            continue
+        if not maya.cmds.referenceQuery(reference_file, isLoaded=True):
+            return None
+        return reference_file
+
+    return None
+
+
+def get_namespace_reference_file(namespace):
+    """
+    Returns the file referenced with the given namespace
+    :param namespace: str
+    :return: str or None, path of the referenced file without copy number or None if the namespace does not belong
+        to a loaded reference
+    """
+
+    reference = get_namespace_reference(namespace)
+    if not reference:
+        return None
+
+    return maya.cmds.referenceQuery(reference, filename=True, withoutCopyNumber=True)
+
+
+def get_reference_edits_hash(reference):
+    """
+    Returns a hash of the edits the current scene applies to the given reference, such as attributes added or set
+    on its nodes. Controls found in a referenced file can only be reused for references with the same edits
+    :param reference: str, path of the reference, including its copy number
+    :return: str
+    """
+
+    edits = maya.cmds.referenceQuery(reference, editStrings=True) or list()
+
+    return hashlib.sha1('\n'.join(edits).encode('utf-8')).hexdigest()
+
+
+def clear_reference_cache():
+    """
+    Discards the controls cached for each referenced file
+    """
+
+    _REFERENCE_CONTROLS.clear()
+
+
+def find_controls(matcher=None, namespace='', use_references=True, profiler=None):
+    """
+    Returns all the controls of the scene. If tagged controls are found, only those are returned
+    :param matcher: ControlMatcher or None, control rules. If not given, default rules are used
+    :param namespace: str, only controls with the given namespace are returned
+    :param use_references: bool, Whether or not controls of a namespace that belongs to a referenced file should be
+        mapped from the controls found in other namespaces of the same file
+    :param profiler: ScanProfiler or None, if given, scan phases and queries are recorded
+    :return: list(str)
+    """
+
+    return list(iter_controls(matcher, namespace=namespace, use_references=use_references, profiler=profiler))
+
+
+def iter_controls(matcher=None, namespace='', tagged_first=True, use_references=True, profiler=None):
+    """
+    Yields the controls of the scene as soon as they are found
+    :param matcher: ControlMatcher or None, control rules. If not given, default rules are used
+    :param namespace: str, only controls with the given namespace are yielded
+    :param tagged_first: bool, If True, tagged controls are yielded first and untagged ones are only yielded if no
+        tagged control was found. If False, all the controls are yielded
+    :param use_references: bool, Whether or not controls of a namespace that belongs to a referenced file should be
+        mapped from the controls found in other namespaces of the same file
+    :param profiler: ScanProfiler or None, if given, scan phases and queries are recorded
+    :return: generator(str)
+    """
+
+    matcher = matcher or controlmatcher.ControlMatcher()
+    reference = None
+    if use_references:
+        with profile_phase(profiler, 'references'):
+            reference = get_namespace_reference(namespace)
+            if reference:
+                reference_file = maya.cmds.referenceQuery(reference, filename=True, withoutCopyNumber=True)
+                edits_hash = get_reference_edits_hash(reference)
+    if not reference:
+        for control in _iter_scanned_controls(
+                matcher, namespace=namespace, tagged_first=tagged_first, profiler=profiler):
+            yield control
+        return
+
+    prefix = '{}:'.format(namespace.strip(':'))
+    try:
+        file_mtime = os.path.getmtime(reference_file)
+    except OSError:
+        file_mtime = None
+    key = (reference_file, edits_hash, matcher.key, tagged_first)
+    cached = _REFERENCE_CONTROLS.get(key, validator=lambda item: item[0] == file_mtime)
+    if cached:
+        if cached[1]:
+            # Nodes removed through reference edits are discarded by the query
+            for control in maya.cmds.ls([prefix + name for name in cached[1]]) or list():
+                yield control
+        return
+
+    names = list()
+    for control in _iter_scanned_controls(matcher, namespace=namespace, tagged_first=tagged_first, profiler=profiler):
+        if control.startswith(prefix):
+            names.append(control[len(prefix):])
+        yield control
+
+    # Only reached if all the controls were consumed
+    _REFERENCE_CONTROLS.put(key, (file_mtime, tuple(names)))
+
+
+def _get_rules_attributes(matcher):
+    """
+    Internal function that returns the names of the attributes checked by the given rules
+    :param matcher: ControlMatcher
+    :return: set(str)
+    """
+
+    attribute_names = set(matcher.attributes_to_check) | set(matcher.attributes_to_skip)
+    attribute_names.add(controlmatcher.TAG_ATTRIBUTE)
+    attribute_names.update(controlmatcher.TYPE_ATTRIBUTES)
+
+    return attribute_names
+
+
+def _iter_scanned_controls(matcher, namespace='', tagged_first=True, profiler=None):
+    """
+    Internal function that scans the scene looking for controls
+    :param matcher: ControlMatcher
+    :param namespace: str
+    :param tagged_first: bool
+    :param profiler: ScanProfiler or None
+    :return: generator(str)
+    """
+
+    if not profiler:
+        snapshot = take_snapshot(matcher, namespace=namespace)
+        return matcher.iter_matches(
+            snapshot.nodes, snapshot.attribute_exists, snapshot.get_attribute_value, snapshot.has_shape_of_type,
+            tagged_first=tagged_first)
+
+    with profiler.phase('snapshot'):
+        snapshot = take_snapshot(matcher, namespace=namespace, profiler=profiler)
+    matcher = profiler.wrap_matcher(matcher)
+
+    return profiler.iter_phase('match', matcher.iter_matches(
+        snapshot.nodes, profiler.wrap('attribute_exists', snapshot.attribute_exists),
+        profiler.wrap('get_attribute_value', snapshot.get_attribute_value),
+        profiler.wrap('has_shape_of_type', snapshot.has_shape_of_type), tagged_first=tagged_first))